@@ -1,8 +1,21 @@
 from aladdin_auto.parameter import Parameter
 from aladdin_auto.productxml import ProductXML
+from aladdin_auto.productmenu import resolveDeviceName
+from aladdin_auto.timing import Timing
 from playwright.sync_api import expect, Page
 import time
 
+# locators of the home and product pages, shared with the async navigation of parallelsweep
+DEVICE_SEARCH_BOX = "xpath=//*[@id=\"frm-search\"]/input"
+RELEASE_SELECT = "xpath=//*[@id=\"release\"]/descendant::select"
+
+def releaseOption(xml: ProductXML) -> str:
+    """
+    Return the option of the release selection of a product release (e.g. "DR9401563 (MCF: 1.2)").
+    """
+    return xml.releaseNumber if xml.mcf is None else f"{xml.releaseNumber} (MCF: {xml.mcf})"
+
+@Timing.timed()
 def selectDeviceFromHomePageWithSearch(page: Page, deviceName: str):
     """
     Use Playwright to search for a device and select it from the Aladdin home page.
@@ -10,11 +23,34 @@ def selectDeviceFromHomePageWithSearch(page: Page, deviceName: str):
     :param page: Playwright page to click from
     :param deviceName: name of device
     """
-    searchBox = page.locator("xpath=//*[@id=\"frm-search\"]/input")
+    searchBox = page.locator(DEVICE_SEARCH_BOX)
     searchBox.click()
     searchBox.fill(deviceName)
     page.get_by_role("link", name=deviceName).first.click()
 
+@Timing.timed()
+def selectDeviceFromHomePage(page: Page, deviceName: str) -> str:
+    """
+    Use Playwright to select a device from the Aladdin home page. The device name is first resolved to the exact menu name with the product menu index, so it can also be a product name (e.g. Magellan-9900i) or the start of a menu or product name matching only one device (a LookupError is raised if it matches several).
+    The link of the device is clicked directly if the home page already shows it, otherwise the device is searched for, and only the link with the exact menu name is clicked. A device missing from the index is searched for by name (see selectDeviceFromHomePageWithSearch).
+
+    :param page: Playwright page to click from
+    :param deviceName: name of device
+    :return: menu name of the selected device
+    """
+    menuName = resolveDeviceName(deviceName)
+    if menuName is None:
+        selectDeviceFromHomePageWithSearch(page, deviceName)
+        return deviceName
+    link = page.get_by_role("link", name=menuName, exact=True).locator("visible=true").first
+    if not link.is_visible():
+        searchBox = page.locator(DEVICE_SEARCH_BOX)
+        searchBox.click()
+        searchBox.fill(menuName)
+    link.click()
+    return menuName
+
+@Timing.timed()
 def selectRelease(page: Page, releaseNumber: str):
     """
     Use Playwright to select a release number from the product page in Aladdin.
@@ -22,9 +58,10 @@ def selectRelease(page: Page, releaseNumber: str):
     :param page: Playwright page to click from
     :param releaseNumber: release number
     """
-    releaseSelection = page.locator("xpath=//*[@id=\"release\"]/descendant::select")
+    releaseSelection = page.locator(RELEASE_SELECT)
     releaseSelection.select_option(releaseNumber)
 
+@Timing.timed()
 def selectDeviceAndReleaseFromHomePage(page: Page, xml: ProductXML):
     """
     Use Playwright to search for a device and select a release number from the home page in Aladdin.
@@ -33,15 +70,12 @@ def selectDeviceAndReleaseFromHomePage(page: Page, xml: ProductXML):
     :param page: Playwright page
     :param xml: ProductXML object to search for
     """
-    selectDeviceFromHomePageWithSearch(page, xml.menuProductName)
+    selectDeviceFromHomePage(page, xml.menuProductName)
     # check for product tab (if we don't do this, it will move too quickly and the release selection won't take effect).
     productTab = page.locator("li").get_by_text(xml.menuProductName)
     expect(productTab).to_be_visible()
     # select the release
-    if xml.mcf is None:
-        selectRelease(page, xml.releaseNumber)
-    else:
-        selectRelease(page, f"{xml.releaseNumber} (MCF: {xml.mcf})")
+    selectRelease(page, releaseOption(xml))
     # check for correct number of top level pages (if we skip this, could search before pages have loaded)
     topLevelPages = page.locator("app-param-section")
     expect(topLevelPages).to_have_count(count=len(xml.getAllUserTopLevelPages()))
@@ -68,6 +102,7 @@ def _waitForAttribute(page, locator, attribute, attributeExpectedValue, timeout)
     else:
         return False
 
+@Timing.timed()
 def searchForParameterByCode(page: Page, param: Parameter):
     """
     Use Playwright to use the search bar to navigate to a particular parameter from the product page in Aladdin.
@@ -82,6 +117,7 @@ def searchForParameterByCode(page: Page, param: Parameter):
     searchResult.first.click()
 
 
+@Timing.timed()
 def selectPageForParameter(page: Page, param: Parameter):
     """
     Use Playwright to select the page for the given parameter from the product page in Aladdin.
@@ -125,5 +161,6 @@ def selectPageForParameter(page: Page, param: Parameter):
 # ThanhNT
 # 
 
+@Timing.timed()
 def clickButton(page: Page, param: Parameter):
     pass
\ No newline at end of file
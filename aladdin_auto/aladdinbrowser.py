@@ -1,4 +1,7 @@
-from playwright.sync_api import Browser, Page
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, Page
 
 
 class AladdinBrowser:
@@ -0,0 +1,135 @@
+"""
+This module contains methods to sample browser metrics over CDP: the memory used by the browser or the Aladdin
+Standalone Application between tests (the resident set size of the processes when the optional psutil package is
+installed, otherwise the JavaScript heap of the page reported by CDP Performance.getMetrics), and the performance
+metrics of a page reported for each test.
+"""
+from __future__ import annotations
+from typing import Iterable, Optional, Union
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, Page
+
+_MB = 1024 * 1024
+
+
+def performanceMetrics(page: Page) -> dict[str, float]:
+    """
+    Return the CDP Performance.getMetrics of page (e.g. JSHeapUsedSize, JSHeapTotalSize, Nodes, Documents).
+    """
+    session = page.context.new_cdp_session(page)
+    try:
+        session.send("Performance.enable")
+        metrics = session.send("Performance.getMetrics")["metrics"]
+    finally:
+        session.detach()
+    return {metric["name"]: metric["value"] for metric in metrics}
+
+
+def browserProcessIds(browser: Browser) -> list[int]:
+    """
+    Return the ids of the browser, renderer and utility processes of browser, from CDP SystemInfo.getProcessInfo.
+    """
+    session = browser.new_browser_cdp_session()
+    try:
+        processInfo = session.send("SystemInfo.getProcessInfo")["processInfo"]
+    finally:
+        session.detach()
+    return [info["id"] for info in processInfo]
+
+
+def processRssMb(pids: Iterable[int], includeChildren: bool = False) -> Union[float, None]:
+    """
+    Return the combined resident set size of the processes (unit = MB), or None if psutil is not installed.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    processes = {}
+    for pid in pids:
+        try:
+            process = psutil.Process(pid)
+            processes[pid] = process
+            if includeChildren:
+                for child in process.children(recursive=True):
+                    processes[child.pid] = child
+        except psutil.Error:
+            continue
+    total = 0
+    for process in processes.values():
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            # process exited while sampling
+            continue
+    return total / _MB
+
+
+def memoryUsageMb(browser: Browser, page: Page, pid: Union[int, None] = None) -> float:
+    """Return the memory used by browser (unit = MB).
+
+    :param pid: id of the application process (e.g. Aladdin.exe), whose child processes are included. If None, the
+        processes are found through CDP.
+    :return: resident set size of the processes if psutil is installed, otherwise JavaScript heap size of page
+    """
+    if pid is not None:
+        rss = processRssMb([pid], includeChildren=True)
+    else:
+        try:
+            rss = processRssMb(browserProcessIds(browser))
+        except Exception:
+            # SystemInfo domain not available (e.g. in some Electron versions)
+            rss = None
+    if rss is not None:
+        return rss
+    return performanceMetrics(page)["JSHeapTotalSize"] / _MB
+
+
+def recycleReason(testCount: int, memoryMb: Union[float, None], testCountLimit: int, memoryLimitMb: int) -> Union[str, None]:
+    """Decide whether a browser or application used by testCount tests should be restarted.
+
+    :param memoryMb: memory used after the last test, None if it was not sampled
+    :param testCountLimit: number of tests before a restart, ignored if -1
+    :param memoryLimitMb: memory above which it is restarted, ignored if -1
+    :return: reason of the restart, or None to keep using it
+    """
+    if testCountLimit > 0 and testCount >= testCountLimit:
+        return f"used by {testCount} tests"
+    if memoryLimitMb >= 0 and memoryMb is not None and memoryMb > memoryLimitMb:
+        return f"uses {memoryMb:.0f} MB"
+    return None
+
+
+_NAVIGATION_TIMINGS_SCRIPT = """() => {
+    const navigation = performance.getEntriesByType("navigation")[0];
+    return navigation ? {responseEnd: navigation.responseEnd, domContentLoaded: navigation.domContentLoadedEventEnd,
+                         load: navigation.loadEventEnd} : null;
+}"""
+
+# CDP metrics which add up over the lifetime of the page, reported as the difference over the test
+_CUMULATIVE_METRICS = {"ScriptDuration": "script_ms", "TaskDuration": "task_ms", "LayoutDuration": "layout_ms",
+                       "LayoutCount": "layout_count", "RecalcStyleCount": "recalc_style_count"}
+
+
+def pageMetrics(page: Page, before: Optional[dict[str, float]] = None) -> dict[str, float]:
+    """Return the metrics of page reported for a test: navigation timings of the last page load (unit = ms),
+    script, task and layout durations (unit = ms) and layout and style recalculation counts, JS heap used (unit = MB)
+    and DOM node count.
+
+    :param before: performanceMetrics of page sampled when the test started, to report the cumulative metrics of the
+        test only
+    """
+    metrics = performanceMetrics(page)
+    result = {}
+    navigation = page.evaluate(_NAVIGATION_TIMINGS_SCRIPT)
+    if navigation is not None:
+        result["response_ms"] = navigation["responseEnd"]
+        result["dom_content_loaded_ms"] = navigation["domContentLoaded"]
+        result["load_ms"] = navigation["load"]
+    for name, key in _CUMULATIVE_METRICS.items():
+        value = metrics.get(name, 0.0) - (before or {}).get(name, 0.0)
+        result[key] = value * 1000 if key.endswith("_ms") else value
+    result["js_heap_mb"] = metrics.get("JSHeapUsedSize", 0.0) / _MB
+    result["nodes"] = metrics.get("Nodes", 0.0)
+    return result
@@ -0,0 +1,249 @@
+"""
+This module contains the catalog index: a lightweight description of the product releases of the Aladdin data folder
+and of the parameters of their XMLs, read with iterparse without building the XML trees.
+
+The plugin uses it to parametrize tests over the catalog at collection time (tests requesting the catalogProduct or
+catalogParameter argument), while the ProductXML of a product release is only loaded when one of its tests runs.
+
+The index is also stored in the pytest cache folder, keyed by the names, sizes and modification times of the files of
+the data folder, so later sessions and the pytest-xdist workers read it instead of the XMLs. The cache file is a
+pickle: each process loads its own copy of the index, which is much faster than reading the XMLs.
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import xml.etree.ElementTree as ET
+from aladdin_auto.config import Config
+from aladdin_auto.parameter import Parameter
+from aladdin_auto.productxml import ProductXML
+
+# number of ProductXML objects kept in memory, tests of a product release usually run one after the other
+_PRODUCT_XML_CACHE_SIZE = 4
+# changed when the content of the index changes, to ignore the cache files of older versions
+_INDEX_VERSION = 2
+# catalog index of each data folder read in this process
+_indexes = {}
+
+
+def _readXML(xmlPath: str, productName: str) -> dict:
+    """
+    Read the parameters ([code, name, type, protection], in the order of the XML) and the number of top level pages
+    of an XML. Only the page elements are kept in memory while reading.
+    """
+    parameters = []
+    root = None
+    # tags of the open elements
+    stack = []
+    for event, elem in ET.iterparse(xmlPath, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            # parameters are the children of the parameters element of the root (see ProductXML)
+            elif elem.tag == "parameter" and len(stack) == 2 and stack[1] == "parameters":
+                attrib = elem.attrib
+                parameters.append([attrib.get("code", ""), attrib.get("name", ""), attrib.get("type", ""),
+                                   attrib.get("protection", "")])
+            stack.append(elem.tag)
+        else:
+            stack.pop()
+            if len(stack) == 1:
+                if elem.tag != "rootPage":
+                    root.remove(elem)
+            elif len(stack) > 1 and elem.tag != "page":
+                elem.clear()
+    pages = ProductXML.topLevelPages(root.find("rootPage"), productName)
+    return {"parameters": parameters, "topLevelPages": len(pages),
+            "userTopLevelPages": sum(1 for page in pages if ProductXML.isUserPage(page))}
+
+
+def buildCatalogIndex() -> dict:
+    """Read the catalog index of the data folder (see the data_folder_path option).
+
+    :return: {"menu": productsMenu.json tree, "products": [{"product": ..., "release": ..., "menu": ...,
+        "topLevelPages": ..., "userTopLevelPages": ..., "parameters": [[code, name, type, protection], ...]}, ...]}
+    """
+    products = []
+    for productName, releaseNumber, menuProductName in ProductXML.menuProducts():
+        xmlPath = ProductXML.xmlPath(productName, releaseNumber)
+        products.append({"product": productName, "release": releaseNumber, "menu": menuProductName,
+                         **_readXML(xmlPath, productName)})
+    with open(os.path.join(Config.dataFolderPath(), "productsMenu.json")) as f:
+        menu = json.load(f)
+    return {"menu": menu, "products": products}
+
+
+def dataFolderKey() -> str:
+    """
+    Key of the content of the data folder: hash of the names, sizes and modification times of products.json,
+    productsMenu.json and the XMLs.
+    """
+    dataFolderPath = os.path.abspath(Config.dataFolderPath())
+    digest = hashlib.sha256(f"{_INDEX_VERSION}\n{dataFolderPath}\n".encode("utf-8"))
+    files = [os.path.join(dataFolderPath, "products.json"), os.path.join(dataFolderPath, "productsMenu.json")]
+    repositoryPath = os.path.join(dataFolderPath, "ConfigRepository")
+    if os.path.isdir(repositoryPath):
+        with os.scandir(repositoryPath) as it:
+            for entry in it:
+                if entry.is_dir():
+                    files.append(os.path.join(entry.path, f"config_{entry.name}.xml"))
+    for path in sorted(files):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}\t{stat.st_size}\t{stat.st_mtime_ns}\n".encode("utf-8"))
+        except OSError:
+            digest.update(f"{path}\t-\n".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def _readCacheFile(path: str) -> dict:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _writeCacheFile(path: str, index: dict):
+    tmpPath = f"{path}.{os.getpid()}.tmp"
+    with open(tmpPath, "wb") as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    # readers see either no file or the complete file
+    os.replace(tmpPath, path)
+
+
+def catalogIndex(cacheFolder: str = None) -> dict:
+    """Return the catalog index of the data folder, read once per process.
+
+    :param cacheFolder: folder where the index is stored between sessions (e.g. in the pytest cache), not stored if None
+    """
+    dataFolderPath = Config.dataFolderPath()
+    if dataFolderPath in _indexes:
+        return _indexes[dataFolderPath]
+    index = None
+    if cacheFolder is not None:
+        prefix = _cacheFilePrefix(dataFolderPath)
+        cachePath = os.path.join(cacheFolder, f"{prefix}{dataFolderKey()}.pickle")
+        if os.path.isfile(cachePath):
+            try:
+                index = _readCacheFile(cachePath)
+            except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+                logging.warning(f"Ignoring invalid catalog cache {cachePath!r}: {e}")
+        if index is None:
+            index = buildCatalogIndex()
+            _removeCacheFiles(cacheFolder, prefix)
+            _writeCacheFile(cachePath, index)
+            logging.info(f"Catalog index written to {cachePath!r}")
+    else:
+        index = buildCatalogIndex()
+    _indexes[dataFolderPath] = index
+    return index
+
+
+def _cacheFilePrefix(dataFolderPath: str) -> str:
+    return f"catalog_{hashlib.sha256(os.path.abspath(dataFolderPath).encode('utf-8')).hexdigest()[:12]}_"
+
+
+def _removeCacheFiles(cacheFolder: str, prefix: str):
+    # the indexes of earlier contents of the data folder
+    for name in os.listdir(cacheFolder):
+        if name.startswith(prefix) and name.endswith(".pickle"):
+            try:
+                os.remove(os.path.join(cacheFolder, name))
+            except OSError:
+                # read by another worker on Windows
+                pass
+
+
+@functools.lru_cache(maxsize=_PRODUCT_XML_CACHE_SIZE)
+def loadProductXML(productName: str, releaseNumber: str, menuProductName: str) -> ProductXML:
+    """
+    Return the ProductXML of a product release, keeping the last used ones in memory.
+    """
+    return ProductXML(productName, releaseNumber, menuProductName)
+
+
+class CatalogProduct:
+    """
+    A product release of the catalog. Its ProductXML is loaded on first use.
+    """
+
+    def __init__(self, productName: str, releaseNumber: str, menuProductName: str, topLevelPages: int = None,
+                 userTopLevelPages: int = None) -> None:
+        self.productName = productName
+        self.releaseNumber = releaseNumber
+        self.menuProductName = menuProductName
+        # number of pages of ProductXML.getTopLevelPages and getAllUserTopLevelPages, from the index
+        self.topLevelPages = topLevelPages
+        self.userTopLevelPages = userTopLevelPages
+
+    @property
+    def id(self) -> str:
+        """
+        Test id of the product release (e.g. Magellan-9900i_DR9401563).
+        """
+        return f"{self.productName}_{self.releaseNumber}"
+
+    @property
+    def productXML(self) -> ProductXML:
+        return loadProductXML(self.productName, self.releaseNumber, self.menuProductName)
+
+    def __repr__(self) -> str:
+        return f"CatalogProduct({self.id!r})"
+
+
+class CatalogParameter:
+    """
+    A parameter of a product release of the catalog. Its Parameter and ProductXML are loaded on first use.
+    """
+
+    def __init__(self, product: CatalogProduct, code: str, name: str, type: str, protection: str) -> None:
+        self.product = product
+        # code as written in the XML (see Parameter.fromCode)
+        self.code = code
+        self.name = name
+        self.type = type
+        self.protection = protection
+        self._parameter = None
+
+    @property
+    def id(self) -> str:
+        """
+        Test id of the parameter (e.g. Magellan-9900i_DR9401563-0123).
+        """
+        return f"{self.product.id}-{self.code}"
+
+    @property
+    def productXML(self) -> ProductXML:
+        return self.product.productXML
+
+    @property
+    def parameter(self) -> Parameter:
+        if self._parameter is None:
+            self._parameter = Parameter.fromCode(self.productXML, self.code)
+        return self._parameter
+
+    def __repr__(self) -> str:
+        return f"CatalogParameter({self.id!r})"
+
+
+def _catalogProduct(entry: dict) -> CatalogProduct:
+    return CatalogProduct(entry["product"], entry["release"], entry["menu"], entry["topLevelPages"],
+                          entry["userTopLevelPages"])
+
+
+def catalogProducts(index: dict) -> list[CatalogProduct]:
+    """
+    Return the product releases of a catalog index.
+    """
+    return [_catalogProduct(entry) for entry in index["products"]]
+
+
+def catalogParameters(index: dict) -> list[CatalogParameter]:
+    """
+    Return the parameters of all product releases of a catalog index.
+    """
+    parameters = []
+    for entry in index["products"]:
+        product = _catalogProduct(entry)
+        parameters.extend(CatalogParameter(product, *fields) for fields in entry["parameters"])
+    return parameters
@@ -1,10 +1,13 @@
 from configparser import ConfigParser
 from enum import Enum
+import logging
 import os
-from typing import Type
-
-import pytest
-import argparse
+import threading
+from typing import Callable, Type
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    # pytest is only needed when Config is used by the pytest plugin
+    import pytest
 
 
 class AladdinBrowserType(Enum):
@@ -15,6 +18,47 @@ class AladdinBrowserType(Enum):
     def __str__(self):
         return self.value
 
+class ConfigSnapshot:
+    """
+    Immutable view of all options, as resolved from the config file, the command line and overrides from code.
+    Options are attributes named as in config.ini, e.g. ``Config.snapshot().primary_browser_port``.
+    """
+
+    def __init__(self, options: dict):
+        object.__setattr__(self, "_options", dict(options))
+        for option, value in options.items():
+            object.__setattr__(self, option, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Config snapshot is immutable, use Config.setOption to override {name!r}")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Config snapshot is immutable, {name!r} can't be deleted")
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ConfigSnapshot) and self._options == other._options
+
+    def __repr__(self) -> str:
+        return f"ConfigSnapshot({self._options!r})"
+
+    def asDict(self) -> dict:
+        """
+        Copy of all options of this snapshot.
+        """
+        return dict(self._options)
+
+    def changedOptions(self, other: "ConfigSnapshot") -> set[str]:
+        """
+        Names of options which have a different value in other.
+        """
+        return {option for option, value in self._options.items() if other._options.get(option) != value}
+
+class _UninitializedSnapshot:
+    # Stands in for the snapshot until the config file is read, so getters don't have to check for initialization
+    def __getattr__(self, name: str):
+        Config._initializeConfig()
+        return getattr(Config._snapshot, name)
+
 class Config:
 
     _strOptions = {
@@ -28,6 +72,21 @@ class Config:
         "tester_name": "",
         "test_log_folder_path" : "",
         "test_scanner_name" : "",
+        "statistics_db_path" : "",
+        "service_port_commands" : "",
+        "service_port_prompt" : "",
+        "timing_jsonl_path" : "",
+        "timing_prom_path" : "",
+        "web_storage_state_path" : "",
+        "network_block_resource_types" : "",
+        "network_block_url_patterns" : "",
+        "network_cache_folder_path" : "",
+        "network_cache_resource_types" : "script;stylesheet;font;image",
+        "network_mode" : "live",
+        "network_har_path" : "network/aladdin_web_app.har.zip",
+        "network_replay_not_found" : "abort",
+        "duration_history_path" : "",
+        "results_jsonl_path" : "",
     }
 
     _booleanOptions = {
@@ -37,11 +96,20 @@ class Config:
         "skip_context_tracing_on_expected": True,
         "context_tracing_screenshots": True,
         "context_tracing_snapshots": False,
-        "context_tracing_sources": False
+        "context_tracing_sources": False,
+        "capture_archive": False,
+        "timing_enabled": False,
+        "standalone_process_prewarm": False,
+        "browser_metrics": False,
+        "duration_regression_fail": False
     }
 
     _floatOptions = {
-        "slow_mo": 0
+        "slow_mo": 0,
+        "service_port_timeout_secs": 10,
+        "capture_interval_mins": 30,
+        "config_reload_secs": 0,
+        "duration_regression_ratio": 1.5
     }
 
     _intOptions = {
@@ -49,24 +117,53 @@ class Config:
         "secondary_browser_port": 9223,
         "standalone_startup_secs": 30,
         "secondary_browser_startup_secs": 5,
-        "trace_file_size_limit": -1
+        "trace_file_size_limit": -1,
+        "trace_file_count_limit": -1,
+        "trace_file_age_limit_days": -1,
+        "test_log_size_limit": -1,
+        "test_log_count_limit": -1,
+        "test_log_age_limit_days": -1,
+        "capture_archive_keyframe_interval": 48,
+        "standalone_process_usage_limit": 1,
+        "recycle_memory_limit_mb": -1,
+        "recycle_test_count": -1,
+        "worker_port_stride": 2,
+        "trace_queue_size": 4,
+        "trace_compress_level": 6,
+        "network_cache_size_limit": -1,
+        "duration_history_window": 20,
+        "sweep_page_count": 4
     }
 
     _defaultAladdinBrowserType = AladdinBrowserType.STANDALONE_APP
     _defaultAladdinWebBrowserType = AladdinBrowserType.WEBAPP_LOCAL
 
+    # defaults, restored before the config file is (re)read
+    _defaultOptions = (dict(_strOptions), dict(_booleanOptions), dict(_floatOptions), dict(_intOptions),
+                       _defaultAladdinBrowserType, _defaultAladdinWebBrowserType)
+
     _initialized = False
     _defaultSection = "ALADDIN_AUTO"
 
     _fullConfigDictionary = {}
+    _snapshot = _UninitializedSnapshot()
+
+    # options set from the command line or from code, applied again after each reload of the config file
+    _overrides = {}
+    _configPath = None
+    _configMtimeNs = None
+    _reloadLock = threading.RLock()
+    _subscribers = []
+    _hotReloadStop = None
 
     @staticmethod
-    def addCmdLineOptions(parser: pytest.Parser):
+    def addCmdLineOptions(parser: "pytest.Parser"):
         """Add options to cmd line parser
 
         :param parser: parser object
         :meta private:
         """
+        import argparse
         for option in Config._strOptions.keys():
             parser.addoption(f"--{option}", action="store", type=str)
         for option in Config._booleanOptions.keys():
@@ -79,7 +176,7 @@ class Config:
         parser.addoption("--web_browser_type", action="store", type=AladdinBrowserType, choices=list(AladdinBrowserType))
 
     @staticmethod
-    def processCmdLineOptions(config: pytest.Config):
+    def processCmdLineOptions(config: "pytest.Config"):
         """Update the config dictionaries with options from the command line
 
         :param config: pytest config object
@@ -87,29 +184,32 @@ class Config:
         """
         if not Config._initialized:
             Config._initializeConfig()
-        for option in Config._strOptions.keys():
-            value = config.getoption(f"--{option}", default=None)
-            if value is not None:
-                Config._strOptions[option] = value
-        for option in Config._booleanOptions.keys():
-            value = config.getoption(f"--{option}", default=None)
-            if value is not None:
-                Config._booleanOptions[option] = value
-        for option in Config._floatOptions.keys():
-            value = config.getoption(f"--{option}", default=None)
-            if value is not None:
-                Config._floatOptions[option] = value
-        for option in Config._intOptions.keys():
-            value = config.getoption(f"--{option}", default=None)
-            if value is not None:
-                Config._intOptions[option] = value
-        defaultBrowserTypeBrowserValue = config.getoption("--default_browser_type", default=None)
-        if defaultBrowserTypeBrowserValue is not None:
-            Config._defaultAladdinBrowserType = defaultBrowserTypeBrowserValue
-        webBrowserTypeBrowserValue = config.getoption("--web_browser_type", default=None)
-        if webBrowserTypeBrowserValue is not None:
-            Config._webAladdinBrowserType = webBrowserTypeBrowserValue
-        Config._createFullConfigDictionary()
+        with Config._reloadLock:
+            for option in Config._optionNames():
+                value = config.getoption(f"--{option}", default=None)
+                if value is not None:
+                    Config._applyOverride(option, value)
+                    Config._overrides[option] = value
+            Config._publishSnapshot()
+
+    @staticmethod
+    def _optionNames() -> list[str]:
+        return [*Config._strOptions, *Config._booleanOptions, *Config._floatOptions, *Config._intOptions,
+                "default_browser_type", "web_browser_type"]
+
+    @staticmethod
+    def _applyOverride(option: str, value):
+        if option == "default_browser_type":
+            Config._defaultAladdinBrowserType = AladdinBrowserType(str(value))
+        elif option == "web_browser_type":
+            Config._defaultAladdinWebBrowserType = AladdinBrowserType(str(value))
+        else:
+            for options in (Config._strOptions, Config._booleanOptions, Config._floatOptions, Config._intOptions):
+                if option in options:
+                    options[option] = value
+                    break
+            else:
+                raise ValueError(f"Unknown option: {option}")
 
     @staticmethod
     def _findFileInCwd(filename: str):
@@ -152,12 +252,14 @@ class Config:
 
     @staticmethod
     def _createFullConfigDictionary():
-        Config._fullConfigDictionary.update(Config._strOptions)
-        Config._fullConfigDictionary.update(Config._booleanOptions)
-        Config._fullConfigDictionary.update(Config._floatOptions)
-        Config._fullConfigDictionary.update(Config._intOptions)
-        Config._fullConfigDictionary["default_browser_type"] = Config._defaultAladdinBrowserType
-        Config._fullConfigDictionary["web_browser_type"] = Config._defaultAladdinWebBrowserType
+        fullConfigDictionary = {}
+        fullConfigDictionary.update(Config._strOptions)
+        fullConfigDictionary.update(Config._booleanOptions)
+        fullConfigDictionary.update(Config._floatOptions)
+        fullConfigDictionary.update(Config._intOptions)
+        fullConfigDictionary["default_browser_type"] = Config._defaultAladdinBrowserType
+        fullConfigDictionary["web_browser_type"] = Config._defaultAladdinWebBrowserType
+        Config._fullConfigDictionary = fullConfigDictionary
 
     @staticmethod
     def getFullConfigDictionary():
@@ -165,121 +267,326 @@ class Config:
 
         :meta private:
         """
+        if not Config._initialized:
+            Config._initializeConfig()
         return Config._fullConfigDictionary
 
+    @staticmethod
+    def _publishSnapshot():
+        # replace the snapshot in one assignment, so readers in other threads see either the old or the new options
+        Config._createFullConfigDictionary()
+        oldSnapshot = Config._snapshot
+        newSnapshot = ConfigSnapshot(Config._fullConfigDictionary)
+        Config._snapshot = newSnapshot
+        if not isinstance(oldSnapshot, ConfigSnapshot) or oldSnapshot == newSnapshot:
+            return
+        for callback in list(Config._subscribers):
+            try:
+                callback(oldSnapshot, newSnapshot)
+            except Exception:
+                logging.exception(f"Config subscriber {callback!r} failed")
+
+    @staticmethod
+    def _getConfigMtimeNs(path: str):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
     @staticmethod
     def _initializeConfig():
-        # mark as initialized
-        Config._initialized = True
-        # find location of config file
-        configName = "aladdin_config.ini"
-        fullConfigPath = Config._findFileInCwd(configName)
-        if fullConfigPath is None:
-            configName = "aladdin_config_default.ini"
+        with Config._reloadLock:
+            if Config._initialized:
+                return
+            # find location of config file
+            configName = "aladdin_config.ini"
             fullConfigPath = Config._findFileInCwd(configName)
+            if fullConfigPath is None:
+                configName = "aladdin_config_default.ini"
+                fullConfigPath = Config._findFileInCwd(configName)
+            Config._configPath = fullConfigPath
+            try:
+                Config._loadConfig()
+            except Exception:
+                # use the defaults, the config file is read again on its next modification (see reloadIfChanged)
+                logging.exception(f"Invalid config file {fullConfigPath}, using the default options")
+                for option, value in Config._overrides.items():
+                    Config._applyOverride(option, value)
+                Config._publishSnapshot()
+            # mark as initialized once the snapshot is published, getters read it without checking
+            Config._initialized = True
+
+    @staticmethod
+    def _loadConfig():
+        # restore defaults, read the config file and apply overrides again
+        previousOptions = (Config._strOptions, Config._booleanOptions, Config._floatOptions, Config._intOptions,
+                           Config._defaultAladdinBrowserType, Config._defaultAladdinWebBrowserType)
+        strOptions, booleanOptions, floatOptions, intOptions, browserType, webBrowserType = Config._defaultOptions
+        Config._strOptions = dict(strOptions)
+        Config._booleanOptions = dict(booleanOptions)
+        Config._floatOptions = dict(floatOptions)
+        Config._intOptions = dict(intOptions)
+        Config._defaultAladdinBrowserType = browserType
+        Config._defaultAladdinWebBrowserType = webBrowserType
+
+        fullConfigPath = Config._configPath
+        try:
+            if fullConfigPath is not None:
+                # read before parsing, so a change during parsing is picked up by the next reload
+                Config._configMtimeNs = Config._getConfigMtimeNs(fullConfigPath)
+                configParser = ConfigParser()
+                configParser.read(fullConfigPath)
+                for option in Config._strOptions.keys():
+                    Config._setStrOption(configParser, option)
+                for option in Config._booleanOptions.keys():
+                    Config._setBooleanOption(configParser, option)
+                for option in Config._floatOptions.keys():
+                    Config._setFloatOption(configParser, option)
+                for option in Config._intOptions.keys():
+                    Config._setIntOption(configParser, option)
+                Config._defaultAladdinBrowserType = Config._getEnumOption(configParser, AladdinBrowserType, "default_browser_type", AladdinBrowserType.STANDALONE_APP)
+                Config._defaultAladdinWebBrowserType = Config._getEnumOption(configParser, AladdinBrowserType, "web_browser_type", AladdinBrowserType.STANDALONE_APP)
+        except Exception:
+            # keep the previous options if the config file is invalid (e.g. while it is being edited),
+            # it is read again on its next modification
+            (Config._strOptions, Config._booleanOptions, Config._floatOptions, Config._intOptions,
+             Config._defaultAladdinBrowserType, Config._defaultAladdinWebBrowserType) = previousOptions
+            raise
+        for option, value in Config._overrides.items():
+            Config._applyOverride(option, value)
+        Config._publishSnapshot()
+
+    @staticmethod
+    def _splitListOption(value: str) -> list[str]:
+        return [item.strip() for item in value.split(";") if item.strip()]
+
+    @staticmethod
+    def snapshot() -> ConfigSnapshot:
+        """
+        Current immutable snapshot of all options. The snapshot is replaced (not modified) when the config file is
+        reloaded or an option is overridden, so a snapshot can be kept to read consistent options.
+        """
+        if not Config._initialized:
+            Config._initializeConfig()
+        return Config._snapshot
 
-        if fullConfigPath is not None:
-            configParser = ConfigParser()
-            configParser.read(fullConfigPath)
-            for option in Config._strOptions.keys():
-                Config._setStrOption(configParser, option)
-            for option in Config._booleanOptions.keys():
-                Config._setBooleanOption(configParser, option)
-            for option in Config._floatOptions.keys():
-                Config._setFloatOption(configParser, option)
-            for option in Config._intOptions.keys():
-                Config._setIntOption(configParser, option)
-            Config._defaultAladdinBrowserType = Config._getEnumOption(configParser, AladdinBrowserType, "default_browser_type", AladdinBrowserType.STANDALONE_APP)
-            Config._defaultAladdinWebBrowserType = Config._getEnumOption(configParser, AladdinBrowserType, "web_browser_type", AladdinBrowserType.STANDALONE_APP)
-        Config._createFullConfigDictionary()
+    @staticmethod
+    def reloadIfChanged() -> bool:
+        """
+        Read the config file again if it was modified since it was last read. Options overridden from the command line
+        or from code keep their value. Subscribers are notified if any option changed.
+
+        :return: True if the config file was read again
+        """
+        if not Config._initialized:
+            Config._initializeConfig()
+            return False
+        if Config._configPath is None:
+            return False
+        with Config._reloadLock:
+            if Config._getConfigMtimeNs(Config._configPath) == Config._configMtimeNs:
+                return False
+            logging.info(f"Reloading config file {Config._configPath}")
+            Config._loadConfig()
+        return True
 
     @staticmethod
-    def aladdinStandalonePath() -> str:
+    def subscribe(callback: Callable[[ConfigSnapshot, ConfigSnapshot], None]):
         """
-        Path to Aladdin standalone application.
+        Call callback(oldSnapshot, newSnapshot) whenever an option changes. Callbacks are called from the thread that
+        reloaded the config file (see startHotReload) or overrode the option.
+        """
+        if callback not in Config._subscribers:
+            Config._subscribers.append(callback)
+
+    @staticmethod
+    def unsubscribe(callback: Callable[[ConfigSnapshot, ConfigSnapshot], None]):
         """
+        Stop calling a callback registered with subscribe.
+        """
+        if callback in Config._subscribers:
+            Config._subscribers.remove(callback)
+
+    @staticmethod
+    def startHotReload(intervalSecs: float):
+        """
+        Check the modification time of the config file every intervalSecs seconds in a daemon thread and reload it
+        when it changes. No effect if hot reload is already running.
+        """
+        if Config._hotReloadStop is not None:
+            return
         if not Config._initialized:
             Config._initializeConfig()
-        return Config._strOptions["standalone_path"]
+        stop = threading.Event()
+
+        def watchConfigFile():
+            while not stop.wait(intervalSecs):
+                try:
+                    Config.reloadIfChanged()
+                except Exception:
+                    logging.exception(f"Failed to reload config file {Config._configPath}")
+
+        Config._hotReloadStop = stop
+        threading.Thread(target=watchConfigFile, name="ConfigHotReload", daemon=True).start()
+
+    @staticmethod
+    def stopHotReload():
+        """
+        Stop the thread started by startHotReload.
+        """
+        stop = Config._hotReloadStop
+        if stop is not None:
+            stop.set()
+            Config._hotReloadStop = None
+
+    @staticmethod
+    def aladdinStandalonePath() -> str:
+        """
+        Path to Aladdin standalone application.
+        """
+        return Config._snapshot.standalone_path
 
     @staticmethod
     def aladdinWebAppPath() -> str:
         """
         Path to index.html of Aladdin web application.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._strOptions["webapp_path"]
+        return Config._snapshot.webapp_path
 
     @staticmethod
     def dataFolderPath() -> str:
         """
         Path to assets/data folder of Aladdin application.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._strOptions["data_folder_path"]
+        return Config._snapshot.data_folder_path
 
     @staticmethod
     def reportName() -> str:
         """
         Name of report. Leave blank if default timestamped report should be used.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._strOptions["report_name"]
+        return Config._snapshot.report_name
 
     @staticmethod
     def webUrl() -> str:
         """
         URL of Aladdin web application.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._strOptions["web_url"]
+        return Config._snapshot.web_url
 
     @staticmethod
     def traceFolderPath() -> str:
         """
         Path to folder where traces should be saved.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._strOptions["trace_folder_path"]
+        return Config._snapshot.trace_folder_path
 
     @staticmethod
     def reportFolderPath() -> str:
         """
         Path to folder where reports should be saved.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._strOptions["report_folder_path"]
+        return Config._snapshot.report_folder_path
 
     @staticmethod
     def testerName() -> str:
         """
         Name of tester executing the test.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._strOptions["tester_name"]
+        return Config._snapshot.tester_name
 
     @staticmethod
     def setTesterName(name: str):
         """
         Used for overriding the tester name option.
         """
-        Config._strOptions["tester_name"] = name
+        Config.setOption("tester_name", name)
 
     @staticmethod
-    def headless() -> bool:
+    def setOption(option: str, value):
         """
-        True to run in headless mode. Only applicable for web version of Aladdin.
+        Used for overriding any option from code (e.g. benchmarks or scripts), like from the command line.
+        The override is kept when the config file is reloaded.
+
+        :param option: name of option as written in config.ini (e.g. "webapp_path")
+        :param value: new value of option
         """
         if not Config._initialized:
             Config._initializeConfig()
-        return Config._booleanOptions["headless"]
+        with Config._reloadLock:
+            Config._applyOverride(option, value)
+            Config._overrides[option] = value
+            Config._publishSnapshot()
+
+    @staticmethod
+    def headless() -> bool:
+        """
+        True to run in headless mode. Only applicable for web version of Aladdin.
+        """
+        return Config._snapshot.headless
+
+    @staticmethod
+    def webStorageStatePath() -> str:
+        """
+        Path to a storage state file (cookies and local storage) used to initialize the browser context of each web test. Created by navigating to the web application once if it doesn't exist. Ignored if blank.
+        """
+        return Config._snapshot.web_storage_state_path
+
+    @staticmethod
+    def networkBlockResourceTypes() -> list[str]:
+        """
+        Resource types (e.g. image, font, media) of the requests aborted by the web browser, separated by ';'.
+        """
+        return Config._splitListOption(Config._snapshot.network_block_resource_types)
+
+    @staticmethod
+    def networkBlockUrlPatterns() -> list[str]:
+        """
+        Glob patterns of the URLs of the requests aborted by the web browser (e.g. *google-analytics*), separated by ';'.
+        """
+        return Config._splitListOption(Config._snapshot.network_block_url_patterns)
+
+    @staticmethod
+    def networkCacheFolderPath() -> str:
+        """
+        Path to folder where static assets of the web application are cached on first use and served from on the next requests. Disabled if blank.
+        """
+        return Config._snapshot.network_cache_folder_path
+
+    @staticmethod
+    def networkCacheResourceTypes() -> list[str]:
+        """
+        Resource types of the requests served from the asset cache, separated by ';'.
+        """
+        return Config._splitListOption(Config._snapshot.network_cache_resource_types)
+
+    @staticmethod
+    def networkCacheSizeLimit() -> int:
+        """
+        Maximum size of the asset cache in KB. The least recently used assets above this size are deleted at the end of the test session. Ignored if -1.
+        """
+        return Config._snapshot.network_cache_size_limit
+
+    @staticmethod
+    def networkMode() -> str:
+        """
+        "live" to load the web application from the network, or "replay" to serve every request from the archive recorded with scripts/record_web_app.py (see network_har_path).
+        """
+        return Config._snapshot.network_mode
+
+    @staticmethod
+    def networkHarPath() -> str:
+        """
+        Path to the HAR archive of the web application, written by scripts/record_web_app.py and read in replay network mode. Response bodies are stored in the archive if the path ends with .zip.
+        """
+        return Config._snapshot.network_har_path
+
+    @staticmethod
+    def networkReplayNotFound() -> str:
+        """
+        What to do in replay network mode with a request missing from the archive: "abort" it (fully offline) or "fallback" to the network.
+        """
+        return Config._snapshot.network_replay_not_found
 
     @staticmethod
     def skipNotDefaultBrowser() -> bool:
@@ -287,143 +594,321 @@ class Config:
         If True, tests that require a browser other than the default specified in config.ini will be skipped.
         Otherwise, those tests will be run with the browser specified by that test.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._booleanOptions["skip_not_default_browser"]
+        return Config._snapshot.skip_not_default_browser
 
     @staticmethod
     def contextTracing() -> bool:
         """
         If True, context tracing will be started before Aladdin page is opened.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._booleanOptions["context_tracing"]
+        return Config._snapshot.context_tracing
 
     @staticmethod
     def skipContextTracingOnExpected() -> bool:
         """
         If True, context tracing will only be saved when test outcome is unexpected (if failed usually, unless test is marked as xfail). No effect if "context_tracing" is not True.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._booleanOptions["skip_context_tracing_on_expected"]
+        return Config._snapshot.skip_context_tracing_on_expected
 
     @staticmethod
     def contextTracingScreenshots() -> bool:
         """
         Whether to capture screenshots during tracing. Screenshots are used to build a timeline preview.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._booleanOptions["context_tracing_screenshots"]
+        return Config._snapshot.context_tracing_screenshots
 
     @staticmethod
     def contextTracingSnapshots() -> bool:
         """
         If True, this option will capture DOM snapshot on every action (doesn't seem to display properly for Aladdin), and record network activity.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._booleanOptions["context_tracing_snapshots"]
+        return Config._snapshot.context_tracing_snapshots
 
     @staticmethod
     def contextTracingSources() -> bool:
         """
         Whether to include source files for trace actions.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._booleanOptions["context_tracing_sources"]
+        return Config._snapshot.context_tracing_sources
+
+    @staticmethod
+    def browserMetrics() -> bool:
+        """
+        If True, browser metrics of each test (page load timings, script and layout time, JS heap, DOM nodes) are collected over CDP, shown in the report table and written next to the report in a JSON lines file.
+        """
+        return Config._snapshot.browser_metrics
+
+    @staticmethod
+    def resultsJsonlPath() -> str:
+        """
+        Path to JSON lines file where the result of each test (outcome, durations, config hash, artifacts) is written as soon as it finishes. Summarize it with scripts/summarize_results.py. Disabled if blank.
+        """
+        return Config._snapshot.results_jsonl_path
+
+    @staticmethod
+    def sweepPageCount() -> int:
+        """
+        Number of parallel pages of the aladdinSweep fixture, which checks parameters of a product release in the web application.
+        """
+        return Config._snapshot.sweep_page_count
+
+    @staticmethod
+    def durationHistoryPath() -> str:
+        """
+        Path to SQLite file where the durations of the passed tests are kept across test sessions, to find performance regressions. Disabled if blank.
+        """
+        return Config._snapshot.duration_history_path
+
+    @staticmethod
+    def durationHistoryWindow() -> int:
+        """
+        Number of durations kept per test and phase in the duration history. The baseline of a test is the median of these durations.
+        """
+        return Config._snapshot.duration_history_window
+
+    @staticmethod
+    def durationRegressionRatio() -> float:
+        """
+        Minimum ratio between the duration of a test and its baseline for a performance regression.
+        """
+        return Config._snapshot.duration_regression_ratio
+
+    @staticmethod
+    def durationRegressionFail() -> bool:
+        """
+        If True, the test session exits with a failure code when a performance regression is found, even if all tests passed.
+        """
+        return Config._snapshot.duration_regression_fail
 
     @staticmethod
     def slowMo() -> float:
         """
         Slows down Playwright by the specified amount of milliseconds. Only applicable for web version of Aladdin.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._floatOptions["slow_mo"]
+        return Config._snapshot.slow_mo
 
     @staticmethod
     def primaryBrowserPort() -> int:
         """
         Primary browser port for Aladdin Standalone Application. Should match value in Aladdin's config.properties file.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._intOptions["primary_browser_port"]
+        return Config._snapshot.primary_browser_port
 
     @staticmethod
     def secondaryBrowserPort() -> int:
         """
         Secondary browser port for Aladdin Standalone Application. Should match value in Aladdin's config.properties file.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._intOptions["secondary_browser_port"]
+        return Config._snapshot.secondary_browser_port
+
+    @staticmethod
+    def workerPortStride() -> int:
+        """
+        Difference between the browser ports of two consecutive pytest-xdist workers, e.g. with 2, worker gw1 uses primary_browser_port + 2 and secondary_browser_port + 2.
+        """
+        return Config._snapshot.worker_port_stride
 
     @staticmethod
     def standaloneStartupSecs() -> int:
         """
         Number of seconds to wait for Aladdin Standalone Application to startup.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._intOptions["standalone_startup_secs"]
+        return Config._snapshot.standalone_startup_secs
+
+    @staticmethod
+    def standaloneProcessUsageLimit() -> int:
+        """
+        Number of tests an Aladdin Standalone Application process is used for before it is restarted. Between tests the application is reset to the home page. A process is always restarted after a failed test. Unlimited if -1.
+        """
+        return Config._snapshot.standalone_process_usage_limit
+
+    @staticmethod
+    def recycleMemoryLimitMb() -> int:
+        """
+        Memory in MB used by the web browser or Aladdin Standalone Application, sampled after each test, above which it is restarted before the next test. Ignored if -1.
+        """
+        return Config._snapshot.recycle_memory_limit_mb
+
+    @staticmethod
+    def recycleTestCount() -> int:
+        """
+        Number of tests the web browser is used for before it is relaunched (see standalone_process_usage_limit for the Aladdin Standalone Application). Ignored if -1.
+        """
+        return Config._snapshot.recycle_test_count
+
+    @staticmethod
+    def standaloneProcessPrewarm() -> bool:
+        """
+        If True, the Aladdin Standalone Application is started when the tests are collected, and restarted as soon as a process is recycled, so tests don't wait for its startup.
+        """
+        return Config._snapshot.standalone_process_prewarm
 
     @staticmethod
     def secondaryBrowserStartupSecs() -> int:
         """
         Number of seconds to wait for Aladdin Standalone Application secondary browser to startup.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._intOptions["secondary_browser_startup_secs"]
+        return Config._snapshot.secondary_browser_startup_secs
 
     @staticmethod
     def traceFileSizeLimit() -> int:
         """
         Maximum file size of combined trace (zip) files in traces folder in KB. Any more than this will be deleted. Ignored if -1.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._intOptions["trace_file_size_limit"]
+        return Config._snapshot.trace_file_size_limit
     
+    @staticmethod
+    def traceFileCountLimit() -> int:
+        """
+        Maximum number of trace (zip) files in traces folder. The oldest traces above this number will be deleted. Ignored if -1.
+        """
+        return Config._snapshot.trace_file_count_limit
+
+    @staticmethod
+    def traceFileAgeLimitDays() -> int:
+        """
+        Maximum age of trace (zip) files in traces folder in days. Older traces will be deleted. Ignored if -1.
+        """
+        return Config._snapshot.trace_file_age_limit_days
+
+    @staticmethod
+    def traceQueueSize() -> int:
+        """
+        Number of traces waiting to be compressed, indexed and pruned in the background above which the test teardown waits. Traces are finalized during the teardown if 0.
+        """
+        return Config._snapshot.trace_queue_size
+
+    @staticmethod
+    def traceCompressLevel() -> int:
+        """
+        Compression level (1-9) of the trace (zip) files. Traces are kept as written by Playwright if 0.
+        """
+        return Config._snapshot.trace_compress_level
+
+    @staticmethod
+    def testLogSizeLimit() -> int:
+        """
+        Maximum combined size of capture logs (or daily capture archive segments) in each scanner log folder in KB. The oldest logs above this size will be deleted. Ignored if -1.
+        """
+        return Config._snapshot.test_log_size_limit
+
+    @staticmethod
+    def testLogCountLimit() -> int:
+        """
+        Maximum number of capture logs (or daily capture archive segments) in each scanner log folder. The oldest logs above this number will be deleted. Ignored if -1.
+        """
+        return Config._snapshot.test_log_count_limit
+
+    @staticmethod
+    def testLogAgeLimitDays() -> int:
+        """
+        Maximum age of capture logs (or daily capture archive segments) in days. Older logs will be deleted. Ignored if -1.
+        """
+        return Config._snapshot.test_log_age_limit_days
+
     @staticmethod
     def testLogsFolderPath() -> int:
         """
         Test logs folder path
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._strOptions["test_log_folder_path"]
+        return Config._snapshot.test_log_folder_path
     
     @staticmethod
     def testScannerName() -> int:
         """
         Test logs folder path
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._strOptions["test_scanner_name"]
+        return Config._snapshot.test_scanner_name
+
+    @staticmethod
+    def statisticsDbPath() -> str:
+        """
+        Path to SQLite time-series store where parsed scanner statistics are appended after each capture. Disabled if blank.
+        """
+        return Config._snapshot.statistics_db_path
+
+    @staticmethod
+    def captureArchive() -> bool:
+        """
+        If True, captures are appended to a compressed, deduplicated archive per scanner and day instead of one text file per capture.
+        """
+        return Config._snapshot.capture_archive
+
+    @staticmethod
+    def captureArchiveKeyframeInterval() -> int:
+        """
+        Number of captures between two full (non delta) captures in the capture archive.
+        """
+        return Config._snapshot.capture_archive_keyframe_interval
+
+    @staticmethod
+    def servicePortCommands() -> list[str]:
+        """
+        Service port commands sent through the terminal on each capture, separated by ';'.
+        """
+        return Config._splitListOption(Config._snapshot.service_port_commands)
+
+    @staticmethod
+    def servicePortPrompt() -> str:
+        """
+        Prompt printed by the terminal when a service port command is complete. Leave blank to wait until the terminal text stops changing.
+        """
+        return Config._snapshot.service_port_prompt
+
+    @staticmethod
+    def servicePortTimeoutSecs() -> float:
+        """
+        Maximum number of seconds to wait for the responses of a batch of service port commands.
+        """
+        return Config._snapshot.service_port_timeout_secs
+
+    @staticmethod
+    def timingEnabled() -> bool:
+        """
+        If True, time spent in the controller steps and aladdin_auto actions is recorded for each capture cycle or test.
+        """
+        return Config._snapshot.timing_enabled
+
+    @staticmethod
+    def timingJsonlPath() -> str:
+        """
+        Path to JSON lines file where the timings of each capture cycle or test are appended. Ignored if blank.
+        """
+        return Config._snapshot.timing_jsonl_path
+
+    @staticmethod
+    def timingPromPath() -> str:
+        """
+        Path to Prometheus text file (e.g. in the node exporter textfile collector folder) rewritten after each capture cycle or test. Ignored if blank.
+        """
+        return Config._snapshot.timing_prom_path
+
+    @staticmethod
+    def captureIntervalMins() -> float:
+        """
+        Period between two captures of the controller in minutes. Only one capture is made if 0.
+        """
+        return Config._snapshot.capture_interval_mins
+
+    @staticmethod
+    def configReloadSecs() -> float:
+        """
+        Period in seconds between two checks of the config file by a running controller, which reloads the file when it changes. Disabled if 0.
+        """
+        return Config._snapshot.config_reload_secs
 
     @staticmethod
     def defaultAladdinBrowserType() -> AladdinBrowserType:
         """
         Default type of Aladdin browser to launch for tests.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._defaultAladdinBrowserType
+        return Config._snapshot.default_browser_type
 
     @staticmethod
     def defaultAladdinWebBrowserType() -> AladdinBrowserType:
         """
         Default type of Aladdin browser to launch for web only tests.
         """
-        if not Config._initialized:
-            Config._initializeConfig()
-        return Config._defaultAladdinWebBrowserType
+        return Config._snapshot.web_browser_type
     
     
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+This module keeps the durations of the tests across test sessions in a SQLite file (see the duration_history_path
+option), and compares the durations of a session to the earlier ones to find performance regressions.
+
+Only the durations of passed tests are kept, the last duration_history_window ones per test and phase (setup, call,
+teardown and total). The baseline of a test phase is the median of its kept durations, and a duration is a regression
+when it is above the baseline by more than duration_regression_ratio and above the spread of the earlier durations.
+"""
+import logging
+import os
+import sqlite3
+import statistics
+from datetime import datetime
+from typing import Dict, Tuple
+
+PHASES = ("setup", "call", "teardown")
+# number of earlier durations needed to compare a test phase
+MIN_SAMPLES = 5
+# slowdowns smaller than this are ignored, whatever the ratio (unit = s)
+MIN_SLOWDOWN_SECS = 0.05
+# number of median absolute deviations above the baseline that is not considered noise
+_MAD_FACTOR = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started TEXT NOT NULL,
+    test_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS durations (
+    test TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    PRIMARY KEY (test, phase, run_id)
+) WITHOUT ROWID;
+"""
+
+_PRUNE = """
+DELETE FROM durations WHERE (test, phase, run_id) IN (
+    SELECT test, phase, run_id FROM (
+        SELECT test, phase, run_id,
+               ROW_NUMBER() OVER (PARTITION BY test, phase ORDER BY run_id DESC) AS rank
+        FROM durations WHERE test = ?
+    ) WHERE rank > ?
+)
+"""
+
+
+class Regression:
+    """
+    A test phase slower than its baseline.
+    """
+
+    def __init__(self, test: str, phase: str, duration: float, baseline: float, samples: int) -> None:
+        self.test = test
+        self.phase = phase
+        # duration in this session (unit = s)
+        self.duration = duration
+        # median of the earlier durations (unit = s)
+        self.baseline = baseline
+        # number of earlier durations
+        self.samples = samples
+
+    @property
+    def ratio(self) -> float:
+        return self.duration / self.baseline if self.baseline > 0 else float("inf")
+
+    def __str__(self) -> str:
+        return f"{self.test} ({self.phase}): {self.duration:.2f} s, baseline {self.baseline:.2f} s ({self.ratio:.1f}x)"
+
+
+def isRegression(duration: float, earlier: list[float], ratio: float) -> bool:
+    """Decide whether duration is significantly slower than the earlier durations of the same test phase.
+
+    :param earlier: earlier durations, at least MIN_SAMPLES
+    :param ratio: minimum ratio between duration and the median of the earlier durations
+    """
+    baseline = statistics.median(earlier)
+    mad = statistics.median(abs(value - baseline) for value in earlier)
+    return (duration > baseline * ratio
+            and duration - baseline > MIN_SLOWDOWN_SECS
+            and duration - baseline > _MAD_FACTOR * mad)
+
+
+class DurationHistory:
+    """
+    Durations of the tests of the current session, compared to and then added to the history file.
+    """
+
+    def __init__(self, path: str, window: int = 20) -> None:
+        """
+        :param path: path to the SQLite file (created if it does not exist)
+        :param window: number of durations kept per test phase
+        """
+        self.path = path
+        self._window = max(window, MIN_SAMPLES)
+        # {test: {phase: duration}} of the passed tests of this session
+        self._durations: Dict[str, Dict[str, float]] = {}
+        self._failed = set()
+
+    def add(self, test: str, phase: str, duration: float, passed: bool):
+        """
+        Record the duration of a phase of a test of this session. Tests with a failed or skipped phase are not kept.
+        """
+        if not passed:
+            self._failed.add(test)
+        else:
+            self._durations.setdefault(test, {})[phase] = duration
+
+    def sessionDurations(self) -> Dict[str, Dict[str, float]]:
+        """
+        Durations of the passed tests of this session, including a "total" phase.
+        """
+        result = {}
+        for test, phases in self._durations.items():
+            if test in self._failed or not all(phase in phases for phase in PHASES):
+                continue
+            result[test] = dict(phases, total=sum(phases[phase] for phase in PHASES))
+        return result
+
+    def _connect(self) -> sqlite3.Connection:
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        connection = sqlite3.connect(self.path)
+        # several sessions (e.g. on a shared drive) may finish at the same time
+        connection.execute("PRAGMA busy_timeout=10000")
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def findRegressions(self, ratio: float) -> list[Regression]:
+        """Compare the durations of this session to the stored ones.
+
+        :param ratio: minimum ratio between a duration and its baseline
+        :return: regressions, slowest first
+        """
+        sessionDurations = self.sessionDurations()
+        if not sessionDurations or not os.path.exists(self.path):
+            return []
+        regressions = []
+        connection = self._connect()
+        try:
+            for test, phases in sessionDurations.items():
+                for phase, duration in phases.items():
+                    earlier = [row[0] for row in connection.execute(
+                        "SELECT duration FROM durations WHERE test = ? AND phase = ? ORDER BY run_id DESC LIMIT ?",
+                        (test, phase, self._window))]
+                    if len(earlier) >= MIN_SAMPLES and isRegression(duration, earlier, ratio):
+                        regressions.append(Regression(test, phase, duration, statistics.median(earlier), len(earlier)))
+        finally:
+            connection.close()
+        return sorted(regressions, key=lambda regression: regression.ratio, reverse=True)
+
+    def save(self, started: datetime) -> Tuple[int, int]:
+        """Append the durations of this session to the history file and drop the durations beyond the window.
+
+        :return: tuple of the run id and the number of saved tests
+        """
+        sessionDurations = self.sessionDurations()
+        connection = self._connect()
+        try:
+            with connection:
+                runId = connection.execute("INSERT INTO runs (started, test_count) VALUES (?, ?)",
+                                           (started.strftime('%Y-%m-%d %H:%M:%S'), len(sessionDurations))).lastrowid
+                connection.executemany("INSERT INTO durations (test, phase, run_id, duration) VALUES (?, ?, ?, ?)",
+                                       [(test, phase, runId, duration)
+                                        for test, phases in sessionDurations.items()
+                                        for phase, duration in phases.items()])
+                for test in sessionDurations:
+                    connection.execute(_PRUNE, (test, self._window))
+        finally:
+            connection.close()
+        logging.info(f"Saved durations of {len(sessionDurations)} tests to {self.path!r}")
+        return runId, len(sessionDurations)
@@ -1,5 +1,4 @@
-import os
-import glob
+from aladdin_auto.retention import RetentionEngine, RetentionPolicy
 
 class FileUtils:
     """
@@ -15,27 +14,22 @@ class FileUtils:
         :param maxSize: desired maximum size of directory in bytes
         :meta private:
         """
-        if not searchPath.endswith("/"):
-            searchPath += "/"
-        files = list(filter(os.path.isfile, glob.glob(searchPath + "*.zip")))
-        files.sort(key=lambda x: os.path.getmtime(x))
-        currentSize = FileUtils._getSize(files)
-        fileIndex = 0
-        while currentSize > maxSize and fileIndex < len(files):
-            oldestFile = files[fileIndex]
-            fileSize = os.path.getsize(oldestFile)
-            os.remove(oldestFile)
-            fileIndex+=1
-            currentSize -= fileSize
+        FileUtils.pruneFolder(searchPath, "*.zip", maxBytes=maxSize)
 
     @staticmethod
-    def _getSize(filelist):
-        totalSize = 0
-        for file in filelist:
-            # skip if it is symbolic link
-            if not os.path.islink(file):
-                try:
-                    totalSize += os.path.getsize(file)
-                except FileNotFoundError:
-                    pass
-        return totalSize
+    def pruneFolder(folder: str, pattern: str, maxBytes: int = -1, maxAgeSecs: float = -1, maxCount: int = -1, newFile: str = None):
+        """Deletes the oldest files matching pattern from the directory until the size, age and count limits are
+        respected. Limits lower than 0 are ignored.
+
+        :param folder: path to directory to delete files from
+        :param pattern: glob pattern of the files to consider (e.g. "*.zip")
+        :param maxBytes: desired maximum size of the files in bytes
+        :param maxAgeSecs: desired maximum age of the files in seconds
+        :param maxCount: desired maximum number of files
+        :param newFile: path to a file just written in the directory, recorded without rescanning the directory
+        :return: list of deleted paths
+        :meta private:
+        """
+        if newFile is not None:
+            RetentionEngine.recordFile(newFile, pattern)
+        return RetentionEngine.prune(folder, pattern, RetentionPolicy(maxBytes, maxAgeSecs, maxCount))
@@ -0,0 +1,158 @@
+"""
+This module contains the local cache of static assets (scripts, stylesheets, fonts, images) of the Aladdin web
+application, used by the network routing of the web browsers (see webbrowser.configureRouting).
+
+Asset bodies are stored once per content under objects/<sha256[:2]>/<sha256>, and each cached URL has a small JSON
+entry under urls/ with the hash, status and headers of its response. Every file is written then renamed, so the cache
+can be shared by parallel test workers.
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+# headers which don't apply to the decoded body served from the cache
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+# Cache-Control directives of responses which must not be stored in a shared cache
+_NOT_STORED_DIRECTIVES = {"no-store", "private"}
+
+
+def _atomicWrite(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmpPath = f"{path}.{os.getpid()}.tmp"
+    with open(tmpPath, "wb") as f:
+        f.write(data)
+    os.replace(tmpPath, path)
+
+
+class AssetCache:
+    """
+    Content-addressed cache of HTTP responses, keyed by URL.
+    """
+
+    def __init__(self, folder: str) -> None:
+        self.folder = folder
+        self._objectsFolder = os.path.join(folder, "objects")
+        self._urlsFolder = os.path.join(folder, "urls")
+
+    @staticmethod
+    def _urlKey(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _entryPath(self, url: str) -> str:
+        return os.path.join(self._urlsFolder, f"{self._urlKey(url)}.json")
+
+    def _objectPath(self, digest: str) -> str:
+        return os.path.join(self._objectsFolder, digest[:2], digest)
+
+    def get(self, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """
+        Return (status, headers, body) of the cached response of url, or None if it is not cached.
+        """
+        entryPath = self._entryPath(url)
+        try:
+            with open(entryPath, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(self._objectPath(entry["sha256"]), "rb") as f:
+                body = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        # last use, for pruning (explicit time, the file system clock can be coarse)
+        now = time.time()
+        os.utime(entryPath, (now, now))
+        return entry["status"], entry["headers"], body
+
+    @staticmethod
+    def isStorable(headers: Dict[str, str]) -> bool:
+        """
+        False if the Cache-Control header of a response forbids storing it (no-store or private).
+        """
+        for name, value in headers.items():
+            if name.lower() == "cache-control":
+                directives = {directive.split("=", 1)[0].strip().lower() for directive in value.split(",")}
+                if directives & _NOT_STORED_DIRECTIVES:
+                    return False
+        return True
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> bool:
+        """
+        Store the response of url, unless its headers forbid it (see isStorable). The body is only written if no other
+        URL has the same content.
+
+        :return: True if the response was stored
+        """
+        if not self.isStorable(headers):
+            return False
+        digest = hashlib.sha256(body).hexdigest()
+        objectPath = self._objectPath(digest)
+        if not os.path.exists(objectPath):
+            _atomicWrite(objectPath, body)
+        headers = {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS}
+        entry = {"url": url, "sha256": digest, "size": len(body), "status": status, "headers": headers,
+                 "stored": time.strftime("%Y-%m-%d %H:%M:%S")}
+        entryPath = self._entryPath(url)
+        _atomicWrite(entryPath, json.dumps(entry).encode("utf-8"))
+        now = time.time()
+        os.utime(entryPath, (now, now))
+        return True
+
+    def entries(self) -> Iterator[dict]:
+        """
+        Iterate over the cached URLs (url, sha256, size, status, headers, stored and lastUsed fields).
+        """
+        if not os.path.isdir(self._urlsFolder):
+            return
+        with os.scandir(self._urlsFolder) as it:
+            for dirEntry in it:
+                if not dirEntry.name.endswith(".json"):
+                    continue
+                try:
+                    with open(dirEntry.path, "r", encoding="utf-8") as f:
+                        entry = json.load(f)
+                    entry["lastUsed"] = dirEntry.stat().st_mtime
+                except (OSError, ValueError):
+                    continue
+                yield entry
+
+    def size(self) -> int:
+        """
+        Combined size of the stored bodies in bytes.
+        """
+        total = 0
+        for root, _, files in os.walk(self._objectsFolder):
+            for name in files:
+                total += os.path.getsize(os.path.join(root, name))
+        return total
+
+    def prune(self, maxBytes: int) -> int:
+        """
+        Remove the least recently used URLs until the stored bodies take at most maxBytes, then remove the bodies no
+        longer used by any URL.
+
+        :return: number of removed URLs
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry["lastUsed"])
+        # bodies shared by several URLs are only counted once
+        sizes = {entry["sha256"]: entry["size"] for entry in entries}
+        users: Dict[str, int] = {}
+        for entry in entries:
+            users[entry["sha256"]] = users.get(entry["sha256"], 0) + 1
+        total = sum(sizes.values())
+        removed = 0
+        for entry in entries:
+            if total <= maxBytes:
+                break
+            os.remove(self._entryPath(entry["url"]))
+            removed += 1
+            users[entry["sha256"]] -= 1
+            if users[entry["sha256"]] == 0:
+                total -= sizes[entry["sha256"]]
+        self._removeUnusedObjects({digest for digest, count in users.items() if count > 0})
+        return removed
+
+    def _removeUnusedObjects(self, usedDigests: set):
+        for root, _, files in os.walk(self._objectsFolder):
+            for name in files:
+                if name not in usedDigests and not name.endswith(".tmp"):
+                    os.remove(os.path.join(root, name))
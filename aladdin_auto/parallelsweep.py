@@ -0,0 +1,175 @@
+"""
+This module runs read-only checks over many parameters of a product release on parallel pages of the Aladdin web
+application. The checks are bound by the latency of the user interface, so a few pages of one browser context, each
+already on the product and release, check the parameters several times faster than one page.
+
+A check is a coroutine using the Playwright async API, called with a page and a Parameter and returning any value.
+The pages take the next unchecked parameter as soon as they are free, so slow parameters don't hold up a fixed share of
+the list. The sweep runs in an event loop of its own thread, so it can be started from a test using the sync API (see
+the aladdinSweep fixture).
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, List, Union
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page
+from aladdin_auto.config import Config
+from aladdin_auto.parameter import Parameter
+from aladdin_auto.productmenu import resolveDeviceName
+from aladdin_auto.productxml import ProductXML
+from aladdin_auto.webbrowser import configureRoutingAsync
+
+SweepCheck = Callable[["Page", Parameter], Awaitable[Any]]
+
+
+class SweepResult:
+    """
+    Result of the check of one parameter.
+    """
+
+    def __init__(self, parameter: Parameter, value: Any, error: Union[BaseException, None], duration: float,
+                 pageIndex: int) -> None:
+        self.parameter = parameter
+        # value returned by the check, None if it raised an exception
+        self.value = value
+        # exception raised by the check
+        self.error = error
+        # duration of the check (unit = s)
+        self.duration = duration
+        # index of the page that ran the check
+        self.pageIndex = pageIndex
+
+    @property
+    def passed(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        outcome = repr(self.value) if self.error is None else f"error {self.error!r}"
+        return f"SweepResult({self.parameter.code}: {outcome})"
+
+
+async def selectDeviceAndReleaseAsync(page: Page, xml: ProductXML):
+    """
+    Same as aladdinactions.selectDeviceAndReleaseFromHomePage, for a page of the Playwright async API. The device is
+    resolved with the product menu index like in the sync API, so both select the same device.
+
+    :param page: Playwright async page
+    :param xml: ProductXML object to search for
+    """
+    from playwright.async_api import expect
+    from aladdin_auto.aladdinactions import DEVICE_SEARCH_BOX, RELEASE_SELECT, releaseOption
+    menuName = resolveDeviceName(xml.menuProductName)
+    searchBox = page.locator(DEVICE_SEARCH_BOX)
+    if menuName is None:
+        # same as aladdinactions.selectDeviceFromHomePageWithSearch
+        await searchBox.click()
+        await searchBox.fill(xml.menuProductName)
+        await page.get_by_role("link", name=xml.menuProductName).first.click()
+    else:
+        link = page.get_by_role("link", name=menuName, exact=True).locator("visible=true").first
+        if not await link.is_visible():
+            await searchBox.click()
+            await searchBox.fill(menuName)
+        await link.click()
+    # check for product tab (if we don't do this, it will move too quickly and the release selection won't take effect).
+    await expect(page.locator("li").get_by_text(xml.menuProductName)).to_be_visible()
+    await page.locator(RELEASE_SELECT).select_option(releaseOption(xml))
+    # check for correct number of top level pages (if we skip this, could search before pages have loaded)
+    await expect(page.locator("app-param-section")).to_have_count(count=len(xml.getAllUserTopLevelPages()))
+
+
+async def searchForParameterByCodeAsync(page: Page, param: Parameter):
+    """
+    Same as aladdinactions.searchForParameterByCode, for a page of the Playwright async API.
+
+    :param page: Playwright async page
+    :param param: Parameter to navigate to
+    """
+    searchArea = page.locator("xpath=//form[@id='frm-search']")
+    searchBar = searchArea.locator("xpath=//input[@name='searchValue']")
+    await searchBar.fill("")
+    await searchBar.type(param.code)
+    await searchArea.locator("xpath=//div[@class='result']").first.click()
+
+
+class ParallelSweep:
+    """
+    Runs checks over parameters on parallel pages of one browser context of the Aladdin web application.
+    """
+
+    def __init__(self, url: str, launchArgs: List[str], pageCount: int = None) -> None:
+        """
+        :param url: url of the web application
+        :param launchArgs: arguments to launch chromium with
+        :param pageCount: number of parallel pages, sweep_page_count option if None
+        """
+        self.url = url
+        self._launchArgs = launchArgs
+        self.pageCount = pageCount if pageCount is not None else Config.sweepPageCount()
+
+    def run(self, xml: ProductXML, parameters: List[Parameter], check: SweepCheck) -> List[SweepResult]:
+        """Check parameters of a product release.
+
+        :param xml: product release selected on each page before the checks
+        :param parameters: parameters to check (e.g. xml.createParameterList())
+        :param check: coroutine function called with a page and a parameter
+        :return: results in the order of parameters
+        """
+        if not parameters:
+            return []
+        # the sync API of the test owns the event loop of this thread
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ParallelSweep") as executor:
+            return executor.submit(asyncio.run, self._sweep(xml, parameters, check)).result()
+
+    async def _openPage(self, context: BrowserContext, xml: ProductXML) -> Page:
+        page = await context.new_page()
+        await page.goto(self.url)
+        await selectDeviceAndReleaseAsync(page, xml)
+        return page
+
+    async def _sweep(self, xml: ProductXML, parameters: List[Parameter], check: SweepCheck) -> List[SweepResult]:
+        from playwright.async_api import async_playwright
+        storageState = Config.webStorageStatePath()
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=Config.headless(), slow_mo=Config.slowMo(),
+                                                       args=self._launchArgs)
+            try:
+                context = await browser.new_context(
+                    storage_state=storageState if storageState != "" and os.path.exists(storageState) else None)
+                await configureRoutingAsync(context)
+                pageCount = max(1, min(self.pageCount, len(parameters)))
+                pages = await asyncio.gather(*(self._openPage(context, xml) for _ in range(pageCount)))
+                logging.info(f"Checking {len(parameters)} parameters of {xml.productName}_{xml.releaseNumber} on {pageCount} pages")
+                return await runChecks(pages, parameters, check)
+            finally:
+                await browser.close()
+
+
+async def runChecks(pages: list, parameters: List[Parameter], check: SweepCheck) -> List[SweepResult]:
+    """Run check for each parameter, each page checking the next unchecked parameter when it is free.
+
+    :param pages: pages ready for the checks
+    :return: results in the order of parameters
+    """
+    queue = asyncio.Queue()
+    for index, parameter in enumerate(parameters):
+        queue.put_nowait((index, parameter))
+    results: List[Union[SweepResult, None]] = [None] * len(parameters)
+
+    async def worker(pageIndex: int, page):
+        while not queue.empty():
+            index, parameter = queue.get_nowait()
+            startTime = time.perf_counter()
+            try:
+                value, error = await check(page, parameter), None
+            except Exception as e:
+                value, error = None, e
+            results[index] = SweepResult(parameter, value, error, time.perf_counter() - startTime, pageIndex)
+
+    await asyncio.gather(*(worker(pageIndex, page) for pageIndex, page in enumerate(pages)))
+    return results
@@ -3,20 +3,45 @@ This module contains fixtures that can be used to set up/tear down the Aladdin W
 The fixtures that are most likely to be needed for tests are defaultAladdinBrowser, primaryAladdinStandaloneBrowser, and primaryAladdinStandaloneBrowserDeveloperMode.
 """
 import pytest
+import logging
 import subprocess
 import os
 import math
-import easygui
+import json
+import html
 from datetime import datetime
-from aladdin_auto.standaloneappbrowser import *
-from aladdin_auto.webbrowser import *
+from aladdin_auto.aladdinbrowser import AladdinBrowser
+from aladdin_auto.standaloneprocesspool import StandaloneAppInstance, StandaloneProcessPool
+from aladdin_auto.webbrowser import SharedWebBrowser, saveStorageState
+from aladdin_auto.parallelsweep import ParallelSweep
+from aladdin_auto.catalog import catalogIndex, catalogParameters, catalogProducts
+from aladdin_auto.browsermetrics import memoryUsageMb, pageMetrics, performanceMetrics, recycleReason
 from aladdin_auto.fileutils import FileUtils
+from aladdin_auto.networkcache import AssetCache
 from aladdin_auto.config import Config, AladdinBrowserType
+from aladdin_auto.durationhistory import DurationHistory
+from aladdin_auto.resultsink import ResultSink
+from aladdin_auto.sharding import configureWorker, mergeJsonlFragments, mergePrometheusFragments, workerId
+from aladdin_auto.timing import Timing
+from aladdin_auto.tracefinalizer import TraceFinalizer
 from pytest import StashKey, CollectReport
-from typing import Dict
+from typing import Dict, List
 
 phase_report_key = StashKey[Dict[str, CollectReport]]()
+browser_metrics_key = StashKey[Dict[str, float]]()
+# paths of the files written for a test (e.g. traces)
+artifacts_key = StashKey[List[str]]()
 startTime = datetime.now()
+_processPool = None
+_traceFinalizer = None
+# JSON lines file with the browser metrics of each test, written next to the HTML report
+_metricsSidecarPath = None
+_durationHistory = None
+_resultSink = None
+# folder of the pytest cache where the catalog index is kept between sessions
+_catalogCacheFolder = None
+# performance regressions found at the end of the session
+_regressions = []
 
 @pytest.hookimpl(hookwrapper=True, tryfirst=True)
 def pytest_runtest_makereport(item, call):
@@ -35,6 +60,21 @@ def pytest_runtest_makereport(item, call):
     # record timestamp for report
     rep.timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
+    # attach the browser metrics to the call report, so they are also sent by xdist workers
+    if rep.when == "call" and Config.browserMetrics():
+        rep.browser_metrics = item.stash.get(browser_metrics_key, None)
+        setupReport = item.stash[phase_report_key].get("setup")
+        rep.setup_duration = setupReport.duration if setupReport is not None else None
+
+    if workerId():
+        rep.worker = workerId()
+    if rep.when == "teardown":
+        rep.artifacts = item.stash.get(artifacts_key, [])
+
+    # export the spans recorded during the test
+    if rep.when == "teardown" and Timing.isEnabled():
+        Timing.flush(cycle=item.nodeid, jsonlPath=Config.timingJsonlPath(), promPath=Config.timingPromPath())
+
     return rep
 
 def pytest_addoption(parser: pytest.Parser):
@@ -52,6 +92,84 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "semiauto: mark test to indicate that it requires some input from the tester"
     )
+    # set on catalog tests, so "--dist loadgroup" runs the tests of a product release on the same worker
+    config.addinivalue_line(
+        "markers", "xdist_group(name): run the tests of the group on the same pytest-xdist worker"
+    )
+    global _catalogCacheFolder
+    if getattr(config, "cache", None) is not None:
+        _catalogCacheFolder = str(config.cache.mkdir("aladdin_catalog"))
+    worker = workerId()
+    if worker:
+        # xdist workers don't run pytest_cmdline_main
+        Config.processCmdLineOptions(config)
+        configureWorker(worker, Config.workerPortStride())
+        Timing.enable(Config.timingEnabled())
+        Timing.setLabels(worker=worker)
+    else:
+        global _metricsSidecarPath, _durationHistory, _resultSink
+        if Config.browserMetrics() and getattr(config.option, "htmlpath", None):
+            _metricsSidecarPath = f"{os.path.splitext(config.option.htmlpath)[0]}_metrics.jsonl"
+            # lines are appended during the session, only keep the metrics of this session like the report
+            if os.path.exists(_metricsSidecarPath):
+                os.remove(_metricsSidecarPath)
+        if Config.durationHistoryPath():
+            _durationHistory = DurationHistory(Config.durationHistoryPath(), Config.durationHistoryWindow())
+        # xdist workers read the catalog index written by the controller instead of each building it
+        if getattr(config.option, "numprocesses", None) and _catalogCacheFolder is not None \
+                and os.path.isfile(os.path.join(Config.dataFolderPath(), "products.json")):
+            catalogIndex(_catalogCacheFolder)
+        if Config.resultsJsonlPath():
+            _resultSink = ResultSink(Config.resultsJsonlPath())
+            _resultSink.start(Config.getFullConfigDictionary())
+
+def _findAladdinBrowser(item) -> AladdinBrowser:
+    for value in getattr(item, "funcargs", {}).values():
+        if isinstance(value, AladdinBrowser):
+            return value
+    return None
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """
+
+    :meta private:
+    """
+    browser = _findAladdinBrowser(item) if Config.browserMetrics() else None
+    before = None
+    if browser is not None:
+        try:
+            before = performanceMetrics(browser.page)
+        except Exception as e:
+            logging.warning(f"Failed to sample browser metrics of {item.nodeid}: {e}")
+            browser = None
+    yield
+    # sampled before teardown closes the page, cumulative metrics only count the test body
+    if browser is not None:
+        try:
+            item.stash[browser_metrics_key] = pageMetrics(browser.page, before)
+        except Exception as e:
+            logging.warning(f"Failed to sample browser metrics of {item.nodeid}: {e}")
+
+def pytest_runtest_logreport(report):
+    """
+
+    :meta private:
+    """
+    # reports of xdist workers are also logged by the controller process, which writes the files
+    if _durationHistory is not None:
+        _durationHistory.add(report.nodeid, report.when, report.duration, report.passed)
+    if _resultSink is not None:
+        _resultSink.addReport(report)
+    if _metricsSidecarPath is None or report.when != "call" or getattr(report, "browser_metrics", None) is None:
+        return
+    entry = {"test": report.nodeid, "outcome": report.outcome, "timestamp": report.timestamp,
+             "setup_s": report.setup_duration, "call_s": report.duration, **report.browser_metrics}
+    folder = os.path.dirname(_metricsSidecarPath)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(_metricsSidecarPath, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
 
 # following three methods define the table in the generated report
 def pytest_html_results_table_header(cells: list):
@@ -60,6 +178,9 @@ def pytest_html_results_table_header(cells: list):
     :meta private:
     """
     cells.insert(1, "<th class='sortable time asc' data-column-type='time'>Time</th>")
+    if Config.browserMetrics():
+        for column, title, _, _ in _METRIC_COLUMNS:
+            cells.append(f"<th class='sortable' data-column-type='{column}'>{title}</th>")
 
 def pytest_html_results_table_row(report, cells: list):
     """
@@ -67,6 +188,27 @@ def pytest_html_results_table_row(report, cells: list):
     :meta private:
     """
     cells.insert(1, f"<td class='col-time'>{report.timestamp}</td>")
+    if Config.browserMetrics():
+        metrics = dict(getattr(report, "browser_metrics", None) or {})
+        metrics["setup_s"] = getattr(report, "setup_duration", None)
+        for column, _, key, digits in _METRIC_COLUMNS:
+            cells.append(f"<td class='col-{column}'>{_format_metric(metrics.get(key), digits)}</td>")
+
+# browser metric columns of the report table: column name, title, key in the metrics, decimal places
+_METRIC_COLUMNS = [
+    ("setup", "Setup (s)", "setup_s", 2),
+    ("load", "Load (ms)", "load_ms", 0),
+    ("script", "Script (ms)", "script_ms", 0),
+    ("layouts", "Layouts", "layout_count", 0),
+    ("heap", "JS heap (MB)", "js_heap_mb", 1),
+    ("nodes", "DOM nodes", "nodes", 0),
+]
+
+def _format_metric(value, digits: int) -> str:
+    if value is None:
+        return ""
+    # the report sorts the column text as strings, padding with (collapsed) spaces makes it sort numerically
+    return f"{value:12.{digits}f}"
 
 def _format_duration(duration):
     if duration < 1:
@@ -80,6 +222,12 @@ def _format_duration(duration):
 
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
+def _detailsHtml(title: str, lines) -> str:
+    parts = [f"<details><summary>{html.escape(title)}</summary>"]
+    parts.extend(f"<p>{html.escape(line)}</p>" for line in lines)
+    parts.append("</details>")
+    return "".join(parts)
+
 def pytest_html_results_summary(prefix: list, summary: list, postfix: list):
     """
 
@@ -91,11 +239,11 @@ def pytest_html_results_summary(prefix: list, summary: list, postfix: list):
     prefix.append("<p>")
 
     # build and append config html element
-    configHtmlElem = "<details><summary>Config</summary>"
-    for key, value in Config.getFullConfigDictionary().items():
-        configHtmlElem += f"<p>{key}={value}</p>"
-    configHtmlElem += "</details>"
-    prefix.append(configHtmlElem)
+    prefix.append(_detailsHtml("Config", (f"{key}={value}" for key, value in Config.getFullConfigDictionary().items())))
+
+    # performance regressions, known once the session is finished
+    if _durationHistory is not None and _regressions:
+        prefix.append(_detailsHtml(f"Performance regressions: {len(_regressions)}", (str(regression) for regression in _regressions)))
 
     # add time to execute start to finish
     executeTime = datetime.now() - startTime
@@ -110,6 +258,7 @@ def pytest_cmdline_main(config: pytest.Config):
     :meta private:
     """
     Config.processCmdLineOptions(config)
+    Timing.enable(Config.timingEnabled())
     if config.getoption("--html") is None:
         if Config.reportName() != "":
             html_file = os.path.join(Config.reportFolderPath(),Config.reportName())
@@ -117,6 +266,16 @@ def pytest_cmdline_main(config: pytest.Config):
             html_file = os.path.join(Config.reportFolderPath(), f"report_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.html")
         config.option.htmlpath=html_file
 
+def pytest_terminal_summary(terminalreporter):
+    """
+
+    :meta private:
+    """
+    if _regressions:
+        terminalreporter.section("performance regressions", yellow=True)
+        for regression in _regressions:
+            terminalreporter.line(str(regression))
+
 @pytest.fixture(scope="session")
 def requestTesterName():
     """
@@ -124,92 +283,211 @@ def requestTesterName():
     :meta private:
     """
     if Config.testerName() == "":
+        import easygui
         name = easygui.enterbox(msg="Enter the tester name (for future sessions, this name can be set in the config.ini file):", title="Enter tester name")
         if name is not None:
             Config.setTesterName(name)
 
 
+def _getProcessPool() -> StandaloneProcessPool:
+    global _processPool
+    if _processPool is None:
+        _processPool = StandaloneProcessPool(Config.aladdinStandalonePath(), Config.primaryBrowserPort(),
+                                             Config.standaloneProcessUsageLimit(), Config.recycleMemoryLimitMb())
+    return _processPool
+
+def _testFailed(inputRequest) -> bool:
+    reportsDict: Dict = inputRequest.node.stash.get(phase_report_key, {})
+    return any(report.failed for report in reportsDict.values())
+
+def pytest_generate_tests(metafunc: pytest.Metafunc):
+    """
+    Parametrize tests requesting the catalogProduct or catalogParameter argument over the product releases or
+    parameters of the catalog index. The ProductXML objects are only loaded by the tests that run.
+
+    :meta private:
+    """
+    if "catalogProduct" in metafunc.fixturenames:
+        metafunc.parametrize("catalogProduct", [pytest.param(product, id=product.id, marks=pytest.mark.xdist_group(product.id))
+                                                for product in catalogProducts(catalogIndex(_catalogCacheFolder))])
+    if "catalogParameter" in metafunc.fixturenames:
+        metafunc.parametrize("catalogParameter", [pytest.param(parameter, id=parameter.id, marks=pytest.mark.xdist_group(parameter.product.id))
+                                                  for parameter in catalogParameters(catalogIndex(_catalogCacheFolder))])
+
+def pytest_collection_finish(session: pytest.Session):
+    """
+
+    :meta private:
+    """
+    # start the standalone application while the first tests are set up
+    if not Config.standaloneProcessPrewarm() or Config.defaultAladdinBrowserType() is not AladdinBrowserType.STANDALONE_APP:
+        return
+    for item in session.items:
+        if "_standaloneAppInstanceDeveloperMode" in item.fixturenames:
+            _getProcessPool().warm(developerMode=True)
+            return
+        if {"_standaloneAppInstance", "defaultAladdinBrowser"} & set(item.fixturenames):
+            _getProcessPool().warm(developerMode=False)
+            return
+
+def pytest_sessionfinish(session: pytest.Session):
+    """
+
+    :meta private:
+    """
+    global _regressions
+    if _durationHistory is not None:
+        _regressions = _durationHistory.findRegressions(Config.durationRegressionRatio())
+        _durationHistory.save(startTime)
+        if _regressions and Config.durationRegressionFail() and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+    # after the regression check, which may change the exit status
+    if _resultSink is not None:
+        _resultSink.finish(session.exitstatus)
+    if _processPool is not None:
+        _processPool.shutdown()
+    if _traceFinalizer is not None:
+        _traceFinalizer.close()
+    if not workerId():
+        if Config.networkCacheFolderPath() and Config.networkCacheSizeLimit() >= 0:
+            AssetCache(Config.networkCacheFolderPath()).prune(Config.networkCacheSizeLimit()*1000)
+        # merge the output files of the xdist workers
+        if Config.timingJsonlPath():
+            mergeJsonlFragments(Config.timingJsonlPath())
+        if Config.timingPromPath():
+            mergePrometheusFragments(Config.timingPromPath())
+
+@pytest.fixture(scope="function")
+def _standaloneAppInstance(request) -> StandaloneAppInstance:
+    instance = _getProcessPool().acquire(developerMode=False)
+    yield instance
+    _getProcessPool().release(instance, failed=_testFailed(request), prewarm=Config.standaloneProcessPrewarm())
+
+@pytest.fixture(scope="function")
+def _standaloneAppInstanceDeveloperMode(request) -> StandaloneAppInstance:
+    instance = _getProcessPool().acquire(developerMode=True)
+    yield instance
+    _getProcessPool().release(instance, failed=_testFailed(request), prewarm=Config.standaloneProcessPrewarm())
+
 @pytest.fixture(scope="function")
-def aladdinProcess() -> subprocess.Popen:
+def aladdinProcess(_standaloneAppInstance) -> subprocess.Popen:
     """
     Fixture that sets up/tears down the Aladdin Standalone Application.
 
+    The process may be shared with other tests, see the standalone_process_usage_limit option.
+
     It is recommended to use the fixture 'defaultAladdinBrowser' or 'primaryAladdinStandaloneBrowser' instead to control
     the application with Playwright.
 
     Use by including "aladdinProcess" in a test's arguments.
     """
-    aladdinProcess = subprocess.Popen(Config.aladdinStandalonePath())
-    yield aladdinProcess
-    aladdinProcess.terminate()
+    yield _standaloneAppInstance.process
 
 @pytest.fixture(scope="function")
-def aladdinProcessDeveloperMode() -> subprocess.Popen:
+def aladdinProcessDeveloperMode(_standaloneAppInstanceDeveloperMode) -> subprocess.Popen:
     """
     Fixture that sets up/tears down the Aladdin Standalone Application in developer mode.
 
+    The process may be shared with other tests, see the standalone_process_usage_limit option.
+
     It is recommended to use the fixture 'primaryAladdinStandaloneBrowserDeveloperMode' instead to control
     the application with Playwright.
 
     Use by including "aladdinProcessDeveloperMode" in a test's arguments.
     """
-    aladdinProcess = subprocess.Popen([Config.aladdinStandalonePath(),"+d"])
-    yield aladdinProcess
-    aladdinProcess.terminate()
-
-# Scope for when we launch Aladdin browser can be in each test or in each module.
-# Playwright is having memory issues if you pile on too many tests without relaunching, but it would be good to not have
-# to launch with every single test to save time. To make experimentation with scope easier for now we have two different
-# internal helper functions for each type of browser.
-@pytest.fixture(scope="module")
-def _moduleScopePrimaryAladdinStandaloneBrowser(aladdinProcess,playwright):
-    browser, page = initPrimaryBrowser(playwright, Config.primaryBrowserPort(), "home")
-    yield AladdinBrowser(browser, page)
-    browser.close()
+    yield _standaloneAppInstanceDeveloperMode.process
 
+# The standalone application processes are kept by the process pool, and a test only attaches to the running
+# application. Chromium is launched once per session (or xdist worker) for the web application, and each test gets a new
+# context, so cookies and storage are not shared between tests.
+# Playwright is having memory issues if you pile on too many tests without relaunching, so the browser or application
+# is restarted when the recycle_memory_limit_mb, recycle_test_count or standalone_process_usage_limit limits are crossed.
 @pytest.fixture(scope="function")
-def _functionScopePrimaryAladdinStandaloneBrowser(aladdinProcess,playwright):
+def _functionScopePrimaryAladdinStandaloneBrowser(_standaloneAppInstance,playwright):
     if Config.skipNotDefaultBrowser() and (Config.defaultAladdinBrowserType() != AladdinBrowserType.STANDALONE_APP):
         pytest.skip(f"Skipping Standalone Browser test because default_browser_type is: {Config.defaultAladdinBrowserType().name}")
-    browser, page = initPrimaryBrowser(playwright, Config.primaryBrowserPort(), "home")
+    browser, page = _standaloneAppInstance.attachPrimaryBrowser(playwright)
     yield AladdinBrowser(browser, page)
+    _standaloneAppInstance.memoryMb = _sampleMemoryMb(browser, page, _standaloneAppInstance.process.pid)
     browser.close()
 
 @pytest.fixture(scope="function")
-def _functionScopePrimaryAladdinStandaloneBrowserDeveloperMode(aladdinProcessDeveloperMode,playwright):
+def _functionScopePrimaryAladdinStandaloneBrowserDeveloperMode(_standaloneAppInstanceDeveloperMode,playwright):
     if Config.skipNotDefaultBrowser() and (Config.defaultAladdinBrowserType() != AladdinBrowserType.STANDALONE_APP):
         pytest.skip(f"Skipping Standalone Browser test because default_browser_type is: {Config.defaultAladdinBrowserType().name}")
-    browser, page = initPrimaryBrowser(playwright, Config.primaryBrowserPort(), "home")
+    browser, page = _standaloneAppInstanceDeveloperMode.attachPrimaryBrowser(playwright)
     yield AladdinBrowser(browser, page)
+    _standaloneAppInstanceDeveloperMode.memoryMb = _sampleMemoryMb(browser, page, _standaloneAppInstanceDeveloperMode.process.pid)
     browser.close()
 
-@pytest.fixture(scope="module")
-def _moduleScopeAladdinUrlWebBrowser(playwright):
-    browser, page = connectToWebBrowser(playwright, Config.webUrl(), [])
-    yield AladdinBrowser(browser, page)
-    browser.close()
+_LOCAL_WEB_LAUNCH_ARGS = ['--disable-web-security','--allow-file-access-from-files']
+
+def _sampleMemoryMb(browser, page, pid=None):
+    # only sampled when needed by the recycling policy
+    if Config.recycleMemoryLimitMb() < 0:
+        return None
+    try:
+        return memoryUsageMb(browser, page, pid)
+    except Exception:
+        logging.exception("Failed to sample browser memory")
+        return None
+
+def _sharedWebBrowser(playwright, url: str, launchArgs: list) -> SharedWebBrowser:
+    sharedBrowser = SharedWebBrowser(playwright, url, launchArgs)
+    path = Config.webStorageStatePath()
+    if path != "":
+        if not os.path.exists(path):
+            saveStorageState(sharedBrowser.browser, url, path)
+        sharedBrowser.storageState = path
+    return sharedBrowser
+
+def _webBrowserForTest(sharedBrowser: SharedWebBrowser):
+    page = sharedBrowser.newPage()
+    yield AladdinBrowser(sharedBrowser.browser, page)
+    memoryMb = _sampleMemoryMb(sharedBrowser.browser, page)
+    page.context.close()
+    reason = recycleReason(sharedBrowser.testCount, memoryMb, Config.recycleTestCount(), Config.recycleMemoryLimitMb())
+    if reason is not None:
+        logging.info(f"Relaunching web browser: {reason}")
+        sharedBrowser.relaunch()
+
+@pytest.fixture(scope="session")
+def _sessionScopeAladdinUrlWebBrowser(playwright):
+    sharedBrowser = _sharedWebBrowser(playwright, Config.webUrl(), [])
+    yield sharedBrowser
+    sharedBrowser.close()
 
 @pytest.fixture(scope="function")
-def _functionScopeAladdinUrlWebBrowser(playwright):
+def _functionScopeAladdinUrlWebBrowser(request):
     if Config.skipNotDefaultBrowser() and (Config.defaultAladdinBrowserType() != AladdinBrowserType.WEBAPP_URL):
         pytest.skip(f"Skipping URL Web Browser test because default_browser_type is: {Config.defaultAladdinBrowserType().name}")
-    browser, page = connectToWebBrowser(playwright, Config.webUrl(), [])
-    yield AladdinBrowser(browser, page)
-    browser.close()
+    # requested here, so chromium is not launched for skipped tests
+    yield from _webBrowserForTest(request.getfixturevalue("_sessionScopeAladdinUrlWebBrowser"))
 
-@pytest.fixture(scope="module")
-def _moduleScopeAladdinLocalWebBrowser(playwright):
-    browser, page = connectToWebBrowser(playwright, "file://" + Config.aladdinWebAppPath(), ['--disable-web-security','--allow-file-access-from-files'])
-    yield AladdinBrowser(browser, page)
-    browser.close()
+@pytest.fixture(scope="session")
+def _sessionScopeAladdinLocalWebBrowser(playwright):
+    sharedBrowser = _sharedWebBrowser(playwright, "file://" + Config.aladdinWebAppPath(), _LOCAL_WEB_LAUNCH_ARGS)
+    yield sharedBrowser
+    sharedBrowser.close()
 
 @pytest.fixture(scope="function")
-def _functionScopeAladdinLocalWebBrowser(playwright):
+def _functionScopeAladdinLocalWebBrowser(request):
     if Config.skipNotDefaultBrowser() and (Config.defaultAladdinBrowserType() != AladdinBrowserType.WEBAPP_LOCAL):
         pytest.skip(f"Skipping Local Web Browser test because default_browser_type is: {Config.defaultAladdinBrowserType().name}")
-    browser, page = connectToWebBrowser(playwright, "file://" + Config.aladdinWebAppPath(), ['--disable-web-security','--allow-file-access-from-files'])
-    yield AladdinBrowser(browser, page)
-    browser.close()
+    yield from _webBrowserForTest(request.getfixturevalue("_sessionScopeAladdinLocalWebBrowser"))
+
+def _pruneTraces(newTracePath: str) -> list:
+    sizeLimit = Config.traceFileSizeLimit()*1000 if Config.traceFileSizeLimit() >= 0 else -1
+    ageLimit = Config.traceFileAgeLimitDays()*86400 if Config.traceFileAgeLimitDays() >= 0 else -1
+    return FileUtils.pruneFolder(Config.traceFolderPath(), "*.zip", maxBytes=sizeLimit, maxAgeSecs=ageLimit,
+                                 maxCount=Config.traceFileCountLimit(), newFile=newTracePath)
+
+def _getTraceFinalizer() -> TraceFinalizer:
+    global _traceFinalizer
+    if _traceFinalizer is None:
+        _traceFinalizer = TraceFinalizer(Config.traceFolderPath(), Config.traceQueueSize(), Config.traceCompressLevel(),
+                                         prune=_pruneTraces)
+    return _traceFinalizer
 
 def _stopContextTracing(inputRequest, browser: AladdinBrowser):
     if Config.contextTracing():
@@ -224,10 +502,16 @@ def _stopContextTracing(inputRequest, browser: AladdinBrowser):
                 skipContextTracing = True
 
         if not skipContextTracing:
-            tracePath = os.path.join(Config.traceFolderPath(), f'{inputRequest.node.name}.zip')
-            browser.page.context.tracing.stop(path=tracePath)
-            if Config.traceFileSizeLimit() >= 0:
-                FileUtils.deleteOldestTraces(Config.traceFolderPath(),Config.traceFileSizeLimit()*1000)
+            # only writing the trace stays in the teardown, it is finalized in the background
+            traceFinalizer = _getTraceFinalizer()
+            stagingPath = traceFinalizer.stagingPath(f'{inputRequest.node.name}.zip')
+            browser.page.context.tracing.stop(path=stagingPath)
+            metadata = {"test": inputRequest.node.nodeid, "failed": _testFailed(inputRequest)}
+            inputRequest.node.stash.setdefault(artifacts_key, []).append(os.path.join(traceFinalizer.folder, os.path.basename(stagingPath)))
+            if Config.traceQueueSize() > 0:
+                traceFinalizer.submit(stagingPath, metadata)
+            else:
+                traceFinalizer.finalize(stagingPath, metadata)
         else:
             browser.page.context.tracing.stop()
 
@@ -311,6 +595,19 @@ def aladdinWebBrowser(request) -> AladdinBrowser:
     else:
         raise Exception(f"Unexpected web browser type: {Config.defaultAladdinWebBrowserType().name}")
 
+@pytest.fixture(scope="function")
+def aladdinSweep() -> ParallelSweep:
+    """
+    Fixture that checks parameters of a product release on parallel pages of the Aladdin web application (see the sweep_page_count setting). The application is run from local files or a url based on the value of the default_browser_type configuration setting in the config.ini file.
+
+    Use by including "aladdinSweep" in a test's arguments, then call aladdinSweep.run(xml, parameters, check) where check is an async function of a Playwright async page and a parameter.
+    """
+    if Config.defaultAladdinBrowserType() is AladdinBrowserType.WEBAPP_URL:
+        return ParallelSweep(Config.webUrl(), [])
+    elif Config.defaultAladdinBrowserType() is AladdinBrowserType.WEBAPP_LOCAL:
+        return ParallelSweep("file://" + Config.aladdinWebAppPath(), _LOCAL_WEB_LAUNCH_ARGS)
+    pytest.skip(f"Skipping parameter sweep because default_browser_type is: {Config.defaultAladdinBrowserType().name}")
+
 @pytest.fixture(scope="function")
 def defaultAladdinBrowser(request) -> AladdinBrowser:
     """
@@ -0,0 +1,143 @@
+"""
+This module contains the product menu index: the menu names of productsMenu.json and the products and releases of
+products.json, with prefix and fuzzy lookup. It resolves a device name to the exact menu name displayed by Aladdin
+before the user interface is driven (see aladdinactions.selectDeviceFromHomePage), so a partial name selects the same
+product on every run, and a misspelled name fails with the closest names instead of selecting another product.
+"""
+import bisect
+import difflib
+import logging
+import re
+from typing import Dict, List, Tuple, Union
+from aladdin_auto.config import Config
+from aladdin_auto.productxml import ProductXML
+
+# minimum similarity of a fuzzy match, see difflib.get_close_matches
+FUZZY_CUTOFF = 0.6
+# product menu index of each data folder read in this process
+_indexes = {}
+
+
+def normalizeName(name: str) -> str:
+    """
+    Lower case name with runs of characters other than letters and digits replaced by one space, e.g.
+    "magellan 9900i" for "Magellan-9900i".
+    """
+    return " ".join(re.split(r"[^0-9a-z]+", name.lower())).strip()
+
+
+class ProductMenuIndex:
+    """
+    In-memory index of the product menu.
+    """
+
+    def __init__(self, menuProducts: List[Tuple[str, str, str]]) -> None:
+        """
+        :param menuProducts: (product name, release number, menu product name) of each product, see ProductXML.menuProducts
+        """
+        # {menu name: [(product name, release number), ...]} in menu order
+        self._releases: Dict[str, List[Tuple[str, str]]] = {}
+        # {normalized menu or product name: [menu names]}
+        self._names: Dict[str, List[str]] = {}
+        for productName, releaseNumber, menuName in menuProducts:
+            self._releases.setdefault(menuName, []).append((productName, releaseNumber))
+            for name in (menuName, productName):
+                menuNames = self._names.setdefault(normalizeName(name), [])
+                if menuName not in menuNames:
+                    menuNames.append(menuName)
+        self._sortedNames = sorted(self._names)
+
+    @staticmethod
+    def fromDataFolder() -> "ProductMenuIndex":
+        """
+        Build the index from products.json and productsMenu.json of the data folder (see the data_folder_path option).
+        """
+        return ProductMenuIndex(ProductXML.menuProducts())
+
+    def menuNames(self) -> List[str]:
+        """
+        Menu names of all products, in menu order.
+        """
+        return list(self._releases)
+
+    def releases(self, menuName: str) -> List[Tuple[str, str]]:
+        """
+        Return [(product name, release number), ...] of a menu name.
+        """
+        return list(self._releases[menuName])
+
+    def _menuNamesOf(self, normalizedNames: List[str]) -> List[str]:
+        menuNames = []
+        for name in normalizedNames:
+            for menuName in self._names[name]:
+                if menuName not in menuNames:
+                    menuNames.append(menuName)
+        return menuNames
+
+    def prefix(self, text: str) -> List[str]:
+        """
+        Menu names whose menu or product name starts with text (case and punctuation are ignored).
+        """
+        key = normalizeName(text)
+        start = bisect.bisect_left(self._sortedNames, key)
+        end = start
+        while end < len(self._sortedNames) and self._sortedNames[end].startswith(key):
+            end += 1
+        return self._menuNamesOf(self._sortedNames[start:end])
+
+    def fuzzy(self, text: str, count: int = 5) -> List[str]:
+        """
+        Menu names whose menu or product name is closest to text, best first.
+        """
+        matches = difflib.get_close_matches(normalizeName(text), self._sortedNames, n=count, cutoff=FUZZY_CUTOFF)
+        return self._menuNamesOf(matches)[:count]
+
+    def resolve(self, name: str) -> str:
+        """Return the menu name of a device: the menu or product name equal to name, else the only name starting
+        with name. Close names are only suggested in the error, a misspelled name could be another product.
+
+        :param name: menu name, product name (e.g. Magellan-9900i), or the start of one
+        :raise LookupError: if several names start with name, or none does
+        """
+        key = normalizeName(name)
+        if key in self._names:
+            # a menu name has precedence over a product name of another menu
+            exact = [menuName for menuName in self._names[key] if normalizeName(menuName) == key]
+            return (exact or self._names[key])[0]
+        matches = self.prefix(name)
+        if len(matches) == 1:
+            return matches[0]
+        if len(matches) > 1:
+            raise LookupError(f"Device name {name!r} is ambiguous, it could be: {', '.join(matches)}")
+        matches = self.fuzzy(name, count=3)
+        if matches:
+            raise LookupError(f"No device named {name!r} in the product menu, did you mean: {', '.join(matches)}?")
+        raise LookupError(f"No device named {name!r} in the product menu")
+
+
+def productMenuIndex() -> ProductMenuIndex:
+    """
+    Return the product menu index of the data folder, built once per process.
+    """
+    dataFolderPath = Config.dataFolderPath()
+    if dataFolderPath not in _indexes:
+        _indexes[dataFolderPath] = ProductMenuIndex.fromDataFolder()
+    return _indexes[dataFolderPath]
+
+
+def resolveDeviceName(deviceName: str) -> Union[str, None]:
+    """Return the menu name of a device with the product menu index (see ProductMenuIndex.resolve), or None if no
+    indexed name starts with deviceName (e.g. a product missing from productsMenu.json), so the device is searched for
+    by name in the web application. The closest indexed names are logged.
+
+    :param deviceName: menu name, product name (e.g. Magellan-9900i), or the start of one
+    :raise LookupError: if several indexed names start with deviceName
+    """
+    index = productMenuIndex()
+    try:
+        return index.resolve(deviceName)
+    except LookupError as e:
+        if index.prefix(deviceName):
+            raise
+        logging.warning(f"{e}, searching for it in the web application")
+        return None
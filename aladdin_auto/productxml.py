@@ -16,7 +16,7 @@ class ProductXML:
         self.productName = productName
         self.menuProductName = menuProductName
         self.releaseNumber = releaseNumber
-        xmlPath = os.path.join(Config.dataFolderPath(),f"ConfigRepository\\{productName}_{releaseNumber}\\config_{productName}_{releaseNumber}.xml")
+        xmlPath = ProductXML.xmlPath(productName, releaseNumber)
         if os.path.isfile(xmlPath):
             self.xmlTree = ET.parse(xmlPath)
             if "mcf" in self.xmlTree.getroot().attrib:
@@ -44,7 +44,21 @@ class ProductXML:
     def getTopLevelPages(self) -> list[ET.Element]:
         """Return a list of all top level pages for this product.
         """
-        rootPage = self.xmlTree.find("rootPage")
+        return ProductXML.topLevelPages(self.xmlTree.find("rootPage"), self.productName)
+
+
+    def getAllUserTopLevelPages(self):
+        """Return a list of all top level pages for this product with protection "USER".
+        """
+        return [elem for elem in self.getTopLevelPages() if ProductXML.isUserPage(elem)]
+
+    @staticmethod
+    def topLevelPages(rootPage: ET.Element, productName: str) -> list[ET.Element]:
+        """Return the top level pages below the rootPage element of the XML of a product.
+
+        :param rootPage: rootPage element of the XML
+        :param productName: name of product (as written on XML folder or products.json, e.g. Magellan-9900i)
+        """
         configurationPage = rootPage.find("page")
         pages = configurationPage.findall("page")
         # check for any pages that need to be removed and replaced with their children (pages with the product name in them)
@@ -52,9 +66,9 @@ class ProductXML:
         pagesLen = len(pages)
         while i < pagesLen:
             page = pages[i]
-            if "title" in page.attrib and (self.productName in page.attrib["title"] or          # Remove and replace with children if title contains product name
-            ("-BASE-" not in self.productName and ("2D Imager Scanner" in page.attrib["title"]  # Or if one of these strings is in the title and the product is not a base.
-                                                   or "Linear Imager Scanner" in page.attrib["title"]))
+            if "title" in page.attrib and (productName in page.attrib["title"] or          # Remove and replace with children if title contains product name
+            ("-BASE-" not in productName and ("2D Imager Scanner" in page.attrib["title"]  # Or if one of these strings is in the title and the product is not a base.
+                                              or "Linear Imager Scanner" in page.attrib["title"]))
             ):
                 pages.pop(i)
                 childPages = page.findall("page")
@@ -67,25 +81,30 @@ class ProductXML:
                 i+=1
         return pages
 
+    @staticmethod
+    def isUserPage(page: ET.Element) -> bool:
+        """Return True if page has protection "USER" (or no protection).
+        """
+        return "protection" not in page.attrib or page.attrib["protection"] == "USER"
 
-    def getAllUserTopLevelPages(self):
-        """Return a list of all top level pages for this product with protection "USER".
+    @staticmethod
+    def xmlPath(productName: str, releaseNumber: str) -> str:
+        """Return the path of the XML of a product release in the Aladdin data folder.
         """
-        return [elem for elem in self.getTopLevelPages() if "protection" not in elem.attrib or elem.attrib["protection"] == "USER"]
+        return os.path.join(Config.dataFolderPath(), "ConfigRepository", f"{productName}_{releaseNumber}", f"config_{productName}_{releaseNumber}.xml")
 
     @staticmethod
-    def _getXML(currentName, currentProductsMenuList, productsJson, xmlList):
+    def _getXML(currentName, currentProductsMenuList, productsJson):
         """
-        Helper recursive function for getAllXMLs.
+        Helper recursive generator for menuProducts.
 
         :param currentName: name of current list
         :param currentProductsMenuList: list currently in progress
         :param productsJson: list created from products.json
-        :param xmlList: current list of XMLs
-        :return: current list of XMLs
+        :return: iterator of (product name, release number, menu product name)
         """
         for item in currentProductsMenuList:
-            if isinstance(item, str): # then we've reached a product. Create the ProductXML object and add to the list
+            if isinstance(item, str): # then we've reached a product
                 try:
                     nameAndRelease = productsJson[int(item)]
                 except:
@@ -93,23 +112,30 @@ class ProductXML:
                 splitNameAndRelease = nameAndRelease.split("_")
                 name = splitNameAndRelease[0]
                 release = splitNameAndRelease[1]
-                xmlList.append(ProductXML(name,release,currentName))
+                yield name, release, currentName
             else: # should be a dictionary with "name" and "children"
-                xmlList = ProductXML._getXML(item["name"],item["children"],productsJson,xmlList)
-        return xmlList
-
+                yield from ProductXML._getXML(item["name"],item["children"],productsJson)
 
     @staticmethod
-    def getAllXMLs():
+    def menuProducts() -> list[tuple[str, str, str]]:
         """
-        Return a list of ProductXML objects for each product in the productsMenu.json file.
+        Return a list of (product name, release number, menu product name) for each product in the productsMenu.json file, without parsing the XMLs.
         """
         productsJsonPath = os.path.join(Config.dataFolderPath(), "products.json")
-        productsJson = json.load(open(productsJsonPath))
+        with open(productsJsonPath) as f:
+            productsJson = json.load(f)
 
         productsMenuJsonPath = os.path.join(Config.dataFolderPath(), "productsMenu.json")
-        productsMenuJson = json.load(open(productsMenuJsonPath))
+        with open(productsMenuJsonPath) as f:
+            productsMenuJson = json.load(f)
 
-        return ProductXML._getXML("",productsMenuJson,productsJson,[])
+        return list(ProductXML._getXML("",productsMenuJson,productsJson))
+
+    @staticmethod
+    def getAllXMLs():
+        """
+        Return a list of ProductXML objects for each product in the productsMenu.json file.
+        """
+        return [ProductXML(name, release, menuName) for name, release, menuName in ProductXML.menuProducts()]
 
 
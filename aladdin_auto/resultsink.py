@@ -0,0 +1,117 @@
+"""
+This module writes the results of a test session to a JSON lines file while the tests run (see the results_jsonl_path
+option), so large sessions can be summarized afterwards (see scripts/summarize_results.py) without keeping the results
+in memory.
+
+The file contains one "session" record with the config, one "test" record per finished test (outcome, phase
+durations, config hash, artifacts such as traces, browser metrics) and one "summary" record at the end of the session.
+Each line is flushed when it is written, so the file is usable even if the session is interrupted.
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+
+def configHash(options: dict) -> str:
+    """
+    Short hash of the config options, to group the results of sessions run with the same config.
+    """
+    text = json.dumps(options, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _phaseOutcome(report) -> str:
+    if report.failed:
+        return "failed" if report.when == "call" else "error"
+    if report.skipped:
+        return "xfailed" if hasattr(report, "wasxfail") else "skipped"
+    if report.when == "call" and hasattr(report, "wasxfail"):
+        return "xpassed"
+    return "passed"
+
+
+def _failureMessage(report) -> Optional[str]:
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None:
+        return crash.message
+    if isinstance(report.longrepr, tuple):
+        # skip reason
+        return report.longrepr[2]
+    return str(report.longrepr) if report.longrepr else None
+
+
+class ResultSink:
+    """
+    Streams the results of a test session to a JSON lines file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = None
+        self._configHash = None
+        self._started = None
+        # records of the tests whose teardown is not reported yet
+        self._pending: Dict[str, dict] = {}
+        self._counts: Dict[str, int] = {}
+
+    def _write(self, record: dict):
+        self._file.write(json.dumps(record, default=str) + "\n")
+
+    def start(self, options: dict):
+        """Open the file and write the session record.
+
+        :param options: config options of the session
+        """
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        # line buffered: each record is flushed when written
+        self._file = open(self.path, "w", encoding="utf-8", buffering=1)
+        self._configHash = configHash(options)
+        self._started = time.time()
+        self._write({"type": "session", "started": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                     "config_hash": self._configHash, "config": options})
+
+    def addReport(self, report):
+        """
+        Add the report of a test phase. The test record is written when the teardown is reported.
+        """
+        if self._file is None:
+            return
+        record = self._pending.setdefault(report.nodeid, {
+            "type": "test", "test": report.nodeid, "outcome": "passed", "durations": {},
+            "config_hash": self._configHash})
+        record["durations"][report.when] = report.duration
+        outcome = _phaseOutcome(report)
+        if record["outcome"] == "passed" and outcome != "passed":
+            record["outcome"] = outcome
+            record["message"] = _failureMessage(report)
+        for name in ("timestamp", "worker"):
+            if hasattr(report, name):
+                record[name] = getattr(report, name)
+        if getattr(report, "browser_metrics", None):
+            record["browser_metrics"] = report.browser_metrics
+        if getattr(report, "artifacts", None):
+            record.setdefault("artifacts", []).extend(report.artifacts)
+        if report.when == "teardown":
+            del self._pending[report.nodeid]
+            self._counts[record["outcome"]] = self._counts.get(record["outcome"], 0) + 1
+            self._write(record)
+
+    def finish(self, exitStatus: int):
+        """
+        Write the summary record and close the file.
+        """
+        if self._file is None:
+            return
+        # tests interrupted before their teardown
+        for record in self._pending.values():
+            self._write(record)
+        self._pending.clear()
+        self._write({"type": "summary", "exit_status": int(exitStatus), "counts": self._counts,
+                     "duration": time.time() - self._started})
+        self._file.close()
+        self._file = None
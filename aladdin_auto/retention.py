@@ -0,0 +1,214 @@
+"""
+This module contains the retention engine used to keep folders of generated files (trace zips, capture logs) within
+size, age and count limits.
+
+The files of a folder are tracked in a ledger which is kept in memory and persisted in the folder as an append-only
+journal. The folder is only scanned again (one os.scandir pass, one stat per file) when its modification time shows that
+it was changed by something else than the retention engine.
+"""
+import bisect
+import fnmatch
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class RetentionPolicy:
+    """
+    Limits applied to a folder. A limit lower than 0 is ignored.
+    """
+
+    def __init__(self, maxBytes: int = -1, maxAgeSecs: float = -1, maxCount: int = -1):
+        """
+        :param maxBytes: maximum combined size of the files in bytes
+        :param maxAgeSecs: maximum age of a file in seconds (based on modification time)
+        :param maxCount: maximum number of files
+        """
+        self.maxBytes = maxBytes
+        self.maxAgeSecs = maxAgeSecs
+        self.maxCount = maxCount
+
+    def isEnabled(self) -> bool:
+        return self.maxBytes >= 0 or self.maxAgeSecs >= 0 or self.maxCount >= 0
+
+
+class _Ledger:
+    """
+    Files of one folder matching one pattern, ordered from oldest to newest.
+
+    Journal lines: "+<mtime_ns>\\t<size>\\t<name>" (file added), "-<name>" (file removed),
+    "@<folder mtime_ns>" (folder mtime after the last change made by the engine).
+    """
+
+    _compactRatio = 2
+
+    def __init__(self, folder: str, pattern: str):
+        self.folder = folder
+        self.pattern = pattern
+        self.journalPath = os.path.join(folder, f".retention_ledger_{re.sub(r'[^A-Za-z0-9]', '_', pattern)}")
+        self.files: Dict[str, Tuple[int, int]] = {}
+        self.order: List[Tuple[int, str]] = []
+        self.totalSize = 0
+        self.folderMtimeNs = None
+        self._journalLines = 0
+
+    def matches(self, name: str) -> bool:
+        return not name.startswith(".") and fnmatch.fnmatch(name, self.pattern)
+
+    def add(self, name: str, mtimeNs: int, size: int):
+        if name in self.files:
+            self.remove(name)
+        self.files[name] = (mtimeNs, size)
+        bisect.insort(self.order, (mtimeNs, name))
+        self.totalSize += size
+
+    def remove(self, name: str):
+        mtimeNs, size = self.files.pop(name)
+        position = bisect.bisect_left(self.order, (mtimeNs, name))
+        del self.order[position]
+        self.totalSize -= size
+
+    def scan(self):
+        """Rebuild the ledger with one os.scandir pass over the folder."""
+        self.files.clear()
+        self.order = []
+        self.totalSize = 0
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if self.matches(entry.name) and entry.is_file(follow_symlinks=False):
+                    stat = entry.stat()
+                    self.files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+                    self.order.append((stat.st_mtime_ns, entry.name))
+                    self.totalSize += stat.st_size
+        self.order.sort()
+
+    def load(self) -> bool:
+        """Replay the journal. Return False if there is no usable journal."""
+        try:
+            with open(self.journalPath, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.rstrip("\n")
+                    if line.startswith("+"):
+                        mtimeNs, size, name = line[1:].split("\t", 2)
+                        self.add(name, int(mtimeNs), int(size))
+                    elif line.startswith("-"):
+                        if line[1:] in self.files:
+                            self.remove(line[1:])
+                    elif line.startswith("@"):
+                        self.folderMtimeNs = int(line[1:])
+                    self._journalLines += 1
+        except (OSError, ValueError):
+            self.files.clear()
+            self.order = []
+            self.totalSize = 0
+            self.folderMtimeNs = None
+            return False
+        return self.folderMtimeNs is not None
+
+    def _writeJournal(self, lines: List[str], mode: str):
+        # The journal is created once and then only written in place,
+        # so that writing it does not change the folder mtime.
+        created = not os.path.exists(self.journalPath)
+        with open(self.journalPath, mode, encoding="utf-8") as f:
+            f.write("".join(f"{line}\n" for line in lines))
+        if created:
+            self.folderMtimeNs = os.stat(self.folder).st_mtime_ns
+            with open(self.journalPath, "a", encoding="utf-8") as f:
+                f.write(f"@{self.folderMtimeNs}\n")
+
+    def compact(self):
+        lines = [f"+{mtimeNs}\t{self.files[name][1]}\t{name}" for mtimeNs, name in self.order]
+        lines.append(f"@{self.folderMtimeNs}")
+        self._writeJournal(lines, "w")
+        self._journalLines = len(lines)
+
+    def append(self, lines: List[str]):
+        if self._journalLines + len(lines) > self._compactRatio * (len(self.files) + 16):
+            self.compact()
+        else:
+            self._writeJournal(lines, "a")
+            self._journalLines += len(lines)
+
+
+class RetentionEngine:
+    """
+    Contains helper functions to apply a RetentionPolicy to a folder. Unlikely that users of the aladdin_auto library
+    will need to use these methods.
+    """
+
+    _ledgers: Dict[Tuple[str, str], _Ledger] = {}
+
+    @staticmethod
+    def _getLedger(folder: str, pattern: str) -> _Ledger:
+        key = (os.path.abspath(folder), pattern)
+        ledger = RetentionEngine._ledgers.get(key)
+        if ledger is None:
+            ledger = _Ledger(key[0], pattern)
+            if not ledger.load():
+                ledger.folderMtimeNs = None
+            RetentionEngine._ledgers[key] = ledger
+        folderMtimeNs = os.stat(ledger.folder).st_mtime_ns
+        if folderMtimeNs != ledger.folderMtimeNs:
+            # folder changed behind our back: resynchronize
+            ledger.scan()
+            ledger.folderMtimeNs = folderMtimeNs
+            ledger.compact()
+        return ledger
+
+    @staticmethod
+    def recordFile(path: str, pattern: str):
+        """Add a file that was just written to the ledger of its folder, so that the next prune does not have to
+        scan the folder.
+
+        :param path: path to the new file
+        :param pattern: glob pattern of the files tracked for this folder
+        :meta private:
+        """
+        folder = os.path.dirname(os.path.abspath(path))
+        ledger = RetentionEngine._ledgers.get((folder, pattern))
+        if ledger is None or not ledger.matches(os.path.basename(path)):
+            return
+        stat = os.stat(path)
+        name = os.path.basename(path)
+        ledger.add(name, stat.st_mtime_ns, stat.st_size)
+        ledger.folderMtimeNs = os.stat(folder).st_mtime_ns
+        ledger.append([f"+{stat.st_mtime_ns}\t{stat.st_size}\t{name}", f"@{ledger.folderMtimeNs}"])
+
+    @staticmethod
+    def prune(folder: str, pattern: str, policy: RetentionPolicy, now: Optional[float] = None) -> List[str]:
+        """Delete the oldest files matching pattern in folder until every limit of the policy is respected.
+
+        :param folder: path to folder
+        :param pattern: glob pattern of the files to consider (e.g. "*.zip")
+        :param policy: limits to apply
+        :param now: current time (seconds since epoch), used for the age limit
+        :return: list of deleted paths
+        :meta private:
+        """
+        if not policy.isEnabled() or not os.path.isdir(folder):
+            return []
+        ledger = RetentionEngine._getLedger(folder, pattern)
+        if now is None:
+            now = time.time()
+        ageLimitNs = int((now - policy.maxAgeSecs) * 1e9) if policy.maxAgeSecs >= 0 else None
+
+        deleted = []
+        while ledger.order:
+            mtimeNs, name = ledger.order[0]
+            if not ((ageLimitNs is not None and mtimeNs < ageLimitNs)
+                    or (policy.maxCount >= 0 and len(ledger.order) > policy.maxCount)
+                    or (policy.maxBytes >= 0 and ledger.totalSize > policy.maxBytes)):
+                break
+            path = os.path.join(ledger.folder, name)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            ledger.remove(name)
+            deleted.append(path)
+
+        if deleted:
+            ledger.folderMtimeNs = os.stat(ledger.folder).st_mtime_ns
+            ledger.append([f"-{os.path.basename(path)}" for path in deleted] + [f"@{ledger.folderMtimeNs}"])
+        return deleted
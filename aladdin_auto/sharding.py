@@ -0,0 +1,125 @@
+"""
+This module contains methods to run tests in parallel with pytest-xdist (e.g. "pytest -n 4").
+
+Each worker gets its own browser ports (primary_browser_port and secondary_browser_port shifted by
+worker_port_stride times the worker number), Aladdin Standalone Application (standalone_path may contain "{worker}"
+to use one installation per worker, since the ports are set in its config.properties file), trace folder and output
+files. The output files of the workers are merged by the controller process at the end of the session.
+"""
+import glob
+import os
+import re
+from aladdin_auto.config import Config
+
+_WORKER_PATTERN = re.compile(r"gw(\d+)$")
+
+
+def workerId() -> str:
+    """
+    Id of the current xdist worker (e.g. "gw0"), or an empty string if tests are not run in parallel.
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "")
+
+
+def workerIndex(worker: str) -> int:
+    """
+    Number of the worker (e.g. 0 for "gw0").
+    """
+    match = _WORKER_PATTERN.match(worker)
+    return int(match.group(1)) if match else 0
+
+
+def workerPath(path: str, worker: str) -> str:
+    """
+    Path of the fragment of an output file written by a worker, e.g. "reports/timing.gw0.jsonl" for
+    "reports/timing.jsonl".
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{worker}{ext}"
+
+
+def fragmentPaths(path: str) -> list[str]:
+    """
+    Paths of the existing worker fragments of an output file, ordered by worker number.
+    """
+    root, ext = os.path.splitext(path)
+    fragments = []
+    for fragment in glob.glob(f"{glob.escape(root)}.gw*{ext}"):
+        worker = fragment[len(root) + 1:len(fragment) - len(ext)]
+        if _WORKER_PATTERN.match(worker):
+            fragments.append((workerIndex(worker), fragment))
+    return [fragment for _, fragment in sorted(fragments)]
+
+
+def configureWorker(worker: str, portStride: int):
+    """Override the options that must differ between workers.
+
+    :param worker: id of the worker (e.g. "gw1")
+    :param portStride: difference between the ports of two consecutive workers
+    """
+    index = workerIndex(worker)
+    Config.setOption("primary_browser_port", Config.primaryBrowserPort() + index * portStride)
+    Config.setOption("secondary_browser_port", Config.secondaryBrowserPort() + index * portStride)
+    Config.setOption("standalone_path", Config.aladdinStandalonePath().replace("{worker}", worker))
+    Config.setOption("trace_folder_path", os.path.join(Config.traceFolderPath(), worker))
+    for option in ("timing_jsonl_path", "timing_prom_path", "web_storage_state_path"):
+        path = Config.getFullConfigDictionary()[option]
+        if path != "":
+            Config.setOption(option, workerPath(path, worker))
+
+
+def mergeJsonlFragments(path: str) -> int:
+    """
+    Append the lines of the worker fragments of a JSON lines file to the file and delete the fragments.
+
+    :return: number of merged fragments
+    """
+    fragments = fragmentPaths(path)
+    if not fragments:
+        return 0
+    with open(path, "a", encoding="utf-8") as output:
+        for fragment in fragments:
+            with open(fragment, "r", encoding="utf-8") as f:
+                for line in f:
+                    output.write(line if line.endswith("\n") else line + "\n")
+            os.remove(fragment)
+    return len(fragments)
+
+
+def mergePrometheusFragments(path: str) -> int:
+    """
+    Combine the worker fragments of a Prometheus text file into the file, keeping the samples of each metric together
+    as required by the format. The fragments are deleted.
+
+    :return: number of merged fragments
+    """
+    fragments = fragmentPaths(path)
+    if not fragments:
+        return 0
+    families: dict[str, list[str]] = {}
+    for fragment in fragments:
+        with open(fragment, "r", encoding="utf-8") as f:
+            family = None
+            for line in f.read().splitlines():
+                if line.startswith("# HELP ") or line.startswith("# TYPE "):
+                    family = line.split()[2]
+                    lines = families.setdefault(family, [])
+                    if line not in lines:
+                        lines.append(line)
+                elif line:
+                    name = re.split(r"[{ ]", line, maxsplit=1)[0]
+                    if family is None or not name.startswith(family):
+                        # metric without HELP and TYPE lines
+                        family = name
+                    families.setdefault(family, []).append(line)
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    tmpPath = f"{path}.{os.getpid()}.tmp"
+    with open(tmpPath, "w", encoding="utf-8") as f:
+        for lines in families.values():
+            f.write("\n".join(lines) + "\n")
+    os.replace(tmpPath, path)
+    for fragment in fragments:
+        os.remove(fragment)
+    return len(fragments)
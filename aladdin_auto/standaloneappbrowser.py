@@ -1,34 +1,102 @@
-from typing import Tuple
-from playwright.sync_api import Browser, Page
+from __future__ import annotations
+import json
+from typing import Tuple, Union
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, Page
 from aladdin_auto.aladdinbrowser import AladdinBrowser
 from aladdin_auto.config import Config
 import time
 
+# delays between two probes of the DevTools endpoints, doubled after each probe
+_PROBE_INITIAL_DELAY_SECS = 0.05
+_PROBE_MAX_DELAY_SECS = 1.0
+_PROBE_REQUEST_TIMEOUT_SECS = 1.0
+# opener of the DevTools endpoints, created on first use
+_probeOpener = None
 
-def _connectToAppBrowser(playwright, port: int, pageURLEnding: str, maxConnectTries: int) -> Tuple[Browser, Page]:
-    connectTries = 0
-    if maxConnectTries is None:
-        maxConnectTries = Config.standaloneStartupSecs()
-    connected = False
-    page = None
-    browser = None
-    while connectTries < maxConnectTries and not connected:
-        try:
-            time.sleep(1)
-            browser = playwright.chromium.connect_over_cdp("http://localhost:" + str(port), slow_mo=Config.slowMo())
-            default_context = browser.contexts[0]
-            page = default_context.pages[0]
+
+class AladdinConnectionError(Exception):
+    """Raised when the browser of the Aladdin Standalone Application can't be attached."""
+
+
+def _getDevToolsJson(port: int, path: str):
+    global _probeOpener
+    if _probeOpener is None:
+        # Imported here, so that importing the controller stays cheap
+        import urllib.request
+        # the DevTools endpoints are local, never go through a proxy
+        _probeOpener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+    with _probeOpener.open(f"http://localhost:{port}{path}", timeout=_PROBE_REQUEST_TIMEOUT_SECS) as response:
+        return json.load(response)
+
+
+def probeTargetPage(port: int, pageURLEnding: str) -> Union[dict, None]:
+    """Check once, without attaching Playwright, whether the browser listening on port is ready and has a page whose
+    URL ends with pageURLEnding. Uses the /json/version and /json/list DevTools HTTP endpoints.
+
+    :param port: remote debugging port of the browser
+    :param pageURLEnding: ending of the URL of the page (empty string for any page)
+    :return: DevTools target description of the page, or None if the browser or the page is not ready
+    """
+    try:
+        _getDevToolsJson(port, "/json/version")
+        targets = _getDevToolsJson(port, "/json/list")
+    except (OSError, ValueError):
+        # connection refused, timeout or incomplete response while the app starts
+        return None
+    for target in targets:
+        if target.get("type") == "page" and target.get("url", "").endswith(pageURLEnding):
+            return target
+    return None
+
+
+def waitForTargetPage(port: int, pageURLEnding: str, timeoutSecs: float) -> dict:
+    """Probe the browser listening on port with exponential backoff until it has a page whose URL ends with
+    pageURLEnding.
+
+    :raises AladdinConnectionError: if the page doesn't exist after timeoutSecs
+    :return: DevTools target description of the page
+    """
+    deadline = time.monotonic() + timeoutSecs
+    delay = _PROBE_INITIAL_DELAY_SECS
+    while True:
+        target = probeTargetPage(port, pageURLEnding)
+        if target is not None:
+            return target
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise AladdinConnectionError(f"No page ending with {pageURLEnding!r} on port {port} after {timeoutSecs} s")
+        time.sleep(min(delay, remaining))
+        delay = min(2 * delay, _PROBE_MAX_DELAY_SECS)
+
+
+def _findPage(browser: Browser, pageURLEnding: str) -> Union[Page, None]:
+    for context in browser.contexts:
+        for page in context.pages:
             if page.url.endswith(pageURLEnding):
-                connected = True
-            else:
-                browser.close()
-                connectTries += 1
-        except Exception:
-            connectTries += 1
-    if not connected:
-        raise Exception("Could not connect to Aladdin browser")
+                return page
+    return None
 
-    return browser, page
+
+def _connectToAppBrowser(playwright, port: int, pageURLEnding: str, timeoutSecs: float) -> Tuple[Browser, Page]:
+    if timeoutSecs is None:
+        timeoutSecs = Config.standaloneStartupSecs()
+    deadline = time.monotonic() + timeoutSecs
+    while True:
+        # attach only once the page exists, probing is much cheaper than a CDP connection
+        waitForTargetPage(port, pageURLEnding, max(0.0, deadline - time.monotonic()))
+        try:
+            browser = playwright.chromium.connect_over_cdp("http://localhost:" + str(port), slow_mo=Config.slowMo())
+        except Exception as e:
+            raise AladdinConnectionError(f"Could not connect to Aladdin browser on port {port}") from e
+        page = _findPage(browser, pageURLEnding)
+        if page is not None:
+            return browser, page
+        # the page navigated away between the probe and the connection
+        browser.close()
+        if time.monotonic() >= deadline:
+            raise AladdinConnectionError("Could not connect to Aladdin browser")
 
 def initPrimaryBrowser(playwright, port: int, pageURLEnding: str) -> Tuple[Browser, Page]:
     """Attach to the primary browser in an already running Aladdin Standalone Application.
@@ -40,8 +108,7 @@ def initPrimaryBrowser(playwright, port: int, pageURLEnding: str) -> Tuple[Brows
     :param pageURLEnding: Ending of the URL for the primary browser's page (usually 'home')
     :return: tuple of the Playwright browser and current page.
     """
-    maxConnectTries = Config.standaloneStartupSecs()
-    browser, page = _connectToAppBrowser(playwright, port, pageURLEnding, maxConnectTries)
+    browser, page = _connectToAppBrowser(playwright, port, pageURLEnding, Config.standaloneStartupSecs())
 
     # wait for standalone components to display
     print('Waiting for button: Device Detection')
@@ -53,12 +120,26 @@ def initPrimaryBrowser(playwright, port: int, pageURLEnding: str) -> Tuple[Brows
     return browser, page
 
 
+def resetPrimaryBrowser(playwright, port: int, homeUrl: str) -> Tuple[Browser, Page]:
+    """Attach to the primary browser of an Aladdin Standalone Application used by a previous test and navigate back to
+    the home page, instead of restarting the application.
+
+    :param port: number of port. Should match PrimarySeleniumPort in Aladdin's config.properties
+    :param homeUrl: URL of the primary browser's home page
+    :return: tuple of the Playwright browser and current page.
+    """
+    browser, page = _connectToAppBrowser(playwright, port, "", Config.standaloneStartupSecs())
+    page.goto(homeUrl)
+    page.get_by_role("button", name="Device Detection").wait_for()
+    return browser, page
+
+
 def initSecondaryBrowser(playwright) -> AladdinBrowser:
     """Attach to the secondary browser in an already running Aladdin Standalone Application. The page must be already open
     when this method is called. Used for controlling pages like the device detection page or the firmware update page.
     """
-    maxConnectTries = Config.secondaryBrowserStartupSecs()
-    browser, page = _connectToAppBrowser(playwright, Config.secondaryBrowserPort(), "index.html", maxConnectTries)
+    browser, page = _connectToAppBrowser(playwright, Config.secondaryBrowserPort(), "index.html",
+                                         Config.secondaryBrowserStartupSecs())
     return AladdinBrowser(browser, page)
 
 
@@ -76,8 +157,7 @@ def connectPrimaryBrowser(playwright, port: int, pageURLEnding: str) -> Tuple[Br
     :param pageURLEnding: Ending of the URL for the primary browser's page (usually 'home')
     :return: tuple of the Playwright browser and current page.
     """
-    maxConnectTries = Config.standaloneStartupSecs()
-    browser, page = _connectToAppBrowser(playwright, port, pageURLEnding, maxConnectTries)
+    browser, page = _connectToAppBrowser(playwright, port, pageURLEnding, Config.standaloneStartupSecs())
 
     # wait a second for standalone app to attach events to buttons
     time.sleep(1)
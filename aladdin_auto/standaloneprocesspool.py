@@ -0,0 +1,131 @@
+"""
+This module keeps Aladdin Standalone Application processes running between tests.
+It is used by the aladdinProcess and aladdinProcessDeveloperMode fixtures, see the standalone_process_usage_limit and
+standalone_process_prewarm options.
+"""
+from __future__ import annotations
+import logging
+import subprocess
+from typing import Tuple, Union
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, Page
+from aladdin_auto.browsermetrics import recycleReason
+from aladdin_auto.standaloneappbrowser import initPrimaryBrowser, resetPrimaryBrowser
+
+
+class StandaloneAppInstance:
+    """
+    A running Aladdin Standalone Application process handed out by StandaloneProcessPool.
+    """
+
+    def __init__(self, process: subprocess.Popen, port: int, developerMode: bool) -> None:
+        self.process = process
+        self.port = port
+        self.developerMode = developerMode
+        # number of tests that used this instance
+        self.uses = 0
+        # URL of the primary page once it was attached, used to reset the application for the next test
+        self.homeUrl = None
+        # memory used after the last test (unit = MB), None if not sampled
+        self.memoryMb = None
+
+    def isAlive(self) -> bool:
+        return self.process.poll() is None
+
+    def attachPrimaryBrowser(self, playwright) -> Tuple[Browser, Page]:
+        """Attach to the primary browser of this instance. If a previous test used it, the primary page is navigated
+        back to the home page instead of restarting the application.
+
+        :return: tuple of the Playwright browser and current page.
+        """
+        if self.homeUrl is None:
+            browser, page = initPrimaryBrowser(playwright, self.port, "home")
+            self.homeUrl = page.url
+        else:
+            browser, page = resetPrimaryBrowser(playwright, self.port, self.homeUrl)
+        return browser, page
+
+
+class StandaloneProcessPool:
+    """
+    Keeps a warmed Aladdin Standalone Application running between tests.
+
+    The remote debugging port of the application is set in its config.properties file, so only one instance can run
+    per port. An instance is restarted when the test using it failed, when the process exited, when a test needs the
+    other mode (developer mode or not), after it was used by usageLimit tests, or when it uses more than memoryLimitMb.
+    """
+
+    def __init__(self, standalonePath: str, port: int, usageLimit: int = 1, memoryLimitMb: int = -1) -> None:
+        """
+        :param standalonePath: path to Aladdin.exe
+        :param port: primary browser port of the application
+        :param usageLimit: number of tests an instance is used for before it is restarted, unlimited if -1
+        :param memoryLimitMb: memory of an instance above which it is restarted (see StandaloneAppInstance.memoryMb),
+            unlimited if -1
+        """
+        self._standalonePath = standalonePath
+        self._port = port
+        self._usageLimit = usageLimit
+        self._memoryLimitMb = memoryLimitMb
+        self._instance: Union[StandaloneAppInstance, None] = None
+
+    def _start(self, developerMode: bool) -> StandaloneAppInstance:
+        args = [self._standalonePath, "+d"] if developerMode else [self._standalonePath]
+        logging.info(f"Starting Aladdin Standalone Application: {args!r}")
+        self._instance = StandaloneAppInstance(subprocess.Popen(args), self._port, developerMode)
+        return self._instance
+
+    def _stop(self) -> None:
+        instance = self._instance
+        if instance is None:
+            return
+        self._instance = None
+        instance.process.terminate()
+        try:
+            # the next instance can't listen on the port until this one is gone
+            instance.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            instance.process.kill()
+
+    def warm(self, developerMode: bool = False) -> None:
+        """
+        Start an instance in the background, so it is ready when a test acquires it.
+        """
+        instance = self._instance
+        if instance is not None and instance.isAlive() and instance.developerMode == developerMode:
+            return
+        self._stop()
+        self._start(developerMode)
+
+    def acquire(self, developerMode: bool = False) -> StandaloneAppInstance:
+        """
+        Return a running instance for a test, starting one if needed.
+        """
+        self.warm(developerMode)
+        instance = self._instance
+        instance.uses += 1
+        return instance
+
+    def release(self, instance: StandaloneAppInstance, failed: bool, prewarm: bool = False) -> None:
+        """Give back an instance after a test.
+
+        :param failed: True if the test failed, the instance is restarted since its state is unknown
+        :param prewarm: True to start the replacement of a recycled instance immediately
+        """
+        if instance is not self._instance:
+            return
+        reason = "test failed" if failed else recycleReason(instance.uses, instance.memoryMb, self._usageLimit, self._memoryLimitMb)
+        if reason is None and not instance.isAlive():
+            reason = "process exited"
+        if reason is not None:
+            logging.info(f"Restarting Aladdin Standalone Application: {reason}")
+            self._stop()
+            if prewarm:
+                self._start(instance.developerMode)
+
+    def shutdown(self) -> None:
+        """
+        Stop the running instance.
+        """
+        self._stop()
@@ -0,0 +1,191 @@
+"""
+This module contains lightweight span instrumentation for the controller and the aladdin_auto actions.
+
+Spans are only recorded when timing is enabled (see the timing_enabled configuration setting). When disabled, a span is a
+shared no-op context manager and a timed function costs one attribute check.
+
+The spans recorded during a cycle (one capture of the controller, or one test) are exported by Timing.flush as one JSON
+line and as a Prometheus text file that can be scraped by the node exporter textfile collector.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        return False
+
+
+_nullSpan = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        Timing._stack().append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        duration = time.perf_counter() - self.start
+        stack = Timing._stack()
+        stack.pop()
+        Timing.record(self.name, duration, parent=stack[-1] if stack else None, error=excType is not None)
+        return False
+
+
+def _escapeLabel(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class Timing:
+    """
+    Records spans and exports them per cycle.
+    """
+
+    _enabled = False
+    _local = threading.local()
+    _lock = threading.Lock()
+    _spans: List[Dict] = []
+    # cumulative [count, sum of durations] per span name, exported as a Prometheus summary
+    _totals: Dict[str, List[float]] = {}
+    # constant labels added to every exported metric, e.g. 'worker="gw0",'
+    _labels = ""
+
+    @staticmethod
+    def enable(enabled: bool = True):
+        Timing._enabled = enabled
+
+    @staticmethod
+    def setLabels(**labels: str):
+        """
+        Add constant labels to the exported metrics, e.g. Timing.setLabels(worker="gw0") for parallel test workers.
+        """
+        Timing._labels = "".join(f'{name}="{_escapeLabel(value)}",' for name, value in labels.items())
+
+    @staticmethod
+    def isEnabled() -> bool:
+        return Timing._enabled
+
+    @staticmethod
+    def _stack() -> List[str]:
+        try:
+            return Timing._local.stack
+        except AttributeError:
+            Timing._local.stack = []
+            return Timing._local.stack
+
+    @staticmethod
+    def span(name: str):
+        """Context manager measuring the enclosed block.
+
+        :param name: name of the span
+        """
+        if not Timing._enabled:
+            return _nullSpan
+        return _Span(name)
+
+    @staticmethod
+    def timed(name: Optional[str] = None) -> Callable:
+        """Decorator measuring every call of a function.
+
+        :param name: name of the span (default: module.function)
+        """
+        def decorator(func):
+            spanName = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not Timing._enabled:
+                    return func(*args, **kwargs)
+                with _Span(spanName):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def record(name: str, duration: float, parent: Optional[str] = None, error: bool = False):
+        """Record a span measured elsewhere.
+
+        :param name: name of the span
+        :param duration: duration in seconds
+        :param parent: name of the enclosing span
+        :param error: True if the span ended with an exception
+        """
+        if not Timing._enabled:
+            return
+        with Timing._lock:
+            Timing._spans.append({"name": name, "duration": duration, "parent": parent, "error": error})
+            totals = Timing._totals.setdefault(name, [0, 0.0])
+            totals[0] += 1
+            totals[1] += duration
+
+    @staticmethod
+    def flush(cycle: str, jsonlPath: str = "", promPath: str = "") -> List[Dict]:
+        """Export the spans recorded since the last flush and start a new cycle.
+
+        :param cycle: name of the cycle (e.g. capture or test node id)
+        :param jsonlPath: JSON lines file to append the cycle to. Ignored if blank.
+        :param promPath: Prometheus text file to rewrite. Ignored if blank.
+        :return: spans of the cycle
+        """
+        with Timing._lock:
+            spans = Timing._spans
+            Timing._spans = []
+            totals = {name: list(values) for name, values in Timing._totals.items()}
+        if not Timing._enabled:
+            return spans
+
+        if jsonlPath:
+            folder = os.path.dirname(jsonlPath)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            line = {"cycle": cycle, "time": datetime.now().isoformat(timespec="seconds"), "spans": spans}
+            with open(jsonlPath, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line) + "\n")
+
+        if promPath:
+            Timing._writePrometheus(promPath, spans, totals)
+        return spans
+
+    @staticmethod
+    def _writePrometheus(promPath: str, spans: List[Dict], totals: Dict[str, List[float]]):
+        last: Dict[str, float] = {}
+        for span in spans:
+            last[span["name"]] = last.get(span["name"], 0.0) + span["duration"]
+        lines = [
+            "# HELP aladdin_span_last_cycle_seconds Time spent in each span during the last cycle.",
+            "# TYPE aladdin_span_last_cycle_seconds gauge",
+        ]
+        labels = Timing._labels
+        lines += [f'aladdin_span_last_cycle_seconds{{{labels}span="{_escapeLabel(name)}"}} {value:.6f}' for name, value in sorted(last.items())]
+        lines += [
+            "# HELP aladdin_span_seconds Time spent in each span since start.",
+            "# TYPE aladdin_span_seconds summary",
+        ]
+        for name, (count, total) in sorted(totals.items()):
+            lines.append(f'aladdin_span_seconds_sum{{{labels}span="{_escapeLabel(name)}"}} {total:.6f}')
+            lines.append(f'aladdin_span_seconds_count{{{labels}span="{_escapeLabel(name)}"}} {count}')
+        timestampLabels = f"{{{labels.rstrip(',')}}}" if labels else ""
+        lines.append(f"aladdin_last_cycle_timestamp_seconds{timestampLabels} {time.time():.0f}")
+
+        folder = os.path.dirname(promPath)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        # write then rename, so the node exporter never reads a partial file
+        tmpPath = f"{promPath}.{os.getpid()}.tmp"
+        with open(tmpPath, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmpPath, promPath)
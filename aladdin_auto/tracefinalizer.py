@@ -0,0 +1,130 @@
+"""
+This module finalizes context tracing files in a background thread, so tests don't wait for them.
+
+Tracing is stopped on the Playwright thread into a staging folder next to the trace folder. The background thread then
+recompresses the trace, moves it to the trace folder, appends it to the trace index and prunes the trace folder.
+
+Apart from moving the final trace, the trace folder is only written in place (the index is created once and then
+appended to or rewritten in place), so its modification time keeps telling the retention engine that the folder was
+not changed by something else and does not have to be scanned again.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import zipfile
+from typing import Callable, Optional
+
+INDEX_FILE_NAME = "trace_index.jsonl"
+_STAGING_FOLDER_SUFFIX = ".staging"
+
+
+class TraceFinalizer:
+    """
+    Background worker that finalizes trace files. submit only blocks when maxQueued traces are waiting.
+    """
+
+    def __init__(self, folder: str, maxQueued: int = 4, compressLevel: int = 6,
+                 prune: Optional[Callable[[str], list]] = None) -> None:
+        """
+        :param folder: trace folder
+        :param maxQueued: number of traces waiting for finalization above which submit blocks
+        :param compressLevel: zlib compression level of the final trace (0 to keep the trace as written by Playwright)
+        :param prune: called with the path of each final trace, returns the list of deleted traces
+        """
+        self.folder = folder
+        # next to the trace folder, writing the traces there doesn't change the trace folder
+        self.stagingFolder = f"{os.path.normpath(folder)}{_STAGING_FOLDER_SUFFIX}"
+        self._compressLevel = compressLevel
+        self._prune = prune
+        self._queue = queue.Queue(maxsize=max(1, maxQueued))
+        self._thread = None
+
+    def stagingPath(self, name: str) -> str:
+        """
+        Path where Playwright should write the trace named name (e.g. "test_x.zip").
+        """
+        os.makedirs(self.stagingFolder, exist_ok=True)
+        return os.path.join(self.stagingFolder, name)
+
+    def submit(self, stagingPath: str, metadata: Optional[dict] = None):
+        """Queue a trace written to stagingPath for finalization.
+
+        :param metadata: fields added to the entry of the trace in the index (e.g. test node id and outcome)
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="TraceFinalizer", daemon=True)
+            self._thread.start()
+        self._queue.put((stagingPath, metadata or {}))
+
+    def drain(self):
+        """
+        Wait until all submitted traces are finalized.
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """
+        Finalize the submitted traces and stop the background thread.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                stagingPath, metadata = job
+                self.finalize(stagingPath, metadata)
+            except Exception:
+                logging.exception(f"Failed to finalize trace {job[0]!r}")
+            finally:
+                self._queue.task_done()
+
+    def finalize(self, stagingPath: str, metadata: dict) -> str:
+        """
+        Recompress, index and prune a staged trace. Called by the background thread.
+
+        :return: path of the final trace
+        """
+        tracePath = os.path.join(self.folder, os.path.basename(stagingPath))
+        os.makedirs(self.folder, exist_ok=True)
+        if self._compressLevel > 0:
+            tmpPath = f"{stagingPath}.tmp"
+            with zipfile.ZipFile(stagingPath, "r") as source, \
+                    zipfile.ZipFile(tmpPath, "w", zipfile.ZIP_DEFLATED, compresslevel=self._compressLevel) as target:
+                for info in source.infolist():
+                    target.writestr(info.filename, source.read(info), compress_type=zipfile.ZIP_DEFLATED,
+                                    compresslevel=self._compressLevel)
+            os.replace(tmpPath, tracePath)
+            os.remove(stagingPath)
+        else:
+            os.replace(stagingPath, tracePath)
+
+        entry = {"trace": os.path.basename(tracePath), "bytes": os.path.getsize(tracePath),
+                 "time": time.strftime("%Y-%m-%d %H:%M:%S"), **metadata}
+        with open(os.path.join(self.folder, INDEX_FILE_NAME), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+        if self._prune is not None:
+            deleted = self._prune(tracePath)
+            if deleted:
+                self._removeFromIndex({os.path.basename(path) for path in deleted})
+        return tracePath
+
+    def _removeFromIndex(self, names: set):
+        indexPath = os.path.join(self.folder, INDEX_FILE_NAME)
+        # rewritten in place, replacing the file would change the folder modification time
+        with open(indexPath, "r+", encoding="utf-8") as f:
+            lines = [line for line in f if json.loads(line)["trace"] not in names]
+            f.seek(0)
+            f.writelines(lines)
+            f.truncate()
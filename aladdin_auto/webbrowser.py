@@ -2,9 +2,16 @@
 This module contains methods related to connecting to Aladdin through a web browser.
 It is recommended that you use the defaultAladdinBrowser fixture instead of using these methods directly.
 """
-from typing import Tuple, List
-from playwright.sync_api import Browser, Page
+from __future__ import annotations
+import fnmatch
+import logging
+import os
+from typing import Callable, List, Tuple, Union
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, Page
 from aladdin_auto.config import Config
+from aladdin_auto.networkcache import AssetCache
 
 
 def connectToWebBrowser(playwright, url: str, launchArgs: List[str]) -> Tuple[Browser, Page]:
@@ -18,5 +25,230 @@ def connectToWebBrowser(playwright, url: str, launchArgs: List[str]) -> Tuple[Br
     chromium = playwright.chromium
     browser = chromium.launch(headless=Config.headless(), slow_mo=Config.slowMo(), args=launchArgs)
     page = browser.new_page()
+    configureRouting(page)
     page.goto(url)
     return browser, page
+
+
+def configureRouting(target):
+    """
+    Route the requests of a browser context or page as configured by the network_* options: requests of blocked
+    resource types or URLs are aborted, static assets are served from the asset cache, which is filled on first use,
+    and in replay network mode requests are served from the recorded archive. Nothing is intercepted if no option is
+    set.
+
+    :param target: Playwright BrowserContext or Page
+    :meta private:
+    """
+    router = _assetRouter()
+    if router is not None:
+        target.route("**/*", router.handleRoute)
+    harPath = _replayHarPath()
+    if harPath is not None:
+        # routes are matched from the last one registered, so the archive is used first
+        target.route_from_har(harPath, not_found=Config.networkReplayNotFound())
+
+
+async def configureRoutingAsync(target):
+    """
+    Same as configureRouting, for a BrowserContext or Page of the Playwright async API.
+
+    :meta private:
+    """
+    router = _assetRouter()
+    if router is not None:
+        await target.route("**/*", router.handleRouteAsync)
+    harPath = _replayHarPath()
+    if harPath is not None:
+        await target.route_from_har(harPath, not_found=Config.networkReplayNotFound())
+
+
+def _replayHarPath() -> Union[str, None]:
+    networkMode = Config.networkMode()
+    if networkMode == "replay":
+        if not os.path.exists(Config.networkHarPath()):
+            raise FileNotFoundError(f"No recorded archive for replay network mode: {Config.networkHarPath()}")
+        return Config.networkHarPath()
+    elif networkMode != "live":
+        raise ValueError(f"Unexpected network mode: {networkMode}")
+    return None
+
+
+def _assetRouter() -> Union["_AssetRouter", None]:
+    blockedTypes = set(Config.networkBlockResourceTypes())
+    blockedUrlPatterns = Config.networkBlockUrlPatterns()
+    cacheFolder = Config.networkCacheFolderPath()
+    if blockedTypes or blockedUrlPatterns or cacheFolder != "":
+        return _AssetRouter(blockedTypes, blockedUrlPatterns, cacheFolder)
+    return None
+
+
+class _AssetRouter:
+    """
+    Route handler blocking requests and serving static assets from the asset cache, for the sync and async APIs.
+    """
+
+    def __init__(self, blockedTypes: set, blockedUrlPatterns: List[str], cacheFolder: str) -> None:
+        self._blockedTypes = blockedTypes
+        self._blockedUrlPatterns = blockedUrlPatterns
+        self._cache = AssetCache(cacheFolder) if cacheFolder != "" else None
+        self._cachedTypes = set(Config.networkCacheResourceTypes())
+
+    def _blocked(self, request) -> bool:
+        return request.resource_type in self._blockedTypes or any(fnmatch.fnmatch(request.url, pattern) for pattern in self._blockedUrlPatterns)
+
+    def _cacheable(self, request) -> bool:
+        return self._cache is not None and request.method == "GET" and request.resource_type in self._cachedTypes and request.url.startswith("http")
+
+    def handleRoute(self, route, request):
+        if self._blocked(request):
+            route.abort("blockedbyclient")
+            return
+        if not self._cacheable(request):
+            route.fallback()
+            return
+        cached = self._cache.get(request.url)
+        if cached is not None:
+            status, headers, body = cached
+            route.fulfill(status=status, headers=headers, body=body)
+            return
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Exception as e:
+            # let the browser send the request, so the page gets the network error
+            logging.warning(f"Failed to fetch {request.url} for the asset cache: {e}")
+            route.fallback()
+            return
+        if response.status == 200:
+            self._cache.put(request.url, response.status, response.headers, body)
+        route.fulfill(response=response, body=body)
+
+    async def handleRouteAsync(self, route, request):
+        if self._blocked(request):
+            await route.abort("blockedbyclient")
+            return
+        if not self._cacheable(request):
+            await route.fallback()
+            return
+        cached = self._cache.get(request.url)
+        if cached is not None:
+            status, headers, body = cached
+            await route.fulfill(status=status, headers=headers, body=body)
+            return
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception as e:
+            logging.warning(f"Failed to fetch {request.url} for the asset cache: {e}")
+            await route.fallback()
+            return
+        if response.status == 200:
+            self._cache.put(request.url, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
+
+def recordWebApp(playwright, url: str, harPath: str, launchArgs: List[str], navigate: Callable[[Page], None]) -> str:
+    """
+    Record every response needed by the web application into a HAR archive for the replay network mode.
+
+    :param url: url of the web application
+    :param harPath: path to the archive, response bodies are stored in it if it ends with .zip
+    :param launchArgs: arguments to launch chromium with
+    :param navigate: called with the page once the home page is loaded, to load the data needed by the tests (e.g.
+        open each product)
+    :return: harPath
+    :meta private:
+    """
+    if os.path.dirname(harPath):
+        os.makedirs(os.path.dirname(harPath), exist_ok=True)
+    browser = launchWebBrowser(playwright, launchArgs)
+    context = browser.new_context()
+    context.route_from_har(harPath, update=True, update_content="attach" if harPath.endswith(".zip") else "embed",
+                           update_mode="full")
+    page = context.new_page()
+    page.goto(url)
+    page.wait_for_load_state("networkidle")
+    navigate(page)
+    page.wait_for_load_state("networkidle")
+    # the archive is written when the context is closed
+    context.close()
+    browser.close()
+    return harPath
+
+
+def launchWebBrowser(playwright, launchArgs: List[str]) -> Browser:
+    """
+    Launch chromium for Aladdin web application. Pages are opened with newWebPage, each in its own context.
+
+    :param launchArgs: arguments to launch chromium with
+    :return: Playwright browser
+    :meta private:
+    """
+    return playwright.chromium.launch(headless=Config.headless(), slow_mo=Config.slowMo(), args=launchArgs)
+
+
+def newWebPage(browser: Browser, url: str, storageState: Union[str, None] = None) -> Page:
+    """
+    Open url in a new context of browser. Closing the page's context discards its cookies and storage, like closing the
+    browser would.
+
+    :param url: url to connect to
+    :param storageState: path to a storage state file saved by saveStorageState, used to initialize the context
+    :return: Playwright page
+    :meta private:
+    """
+    context = browser.new_context(storage_state=storageState)
+    configureRouting(context)
+    page = context.new_page()
+    page.goto(url)
+    return page
+
+
+def saveStorageState(browser: Browser, url: str, path: str) -> str:
+    """
+    Open url in a new context of browser and save its cookies and local storage to path.
+
+    :return: path
+    :meta private:
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    page = newWebPage(browser, url)
+    page.wait_for_load_state("networkidle")
+    page.context.storage_state(path=path)
+    page.context.close()
+    return path
+
+
+class SharedWebBrowser:
+    """
+    Chromium shared by the tests of a session, which can be relaunched between tests.
+
+    :meta private:
+    """
+
+    def __init__(self, playwright, url: str, launchArgs: List[str]) -> None:
+        self._playwright = playwright
+        self._launchArgs = launchArgs
+        self.url = url
+        self.browser = launchWebBrowser(playwright, launchArgs)
+        # path to storage state file used to initialize each context, see saveStorageState
+        self.storageState = None
+        # number of tests since the browser was launched
+        self.testCount = 0
+
+    def newPage(self) -> Page:
+        """
+        Open the url in a new context, for a test.
+        """
+        self.testCount += 1
+        return newWebPage(self.browser, self.url, self.storageState)
+
+    def relaunch(self) -> None:
+        self.browser.close()
+        self.browser = launchWebBrowser(self._playwright, self._launchArgs)
+        self.testCount = 0
+
+    def close(self) -> None:
+        self.browser.close()
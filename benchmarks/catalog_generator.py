@@ -0,0 +1,123 @@
+"""
+Generator of synthetic Aladdin catalogs.
+
+A catalog is written as an Aladdin data folder (products.json, productsMenu.json and one configuration XML per product
+release under ConfigRepository) that ProductXML can load, together with a matching mock web page (index.html) that
+renders the home page search, the product tab, the release selection, the app-param-section top level pages and the
+tree nodes with the same DOM contract as the Aladdin web application used by aladdinactions.
+"""
+import json
+import os
+import xml.etree.ElementTree as ET
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "standin", "aladdin_catalog.html")
+_CATALOG_PLACEHOLDER = "/*CATALOG*/null"
+
+
+class SyntheticCatalog:
+    '''
+    Description of a generated catalog.
+    '''
+
+    def __init__(self, folder: str, products: list[dict]) -> None:
+        '''
+        folder : catalog folder (data folder and mock web page)
+        products : [{"menu": ..., "product": ..., "releases": [...], "parameterCodes": [...]}, ...]
+        '''
+        self.folder = folder
+        self.products = products
+
+    @property
+    def dataFolderPath(self) -> str:
+        return self.folder
+
+    @property
+    def webAppPath(self) -> str:
+        return os.path.join(self.folder, "index.html")
+
+
+def _pageTitle(path: list[int]) -> str:
+    # fixed width numbers and a suffix, so that no title is the prefix of another one
+    return "Section " + ".".join(f"{index:02d}" for index in path) + " settings"
+
+
+def _buildPages(parentElem: ET.Element, parentData: list, path: list[int], count: int, depth: int, fanout: int,
+                paramsPerPage: int, codes: list[str], parameters: ET.Element, codeWidth: int, titles: dict):
+    for index in range(1, count + 1):
+        pagePath = path + [index]
+        title = _pageTitle(pagePath)
+        pageElem = ET.SubElement(parentElem, "page", {"title": title})
+        pageData = {"title": title, "children": []}
+        parentData.append(pageData)
+        for _ in range(paramsPerPage):
+            code = f"{len(codes) + 1:0{codeWidth}d}"
+            name = f"SyntheticParameter{code}"
+            paramElem = ET.SubElement(parameters, "parameter",
+                                      {"name": name, "type": "int", "code": code, "value": "0", "protection": "USER"})
+            ET.SubElement(paramElem, "context").text = f"Synthetic parameter {code}"
+            ET.SubElement(pageElem, "field", {"name": name})
+            codes.append(code)
+            titles[code] = [_pageTitle(pagePath[:i]) for i in range(1, len(pagePath) + 1)]
+        if len(pagePath) < depth:
+            _buildPages(pageElem, pageData["children"], pagePath, fanout, depth, fanout, paramsPerPage, codes,
+                        parameters, codeWidth, titles)
+
+
+def generateCatalog(folder: str, productCount: int = 2, releasesPerProduct: int = 1, topLevelPages: int = 5,
+                    depth: int = 3, fanout: int = 3, paramsPerPage: int = 2) -> SyntheticCatalog:
+    '''
+    Write a synthetic catalog to folder.
+
+    topLevelPages : number of top level pages (app-param-section) per product
+    depth : depth of the page tree, top level pages included
+    fanout : number of child pages of every page below the top level
+    paramsPerPage : number of parameters on every page
+    '''
+    pagesPerTree = topLevelPages * sum(fanout ** level for level in range(depth))
+    codeWidth = max(4, len(str(pagesPerTree * paramsPerPage)))
+
+    productsJson = []
+    productsMenuJson = []
+    pageProducts = []
+    products = []
+    for productIndex in range(productCount):
+        productName = f"Synthetic-P{productIndex:03d}"
+        menuName = f"Synthetic Product {productIndex:03d}"
+        releases = [f"DR{productIndex:03d}{releaseIndex:04d}" for releaseIndex in range(releasesPerProduct)]
+        menuChildren = []
+        for release in releases:
+            menuChildren.append(str(len(productsJson)))
+            productsJson.append(f"{productName}_{release}")
+
+        root = ET.Element("config")
+        parameters = ET.SubElement(root, "parameters")
+        rootPage = ET.SubElement(root, "rootPage")
+        configurationPage = ET.SubElement(rootPage, "page", {"title": "Configuration"})
+        ET.SubElement(root, "tableList")
+        codes = []
+        titles = {}
+        tree = []
+        _buildPages(configurationPage, tree, [], topLevelPages, depth, fanout, paramsPerPage, codes, parameters,
+                    codeWidth, titles)
+
+        for release in releases:
+            xmlFolder = os.path.join(folder, "ConfigRepository", f"{productName}_{release}")
+            os.makedirs(xmlFolder, exist_ok=True)
+            ET.ElementTree(root).write(os.path.join(xmlFolder, f"config_{productName}_{release}.xml"),
+                                       encoding="utf-8", xml_declaration=True)
+
+        productsMenuJson.append({"name": menuName, "children": menuChildren})
+        pageProducts.append({"menu": menuName, "product": productName, "releases": releases,
+                             "pages": tree, "parameters": titles})
+        products.append({"menu": menuName, "product": productName, "releases": releases, "parameterCodes": codes})
+
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "products.json"), "w", encoding="utf-8") as f:
+        json.dump(productsJson, f)
+    with open(os.path.join(folder, "productsMenu.json"), "w", encoding="utf-8") as f:
+        json.dump(productsMenuJson, f)
+    with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
+        page = f.read()
+    with open(os.path.join(folder, "index.html"), "w", encoding="utf-8") as f:
+        f.write(page.replace(_CATALOG_PLACEHOLDER, json.dumps(pageProducts)))
+    return SyntheticCatalog(folder, products)
@@ -0,0 +1,84 @@
+"""
+Offline benchmark of the AladdinController capture cycle.
+
+The controller runs in WEBAPP_LOCAL mode against benchmarks/standin/aladdin_product.html, a local stand-in for the
+Aladdin product page with the same terminal DOM and a simulated scanner response latency, so timing changes can be
+checked on any machine without a scanner.
+
+Run from the repository root:
+    python -m benchmarks.controller_benchmark --cycles 20 --latency 100
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import time
+
+from aladdin_auto.config import AladdinBrowserType, Config
+from controller.aladdin import AladdinController
+
+STANDIN_PAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "standin", "aladdin_product.html")
+
+
+def percentiles(durations: list[float]) -> dict[str, float]:
+    '''
+    Return min, p50, p90, p99, max and mean of durations (unit = sec).
+    '''
+    ordered = sorted(durations)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+        p50, p90, p99 = cuts[49], cuts[89], cuts[98]
+    else:
+        p50 = p90 = p99 = ordered[0]
+    return {
+        "cycles": len(ordered),
+        "min": ordered[0],
+        "p50": p50,
+        "p90": p90,
+        "p99": p99,
+        "max": ordered[-1],
+        "mean": statistics.fmean(ordered),
+    }
+
+
+def run(cycles: int, latency: int, events: int, save: bool) -> dict[str, float]:
+    Config.setOption("default_browser_type", AladdinBrowserType.WEBAPP_LOCAL)
+    Config.setOption("webapp_path", f"{STANDIN_PAGE_PATH}?latency={latency}&events={events}")
+    Config.setOption("headless", True)
+
+    controller = AladdinController()
+    durations = []
+    try:
+        # connect and inspect outside of the measured cycles
+        controller.elements_dict
+        for _ in range(cycles):
+            start = time.perf_counter()
+            controller._get_all_infor()
+            if save:
+                controller._save_infor()
+            durations.append(time.perf_counter() - start)
+    finally:
+        if hasattr(controller, '_aladdin_browser'):
+            controller.aladdin_browser.browser.close()
+        controller._terminate_playwright()
+    return percentiles(durations)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the AladdinController capture cycle against a local stand-in page.")
+    parser.add_argument("--cycles", type=int, default=20, help="number of measured capture cycles")
+    parser.add_argument("--latency", type=int, default=100, help="simulated scanner response latency (unit = ms)")
+    parser.add_argument("--events", type=int, default=200, help="number of lines of the simulated events log")
+    parser.add_argument("--save", action="store_true", help="include saving the capture in each cycle")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    result = run(args.cycles, args.latency, args.events, args.save)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"Capture cycle latency over {result['cycles']} cycles (latency={args.latency} ms):")
+        for key in ("min", "p50", "p90", "p99", "max", "mean"):
+            print(f"  {key:>4}: {result[key] * 1000:9.1f} ms")
@@ -0,0 +1,70 @@
+"""
+Import time budget of the controller and capture script paths.
+
+Each module is imported in a fresh interpreter with "-X importtime" and the median cumulative import time is compared to
+a budget. The benchmark also checks that heavy optional dependencies (pytest, Playwright, GUI libraries) are not
+imported as a side effect. Exits with status 1 if a budget is exceeded or a forbidden module is imported, so it can be
+used as a check in CI or before deploying the cron-driven capture script.
+
+Run from the repository root:
+    python -m benchmarks.import_benchmark --budget_ms 100
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["controller.aladdin", "aladdin_auto.config"]
+FORBIDDEN_MODULES = ["pytest", "playwright", "easygui", "tkinter", "argparse"]
+
+
+def importTimeUs(module: str, cwd: str) -> int:
+    '''
+    Return the cumulative import time of module (unit = us) in a fresh interpreter.
+    '''
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=cwd, capture_output=True, text=True, check=True)
+    for line in completed.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise RuntimeError(f"No import time reported for {module!r}")
+
+
+def importedModules(module: str, candidates: list[str], cwd: str) -> list[str]:
+    '''
+    Return the candidates that are in sys.modules after importing module.
+    '''
+    code = (f"import sys, json, {module}; "
+            f"print(json.dumps([m for m in {candidates!r} if m in sys.modules]))")
+    completed = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run(modules: list[str], runs: int, budgetMs: float, cwd: str) -> bool:
+    success = True
+    for module in modules:
+        durations = [importTimeUs(module, cwd) / 1000 for _ in range(runs)]
+        median = statistics.median(durations)
+        forbidden = importedModules(module, FORBIDDEN_MODULES, cwd)
+        status = "OK"
+        if median > budgetMs or forbidden:
+            status = "FAIL"
+            success = False
+        print(f"{status:4} {module:<24} median {median:7.1f} ms (budget {budgetMs:.0f} ms, min {min(durations):.1f}, "
+              f"max {max(durations):.1f})" + (f"  imports {', '.join(forbidden)}" if forbidden else ""))
+    return success
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the import time budget of the controller and capture script.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="modules to import")
+    parser.add_argument("--runs", type=int, default=5, help="number of imports per module")
+    parser.add_argument("--budget_ms", type=float, default=100, help="maximum median cumulative import time (unit = ms)")
+    args = parser.parse_args()
+
+    if not run(args.modules, args.runs, args.budget_ms, os.getcwd()):
+        sys.exit(1)
@@ -0,0 +1,137 @@
+"""
+Offline benchmark of the aladdinactions navigation helpers on synthetic catalogs.
+
+For each tree size, a synthetic catalog is generated (see catalog_generator.py) and the mock web page is opened in
+Chromium. The benchmark then times selectDeviceAndReleaseFromHomePage per product, and selectPageForParameter and
+searchForParameterByCode per parameter, and counts the Playwright round trips (calls from Python to the Playwright
+driver) of each navigation.
+
+Run from the repository root:
+    python -m benchmarks.navigation_benchmark --depths 2 3 4 --fanout 3 --params 20
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from playwright._impl._connection import Channel
+from playwright.sync_api import sync_playwright
+
+from aladdin_auto.aladdinactions import (searchForParameterByCode, selectDeviceAndReleaseFromHomePage,
+                                         selectPageForParameter)
+from aladdin_auto.config import Config
+from aladdin_auto.parameter import Parameter
+from aladdin_auto.productxml import ProductXML
+from benchmarks.catalog_generator import generateCatalog
+
+
+class RoundTripCounter:
+    """
+    Counts the messages sent from Python to the Playwright driver while active.
+    Relies on the internal Channel._inner_send of the Playwright Python client.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        original = Channel._inner_send
+        counter = self
+
+        async def countingInnerSend(channel, *args, **kwargs):
+            counter.count += 1
+            return await original(channel, *args, **kwargs)
+
+        self._original = original
+        Channel._inner_send = countingInnerSend
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        Channel._inner_send = self._original
+        return False
+
+
+def _measure(action) -> tuple[float, int]:
+    with RoundTripCounter() as counter:
+        start = time.perf_counter()
+        action()
+        duration = time.perf_counter() - start
+    return duration, counter.count
+
+
+def _summary(samples: list[tuple[float, int]]) -> dict:
+    durations = [duration for duration, _ in samples]
+    roundTrips = [count for _, count in samples]
+    return {
+        "samples": len(samples),
+        "mean_ms": statistics.fmean(durations) * 1000,
+        "p90_ms": (statistics.quantiles(durations, n=10, method="inclusive")[8] if len(durations) > 1 else durations[0]) * 1000,
+        "mean_round_trips": statistics.fmean(roundTrips),
+        "max_round_trips": max(roundTrips),
+    }
+
+
+def run(depths: list[int], fanout: int, topLevelPages: int, paramCount: int, latency: int, seed: int) -> list[dict]:
+    results = []
+    random.seed(seed)
+    with sync_playwright() as playwright:
+        browser = playwright.chromium.launch(headless=True, args=['--allow-file-access-from-files'])
+        for depth in depths:
+            with tempfile.TemporaryDirectory() as folder:
+                catalog = generateCatalog(folder, productCount=1, topLevelPages=topLevelPages, depth=depth,
+                                          fanout=fanout, paramsPerPage=1)
+                Config.setOption("data_folder_path", catalog.dataFolderPath)
+                xml = ProductXML.getAllXMLs()[0]
+                parameters = xml.createParameterList()
+                sample = random.sample(parameters, min(paramCount, len(parameters)))
+                url = f"file://{os.path.abspath(catalog.webAppPath)}?latency={latency}"
+
+                page = browser.new_page()
+                page.goto(url)
+                device = _measure(lambda: selectDeviceAndReleaseFromHomePage(page, xml))
+                treeNavigation = []
+                for param in sample:
+                    treeNavigation.append(_measure(lambda: selectPageForParameter(page, param)))
+                search = []
+                for param in sample:
+                    search.append(_measure(lambda: searchForParameterByCode(page, Parameter.fromCode(xml, param.code))))
+                page.close()
+
+                results.append({
+                    "depth": depth,
+                    "fanout": fanout,
+                    "parameters": len(parameters),
+                    "select_device_and_release": _summary([device]),
+                    "select_page_for_parameter": _summary(treeNavigation),
+                    "search_for_parameter_by_code": _summary(search),
+                })
+        browser.close()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark aladdinactions navigation on synthetic parameter trees.")
+    parser.add_argument("--depths", type=int, nargs="+", default=[2, 3, 4], help="tree depths to benchmark")
+    parser.add_argument("--fanout", type=int, default=3, help="child pages per page")
+    parser.add_argument("--top_level_pages", type=int, default=5, help="top level pages per product")
+    parser.add_argument("--params", type=int, default=20, help="parameters navigated per tree")
+    parser.add_argument("--latency", type=int, default=0, help="simulated rendering time of the mock page (unit = ms)")
+    parser.add_argument("--seed", type=int, default=0, help="seed used to pick the parameters")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results = run(args.depths, args.fanout, args.top_level_pages, args.params, args.latency, args.seed)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for result in results:
+            print(f"depth={result['depth']} fanout={result['fanout']} parameters={result['parameters']}")
+            for key in ("select_device_and_release", "select_page_for_parameter", "search_for_parameter_by_code"):
+                summary = result[key]
+                print(f"  {key:<30} mean {summary['mean_ms']:8.1f} ms  p90 {summary['p90_ms']:8.1f} ms  "
+                      f"round trips mean {summary['mean_round_trips']:5.1f} max {summary['max_round_trips']}")
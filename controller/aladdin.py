@@ -1,22 +1,20 @@
-"""
-Init logging
-"""
 import logging
-format = "%(asctime)s: %(message)s"
-logging.basicConfig(format=format, level=logging.INFO, 
-                    datefmt=r"%Y-%m-%d %H:%M:%S")
-
-
-"""
-Insert current work directory to system path
-"""
 import sys
 import os
-module_path = os.path.abspath(os.getcwd())
-if module_path not in sys.path:
-    sys.path.insert(0, module_path)
-    paths = '\n'.join(sys.path)
-    logging.info(f'System path: \n{paths}')
+
+if __name__ == '__main__':
+    """
+    Init logging and insert current work directory to system path,
+    only when run as a script (importing the module has no side effect)
+    """
+    format = "%(asctime)s: %(message)s"
+    logging.basicConfig(format=format, level=logging.INFO, 
+                        datefmt=r"%Y-%m-%d %H:%M:%S")
+    module_path = os.path.abspath(os.getcwd())
+    if module_path not in sys.path:
+        sys.path.insert(0, module_path)
+        paths = '\n'.join(sys.path)
+        logging.info(f'System path: \n{paths}')
 
 from typing import Union, Generator
 from typing import TYPE_CHECKING
@@ -24,17 +22,22 @@ if TYPE_CHECKING:
     from playwright.sync_api._context_manager import PlaywrightContextManager
     from playwright.sync_api import Page
     from playwright._impl._locator import Locator 
+    from controller.capturearchive import CaptureArchive
+    from controller.statisticsstore import StatisticsStore
     
 
 import subprocess
-from playwright.sync_api import sync_playwright
 from aladdin_auto.aladdinbrowser import AladdinBrowser
-from aladdin_auto.config import Config, AladdinBrowserType
-from aladdin_auto.standaloneappbrowser import initPrimaryBrowser, connectPrimaryBrowser
+from aladdin_auto.config import Config, AladdinBrowserType, ConfigSnapshot
+from aladdin_auto.fileutils import FileUtils
+from aladdin_auto.standaloneappbrowser import initPrimaryBrowser, connectPrimaryBrowser, probeTargetPage
+from aladdin_auto.timing import Timing
 from aladdin_auto.webbrowser import connectToWebBrowser
+from controller.capturelog import parse_counters
+from controller.servicechannel import ServicePortChannel
 import time
 from datetime import datetime
-from threading import Timer
+from threading import Event, Timer
 
 class AladdinController:
     _ELEMENT_XPATH_DICT = {
@@ -42,6 +45,7 @@ class AladdinController:
         "terminal_button" : '//*[@id="headTerminal"]/h5/button',
         "show_custom_buttons_toggle" : '//*[@id="show_custom_buttons_toggle"]',
         "terminal_clear_text" : '//*[@id="terminalClearText"]',
+        "terminal_input" : '//*[@id="terminalInputText"]',
         "get_version_button" : '/html/body/app-root/app-product/div/main/div/div/div/div/section[2]/div[3]/div[1]/div[4]/div[2]/div/div/app-terminal/div[3]/div[2]/div/div[1]',
         "get_identification_button" : '/html/body/app-root/app-product/div/main/div/div/div/div/section[2]/div[3]/div[1]/div[4]/div[2]/div/div/app-terminal/div[3]/div[2]/div/div[2]',
         "get_enhanced_statistics_button" : '/html/body/app-root/app-product/div/main/div/div/div/div/section[2]/div[3]/div[1]/div[4]/div[2]/div/div/app-terminal/div[3]/div[2]/div/div[4]',
@@ -51,15 +55,37 @@ class AladdinController:
     _DEPENDENCES_DICT = {
         "terminal_text" : "terminal_button",
         "show_custom_buttons_toggle" : "terminal_button",
+        "terminal_input" : "terminal_button",
         "get_version_button" : "show_custom_buttons_toggle"
     }
 
-    def __init__(self, timeout: float = 0.0) -> None:
+    def __init__(self, timeout: Union[float, None] = 0.0) -> None:
         '''
         timeout : the period waiting for the next action (unit = min).
+                  If None, the capture_interval_mins option is used, and changes of it
+                  in the config file are applied to the running timer.
         '''
-        self._timeout = timeout
+        self._follow_config_timeout = timeout is None
+        self._timeout = Config.captureIntervalMins() if timeout is None else timeout
         self._aladdin_process = None
+        Timing.enable(Config.timingEnabled())
+        Config.subscribe(self._on_config_changed)
+        if Config.configReloadSecs() > 0:
+            Config.startHotReload(Config.configReloadSecs())
+
+    def _on_config_changed(self, old: ConfigSnapshot, new: ConfigSnapshot) -> None:
+        '''
+        Apply a reloaded config file. Options read on each cycle (scanner name,
+        log folder, commands, ...) need nothing more than the new snapshot.
+        '''
+        logging.info(f"Config changed: {sorted(new.changedOptions(old))!r}")
+        Timing.enable(new.timing_enabled)
+        if self._follow_config_timeout and new.capture_interval_mins != self._timeout:
+            self._timeout = new.capture_interval_mins
+            # Wake up the waiting timer, so it is restarted with the new interval
+            t = getattr(self, '_t', None)
+            if t is not None and t.is_alive():
+                t.cancel()
         
 
     @property
@@ -103,6 +129,28 @@ class AladdinController:
             self._inspect_page()
             return self._elements_dict
 
+    @property
+    def statistics_store(self) -> "StatisticsStore":
+        try:
+            return self._statistics_store
+        except AttributeError:
+            # Imported here, only needed when the statistics store is enabled
+            from controller.statisticsstore import StatisticsStore
+            self._statistics_store = StatisticsStore(Config.statisticsDbPath())
+            return self._statistics_store
+
+    @property
+    def service_channel(self) -> ServicePortChannel:
+        try:
+            return self._service_channel
+        except AttributeError:
+            self._service_channel = ServicePortChannel(
+                page=self.page,
+                terminal_text=self.element('terminal_text'),
+                terminal_input=self.element('terminal_input'),
+                prompt=Config.servicePortPrompt())
+            return self._service_channel
+
     @property
     def timeout(self) -> float:
         return self._timeout
@@ -111,6 +159,7 @@ class AladdinController:
         elements_dict = self.elements_dict
         return elements_dict.get(name, None)
     
+    @Timing.timed("controller.inspect_page")
     def _inspect_page(self) -> None:
         xpath_dict = self._ELEMENT_XPATH_DICT
         page = self.page
@@ -127,6 +176,8 @@ class AladdinController:
 
     def _init_playwright(self) -> None:
         logging.info(f"Initializing Playwright...")
+        # Imported here, so that importing the controller stays cheap
+        from playwright.sync_api import sync_playwright
         p = sync_playwright().start()
         self._playwright = p
         logging.info(f"Initialized Playwright: {p!r}")
@@ -150,20 +201,46 @@ class AladdinController:
         self._click_elements(names_list=e_lst)
         
         # Send service port commands to get more information
-        # ...
+        commands = Config.servicePortCommands()
+        if commands:
+            self.send_commands(commands)
 
         # Capture text in terminal
         terminal_text = self.element('terminal_text')
-        infor = terminal_text.inner_text()
+        with Timing.span("controller.capture_terminal"):
+            infor = terminal_text.inner_text()
         logging.info(f"inner text: {infor}\nType: {type(infor)}")
         self._all_infor = infor
+        self._captured_at = datetime.now()
         return infor
 
+    @Timing.timed("controller.send_commands")
+    def send_commands(self, commands: list[str]) -> list[str]:
+        '''
+        Send service port commands through the terminal in one batch.
+        Return the response of each command, in order.
+        '''
+        self._show_elements("terminal_input")
+        responses = self.service_channel.send_commands(commands, timeout=Config.servicePortTimeoutSecs())
+        for command, response in zip(commands, responses):
+            logging.info(f"Service port command {command!r}: {response!r}")
+        return responses
+
     def get_all_infor(self, save_infor: bool = True) -> str:
-        all_infor = self._get_all_infor()
-        
-        if save_infor: 
-            self._save_infor()
+        cycle_started_at = datetime.now()
+        try:
+            with Timing.span("controller.cycle"):
+                all_infor = self._get_all_infor()
+
+                if save_infor:
+                    self._save_infor()
+
+                if Config.statisticsDbPath():
+                    self._store_statistics()
+        finally:
+            # Also export the spans of a failed cycle, so they are not counted in the next one
+            Timing.flush(cycle=cycle_started_at.isoformat(timespec="seconds"),
+                         jsonlPath=Config.timingJsonlPath(), promPath=Config.timingPromPath())
         
         # Run timer for the next action
         self._run_timer()
@@ -175,15 +252,29 @@ class AladdinController:
         if not timeout:
             return
         self._terminate()
-        interval = 60.0 * timeout
-        f = self.get_all_infor
-        logging.info(f'Starting timer: interval = {interval!r}, func: {f!r}')
-        t = Timer(interval, f, args=None, kwargs=None)
-        t.start()
-        t.join()
-        self._t = t
+        started = time.monotonic()
+        while timeout:
+            # The interval is counted from the end of the cycle,
+            # also when it is changed while the timer is waiting
+            interval = max(0.0, 60.0 * timeout - (time.monotonic() - started))
+            cycle_started = Event()
+
+            def f():
+                cycle_started.set()
+                self.get_all_infor()
+
+            logging.info(f'Starting timer: interval = {interval!r}, func: {self.get_all_infor!r}')
+            t = Timer(interval, f, args=None, kwargs=None)
+            self._t = t
+            t.start()
+            t.join()
+            if cycle_started.is_set():
+                break
+            # Timer was cancelled by a change of the interval
+            timeout = self.timeout
             
         
+    @Timing.timed("controller.save")
     def _save_infor(self):
         all_infor = self.all_infor
         log_folder_path = Config.testLogsFolderPath()
@@ -195,11 +286,57 @@ class AladdinController:
         if not os.path.exists(scanner_log_path):
             os.makedirs(scanner_log_path)
         file_name = f'{scanner_name}_Events_log_and_statistics'
-        date_time = self._get_datetime()
-        full_path = f'{scanner_log_path}/{file_name}_{date_time}.txt'
-        
-        with open(full_path, "w", encoding='utf-8') as f:
-            f.write(all_infor)
+
+        if Config.captureArchive():
+            # One archive segment per day, so the retention limits can delete old captures
+            full_path = f'{scanner_log_path}/{file_name}_{self._captured_at.strftime(r"%Y%m%d")}.caparch'
+            archive = self._capture_archive(full_path)
+            archive.append(self._captured_at, all_infor)
+            pattern = f'{file_name}_*.caparch'
+        else:
+            date_time = self._get_datetime()
+            full_path = f'{scanner_log_path}/{file_name}_{date_time}.txt'
+
+            with open(full_path, "w", encoding='utf-8') as f:
+                f.write(all_infor)
+            pattern = f'{file_name}_*.txt'
+
+        # Apply retention limits to the scanner log folder
+        size_limit = Config.testLogSizeLimit()*1000 if Config.testLogSizeLimit() >= 0 else -1
+        age_limit = Config.testLogAgeLimitDays()*86400 if Config.testLogAgeLimitDays() >= 0 else -1
+        deleted = FileUtils.pruneFolder(scanner_log_path, pattern, maxBytes=size_limit,
+                                        maxAgeSecs=age_limit, maxCount=Config.testLogCountLimit(), newFile=full_path)
+        if deleted:
+            if Config.captureArchive():
+                # The index of a deleted archive segment is useless
+                for path in deleted:
+                    try:
+                        os.remove(f'{path}.idx')
+                    except FileNotFoundError:
+                        pass
+                # The open segment itself may exceed the limits: the next capture
+                # starts a new segment with a full capture
+                if os.path.normpath(full_path) in {os.path.normpath(path) for path in deleted}:
+                    self._archive = None
+            logging.info(f"Deleted {len(deleted)} old capture logs")
+
+    def _capture_archive(self, path: str) -> "CaptureArchive":
+        # Imported here, only needed when the capture archive is enabled
+        from controller.capturearchive import CaptureArchive
+        # Keep the archive between cycles, so the previous capture
+        # does not have to be reconstructed from disk each time
+        archive = getattr(self, '_archive', None)
+        if archive is None or archive.path != path:
+            archive = CaptureArchive(path, keyframe_interval=Config.captureArchiveKeyframeInterval())
+            self._archive = archive
+        return archive
+
+    @Timing.timed("controller.store_statistics")
+    def _store_statistics(self) -> None:
+        counters = parse_counters(self.all_infor)
+        scanner_name = Config.testScannerName()
+        written = self.statistics_store.append(scanner_name, self._captured_at, counters)
+        logging.info(f"Stored {written} statistics samples for {scanner_name!r}")
 
     def _get_datetime(self) -> str:
         now = datetime.now()
@@ -211,11 +348,13 @@ class AladdinController:
         elements_dict = self.elements_dict
         for name in names_list:
             e = elements_dict.get(name)
-            e.click()
+            with Timing.span(f"controller.click.{name}"):
+                e.click()
             logging.info(f"Element clicked: {name!r}")
             logging.info(f"Waiting 1 sec ...")
             time.sleep(1)
 
+    @Timing.timed("controller.show_elements")
     def _show_elements(self, name: str) -> None:
         logging.info(f"Showing element: {name!r}")
 
@@ -242,6 +381,7 @@ class AladdinController:
         self._click_elements(names_list=name_lists)
 
 
+    @Timing.timed("controller.connect")
     def _connect_browser(self, playwright: Union["PlaywrightContextManager", None] = None) -> Generator[AladdinBrowser, None, None]:
         """
         Connect to Aladdin browser
@@ -252,16 +392,19 @@ class AladdinController:
         aladdinProcess = None
 
         if Config.defaultAladdinBrowserType() is AladdinBrowserType.STANDALONE_APP:
-            try: 
+            port = Config.primaryBrowserPort()
+            if probeTargetPage(port, pageURLEnding="") is not None:
                 # Connect exsited browser
                 browser, page = connectPrimaryBrowser(
                     playwright=playwright, 
-                    port=Config.primaryBrowserPort(), 
+                    port=port, 
                     pageURLEnding="")
-            except:
-                # Open new process
+            else:
+                # Open new process,
+                # AladdinConnectionError is raised if it doesn't start in time
+                logging.info(f"No Aladdin browser on port {port}, starting {Config.aladdinStandalonePath()!r}")
                 aladdinProcess = subprocess.Popen([Config.aladdinStandalonePath(),"+d"])
-                browser, page = initPrimaryBrowser(playwright,Config.primaryBrowserPort(),"home")
+                browser, page = initPrimaryBrowser(playwright,port,"home")
         elif Config.defaultAladdinBrowserType() is AladdinBrowserType.WEBAPP_URL:
             browser, page = connectToWebBrowser(playwright, Config.webUrl(), [])
         elif Config.defaultAladdinBrowserType() is AladdinBrowserType.WEBAPP_LOCAL:
@@ -295,8 +438,10 @@ class AladdinController:
         self._terminate_aladdin_process()
         del self._elements_dict
         del self._aladdin_browser
+        if hasattr(self, '_service_channel'):
+            del self._service_channel
 
 
 if __name__ == '__main__':
-    aladdin_ctrl = AladdinController(timeout=30)
+    aladdin_ctrl = AladdinController(timeout=None)
     aladdin_ctrl.get_all_infor(save_infor=True)
\ No newline at end of file
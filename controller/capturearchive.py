@@ -0,0 +1,219 @@
+"""
+Append-only archive of the terminal captures of one scanner.
+
+A capture is stored as a line based delta against the previous capture
+(lines copied from the previous capture + new lines), so the event log
+repeated by every capture is stored once. Every record is zlib compressed
+on its own and a full capture (keyframe) is written every
+``keyframe_interval`` records to bound the reconstruction cost.
+
+Files:
+    <name>.caparch     : records  [magic, kind, payload length, crc32, zlib payload]
+    <name>.caparch.idx : one line per record "<timestamp>\\t<offset>\\t<length>\\t<kind>"
+"""
+import bisect
+import json
+import logging
+import os
+import struct
+import zlib
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Generator, Union
+
+_MAGIC = b"CAPR"
+_HEADER = struct.Struct(">4sBII")
+_KIND_FULL = 0
+_KIND_DELTA = 1
+_TIMESTAMP_FORMAT = r"%Y%m%d_%H%M%S"
+
+
+class CaptureArchiveError(Exception):
+    pass
+
+
+def _diff(previous: list[str], current: list[str]) -> list[list]:
+    '''
+    Return the operations rebuilding current from previous:
+    ["c", start, end] copies previous[start:end], ["i", line, ...] inserts lines.
+    '''
+    matcher = SequenceMatcher(None, previous, current, autojunk=False)
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(["c", i1, i2])
+        elif j2 > j1:
+            ops.append(["i"] + current[j1:j2])
+    return ops
+
+
+def _patch(previous: list[str], ops: list[list]) -> list[str]:
+    lines = []
+    for op in ops:
+        if op[0] == "c":
+            lines.extend(previous[op[1]:op[2]])
+        else:
+            lines.extend(op[1:])
+    return lines
+
+
+class CaptureArchive:
+    '''
+    Append-only, deduplicated and compressed archive of captures.
+    '''
+
+    def __init__(self, path: str, keyframe_interval: int = 48, compress_level: int = 9) -> None:
+        '''
+        path : path to the archive file, the index is stored next to it with the ".idx" suffix.
+        keyframe_interval : number of records between two full captures.
+        compress_level : zlib compression level of each record.
+        '''
+        if keyframe_interval < 1:
+            raise ValueError(f"keyframe_interval must be at least 1, got {keyframe_interval!r}")
+        self._path = path
+        self._index_path = f"{path}.idx"
+        self._keyframe_interval = keyframe_interval
+        self._compress_level = compress_level
+        self._previous_lines = None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def index(self) -> list[tuple[str, int, int, int]]:
+        '''
+        [(timestamp, offset, length, kind), ...] ordered as appended.
+        '''
+        try:
+            return self._index
+        except AttributeError:
+            self._load_index()
+            return self._index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def timestamps(self) -> list[datetime]:
+        return [datetime.strptime(entry[0], _TIMESTAMP_FORMAT) for entry in self.index]
+
+    def _load_index(self) -> None:
+        index = []
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        # incomplete last line after an interrupted append, cut off by the next append
+                        break
+                    fields = line.rstrip("\n").split("\t")
+                    if len(fields) != 4:
+                        continue
+                    index.append((fields[0], int(fields[1]), int(fields[2]), int(fields[3])))
+        self._index = index
+
+    def append(self, timestamp: datetime, text: str) -> int:
+        '''
+        Append one capture. Return the number of bytes written to the archive.
+        '''
+        index = self.index
+        lines = text.split("\n")
+        previous = self._last_lines()
+        if previous is None or len(index) % self._keyframe_interval == 0:
+            kind = _KIND_FULL
+            payload = json.dumps(lines, ensure_ascii=False)
+        else:
+            kind = _KIND_DELTA
+            payload = json.dumps(_diff(previous, lines), ensure_ascii=False)
+        data = zlib.compress(payload.encode("utf-8"), self._compress_level)
+        record = _HEADER.pack(_MAGIC, kind, len(data), zlib.crc32(data)) + data
+
+        folder = os.path.dirname(self._path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(self._path, "ab") as f:
+            offset = f.tell()
+            f.write(record)
+        stamp = timestamp.strftime(_TIMESTAMP_FORMAT)
+        with open(self._index_path, "a+b") as f:
+            self._truncate_torn_line(f)
+            f.write(f"{stamp}\t{offset}\t{len(record)}\t{kind}\n".encode("utf-8"))
+
+        index.append((stamp, offset, len(record), kind))
+        self._previous_lines = lines
+        logging.info(f"Archived capture {stamp} ({len(text)} chars -> {len(record)} bytes)")
+        return len(record)
+
+    @staticmethod
+    def _truncate_torn_line(f) -> None:
+        '''
+        Cut off an incomplete last line of the index, so the next line starts at the beginning of a line.
+        '''
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        f.seek(0)
+        content = f.read()
+        f.truncate(content.rfind(b"\n") + 1)
+        logging.warning(f"Removed incomplete last line of {f.name!r}")
+
+    def _last_lines(self) -> Union[list[str], None]:
+        if self._previous_lines is None and self.index:
+            self._previous_lines = self._reconstruct_lines(len(self.index) - 1)
+        return self._previous_lines
+
+    def _read_record(self, f, entry: tuple[str, int, int, int]) -> tuple[int, list]:
+        f.seek(entry[1])
+        record = f.read(entry[2])
+        magic, kind, length, crc = _HEADER.unpack_from(record)
+        data = record[_HEADER.size:]
+        if magic != _MAGIC or len(data) != length or zlib.crc32(data) != crc:
+            raise CaptureArchiveError(f"Corrupted record {entry[0]} at offset {entry[1]} in {self._path!r}")
+        return kind, json.loads(zlib.decompress(data).decode("utf-8"))
+
+    def _reconstruct_lines(self, position: int) -> list[str]:
+        index = self.index
+        start = position
+        while index[start][3] != _KIND_FULL:
+            if start == 0:
+                raise CaptureArchiveError(f"No full capture before record {index[position][0]} in {self._path!r}")
+            start -= 1
+        lines = None
+        with open(self._path, "rb") as f:
+            for entry in index[start:position + 1]:
+                kind, payload = self._read_record(f, entry)
+                lines = payload if kind == _KIND_FULL else _patch(lines, payload)
+        return lines
+
+    def get(self, position: int) -> str:
+        '''
+        Return the capture at the given position (negative positions count from the end).
+        '''
+        if position < 0:
+            position += len(self.index)
+        if not 0 <= position < len(self.index):
+            raise IndexError(f"No capture at position {position} in {self._path!r}")
+        return "\n".join(self._reconstruct_lines(position))
+
+    def get_at(self, timestamp: datetime) -> str:
+        '''
+        Return the latest capture taken at or before timestamp.
+        '''
+        stamps = [entry[0] for entry in self.index]
+        position = bisect.bisect_right(stamps, timestamp.strftime(_TIMESTAMP_FORMAT)) - 1
+        if position < 0:
+            raise KeyError(f"No capture at or before {timestamp} in {self._path!r}")
+        return self.get(position)
+
+    def iter_captures(self) -> Generator[tuple[datetime, str], None, None]:
+        '''
+        Yield (timestamp, text) for every capture, replaying the deltas once.
+        '''
+        lines = None
+        with open(self._path, "rb") as f:
+            for entry in self.index:
+                kind, payload = self._read_record(f, entry)
+                lines = payload if kind == _KIND_FULL else _patch(lines, payload)
+                yield datetime.strptime(entry[0], _TIMESTAMP_FORMAT), "\n".join(lines)
@@ -0,0 +1,102 @@
+"""
+Helpers to parse the terminal text captured by AladdinController
+(version, identification, enhanced statistics and enhanced events).
+"""
+import os
+import re
+from datetime import datetime
+from typing import Union
+
+# ":" or "=" between a name and its value, except between two digits,
+# so that times in event lines ("Power up at 10:01:05") are not taken as a separator
+_SEPARATOR = r'\s*(?:(?<!\d)[:=]|[:=](?!\d))\s*'
+
+# "<counter name> : <integer>" or "<counter name> = <integer>"
+_COUNTER_PATTERN = re.compile(rf'^\s*([A-Za-z][\w .\-/()#]*?){_SEPARATOR}(-?\d+)\s*$')
+
+# "<field name> : <text>" used for version / identification answers
+_FIELD_PATTERN = re.compile(rf'^\s*([A-Za-z][\w .\-/()#]*?){_SEPARATOR}(.+?)\s*$')
+
+_FIRMWARE_KEYWORDS = ('firmware', 'software', 'version', 'release')
+
+# "<scanner>_Events_log_and_statistics_<YYYYmmdd>_<HHMMSS>.txt"
+_CAPTURE_FILE_PATTERN = re.compile(r'^(?P<scanner>.+)_Events_log_and_statistics_(?P<date>\d{8})_(?P<time>\d{6})\.txt$')
+
+# "<scanner>_Events_log_and_statistics[_<YYYYmmdd>].caparch" (see CaptureArchive)
+_ARCHIVE_FILE_PATTERN = re.compile(r'^(?P<scanner>.+)_Events_log_and_statistics(?:_\d{8})?\.caparch$')
+
+_NUMBER_PATTERN = re.compile(r'\d+')
+
+
+def parse_counters(text: str) -> dict[str, int]:
+    '''
+    Return every "name : integer" pair found in a capture.
+    When a counter appears more than once, the last value wins.
+    '''
+    counters = {}
+    for line in text.splitlines():
+        match = _COUNTER_PATTERN.match(line)
+        if match is not None:
+            counters[match.group(1)] = int(match.group(2))
+    return counters
+
+
+def parse_firmware(text: str) -> Union[str, None]:
+    '''
+    Return the firmware / software version reported in a capture, or None.
+    '''
+    for line in text.splitlines():
+        match = _FIELD_PATTERN.match(line)
+        if match is None or _COUNTER_PATTERN.match(line):
+            continue
+        name = match.group(1).lower()
+        if any(keyword in name for keyword in _FIRMWARE_KEYWORDS):
+            return match.group(2)
+    return None
+
+
+def parse_events(text: str) -> list[str]:
+    '''
+    Return the event log lines of a capture, i.e. every non empty line
+    that is neither a counter nor a "name : value" field.
+    '''
+    events = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if _FIELD_PATTERN.match(line):
+            continue
+        events.append(stripped)
+    return events
+
+
+def event_key(event: str) -> str:
+    '''
+    Group an event line by its kind: numbers (timestamps, counts, ...) are
+    replaced by "#" so that occurrences of the same event share one key.
+    '''
+    return _NUMBER_PATTERN.sub('#', event)
+
+
+def parse_capture_file_name(path: str) -> Union[tuple[str, datetime], None]:
+    '''
+    Return (scanner name, capture time) from a capture file name, or None
+    when the name does not follow the AladdinController naming.
+    '''
+    match = _CAPTURE_FILE_PATTERN.match(os.path.basename(path))
+    if match is None:
+        return None
+    captured_at = datetime.strptime(f"{match.group('date')}_{match.group('time')}", r"%Y%m%d_%H%M%S")
+    return match.group('scanner'), captured_at
+
+
+def parse_archive_file_name(path: str) -> Union[str, None]:
+    '''
+    Return the scanner name from a capture archive file name, or None
+    when the name does not follow the AladdinController naming.
+    '''
+    match = _ARCHIVE_FILE_PATTERN.match(os.path.basename(path))
+    if match is None:
+        return None
+    return match.group('scanner')
@@ -0,0 +1,230 @@
+"""
+Bulk analyzer of the capture files written by AladdinController
+(``<scanner>_Events_log_and_statistics_<date>_<time>.txt``, or the captures of
+the ``<scanner>_Events_log_and_statistics_<date>.caparch`` archive segments).
+
+Capture files are discovered with ``os.scandir``, parsed in parallel on a
+process pool and merged into one summary per scanner: event histogram,
+counter deltas and firmware changes. The summary of each file is cached in a
+SQLite table keyed by path and checked against (mtime, size), so a re-run only
+parses and writes the new or modified captures.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Generator, Union
+
+from controller.capturearchive import CaptureArchive
+from controller.capturelog import (event_key, parse_archive_file_name, parse_capture_file_name,
+                                   parse_counters, parse_events, parse_firmware)
+
+_CACHE_FILE_NAME = ".capture_analyzer_cache.sqlite"
+_CACHE_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    summary TEXT NOT NULL
+)
+"""
+
+
+def discover_capture_files(root: str) -> Generator[tuple[str, int, int], None, None]:
+    '''
+    Yield (path, mtime_ns, size) of every capture file and capture archive under root.
+    Each directory is read once with os.scandir and each file is stat-ed once.
+    '''
+    stack = [root]
+    while stack:
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif ((entry.name.endswith('.txt') and parse_capture_file_name(entry.name) is not None)
+                          or (entry.name.endswith('.caparch') and parse_archive_file_name(entry.name) is not None)):
+                        stat = entry.stat()
+                        yield entry.path, stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            continue
+
+
+def _add_counters(counter_deltas: dict, last_values: dict, counters: dict) -> None:
+    for counter, value in counters.items():
+        previous = last_values.get(counter)
+        if previous is None:
+            counter_deltas.setdefault(counter, 0)
+        elif value >= previous:
+            counter_deltas[counter] = counter_deltas.get(counter, 0) + value - previous
+        else:
+            # counter reset (e.g. scanner reboot)
+            counter_deltas[counter] = counter_deltas.get(counter, 0) + value
+        last_values[counter] = value
+
+
+def _summarize_captures(scanner: str, captures) -> dict:
+    '''
+    Aggregate the captures of one file, in time order: counters at their
+    first and last capture and deltas in between, firmware versions with the
+    time they were first seen, and the distinct events as short hashes grouped
+    by event kind, so that events repeated by the captures of other files are
+    only counted once when summaries are merged.
+    '''
+    count = 0
+    first_capture = last_capture = None
+    first_counters = {}
+    counter_deltas = {}
+    last_values = {}
+    firmware_history = []
+    events = {}
+    for captured_at, text in captures:
+        count += 1
+        timestamp = captured_at.isoformat()
+        first_capture = first_capture or timestamp
+        last_capture = timestamp
+        counters = parse_counters(text)
+        for counter, value in counters.items():
+            first_counters.setdefault(counter, value)
+        _add_counters(counter_deltas, last_values, counters)
+        firmware = parse_firmware(text)
+        if firmware is not None and (not firmware_history or firmware_history[-1][1] != firmware):
+            firmware_history.append([timestamp, firmware])
+        for event in parse_events(text):
+            digest = hashlib.blake2b(event.encode('utf-8'), digest_size=8).hexdigest()
+            events.setdefault(event_key(event), set()).add(digest)
+    return {
+        "scanner": scanner,
+        "captures": count,
+        "first_capture": first_capture,
+        "last_capture": last_capture,
+        "first_counters": first_counters,
+        "last_counters": last_values,
+        "counter_deltas": counter_deltas,
+        "firmware_history": firmware_history,
+        "events": {key: sorted(digests) for key, digests in events.items()},
+    }
+
+
+def summarize_capture_file(path: str) -> dict:
+    '''
+    Parse one capture file, or every capture of a capture archive,
+    into one summary of the file.
+    '''
+    if path.endswith('.caparch'):
+        return _summarize_captures(parse_archive_file_name(path), CaptureArchive(path).iter_captures())
+    scanner, captured_at = parse_capture_file_name(path)
+    with open(path, "r", encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    return _summarize_captures(scanner, [(captured_at, text)])
+
+
+def merge_summaries(summaries: list[dict]) -> dict[str, dict]:
+    '''
+    Merge file summaries into one summary per scanner.
+    '''
+    by_scanner = {}
+    for summary in summaries:
+        if summary["captures"]:
+            by_scanner.setdefault(summary["scanner"], []).append(summary)
+
+    merged = {}
+    for scanner, files in by_scanner.items():
+        files.sort(key=lambda f: f["first_capture"])
+        counter_deltas = {}
+        last_values = {}
+        firmware_changes = []
+        firmware = None
+        distinct_events = {}
+        for summary in files:
+            # delta from the last capture of the previous file, then the deltas within the file
+            _add_counters(counter_deltas, last_values, summary["first_counters"])
+            for counter, delta in summary["counter_deltas"].items():
+                counter_deltas[counter] = counter_deltas.get(counter, 0) + delta
+            last_values.update(summary["last_counters"])
+            for timestamp, version in summary["firmware_history"]:
+                if version != firmware:
+                    if firmware is not None:
+                        firmware_changes.append({"timestamp": timestamp, "from": firmware, "to": version})
+                    firmware = version
+            for key, digests in summary["events"].items():
+                distinct_events.setdefault(key, set()).update(digests)
+
+        merged[scanner] = {
+            "captures": sum(summary["captures"] for summary in files),
+            "first_capture": files[0]["first_capture"],
+            "last_capture": max(summary["last_capture"] for summary in files),
+            "firmware": firmware,
+            "firmware_changes": firmware_changes,
+            "counter_deltas": counter_deltas,
+            "last_counters": last_values,
+            "event_histogram": dict(sorted(((key, len(digests)) for key, digests in distinct_events.items()),
+                                           key=lambda item: item[1], reverse=True)),
+        }
+    return merged
+
+
+class LogAnalyzer:
+    '''
+    Analyze every capture file under a folder.
+    '''
+
+    def __init__(self, root: str, cache_path: Union[str, None] = None, workers: Union[int, None] = None) -> None:
+        '''
+        root : folder to search for capture files (recursively).
+        cache_path : path to the per file cache (default: <root>/.capture_analyzer_cache.sqlite).
+        workers : number of worker processes (default: number of CPUs).
+        '''
+        self._root = root
+        self._cache_path = cache_path or os.path.join(root, _CACHE_FILE_NAME)
+        self._workers = workers
+
+    def _connect_cache(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._cache_path)
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _CACHE_VERSION:
+            conn.executescript(f"DROP TABLE IF EXISTS files; PRAGMA user_version = {_CACHE_VERSION};")
+        conn.execute(_SCHEMA)
+        return conn
+
+    def run(self) -> dict[str, dict]:
+        '''
+        Return the merged summary of every scanner.
+        '''
+        conn = self._connect_cache()
+        try:
+            cached = {path: (mtime_ns, size, summary) for path, mtime_ns, size, summary
+                      in conn.execute("SELECT path, mtime_ns, size, summary FROM files")}
+            summaries = {}
+            pending = []
+            for path, mtime_ns, size in discover_capture_files(self._root):
+                entry = cached.pop(path, None)
+                if entry is not None and entry[0] == mtime_ns and entry[1] == size:
+                    summaries[path] = json.loads(entry[2])
+                else:
+                    pending.append((path, mtime_ns, size))
+
+            logging.info(f"Capture files: {len(summaries) + len(pending)} ({len(summaries)} cached, "
+                         f"{len(pending)} to parse)")
+            rows = []
+            if pending:
+                paths = [path for path, _, _ in pending]
+                with ProcessPoolExecutor(max_workers=self._workers) as executor:
+                    results = executor.map(summarize_capture_file, paths, chunksize=max(1, len(paths) // 256))
+                    for (path, mtime_ns, size), summary in zip(pending, results):
+                        summaries[path] = summary
+                        rows.append((path, mtime_ns, size, json.dumps(summary)))
+            # only the entries of new, modified and deleted capture files are written
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO files (path, mtime_ns, size, summary) VALUES (?, ?, ?, ?)",
+                                 rows)
+                conn.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in cached))
+        finally:
+            conn.close()
+
+        return merge_summaries(list(summaries.values()))
@@ -0,0 +1,126 @@
+"""
+Service port command channel through the Aladdin terminal.
+
+Commands are typed in the terminal input back to back, without waiting for
+the answers. The answers are then collected with a single wait executed in
+the page, and the new terminal text is split per command on the command
+echoes (and on the prompt, when one is configured).
+"""
+import logging
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+    from playwright._impl._locator import Locator
+
+# Resolve when every command echo was found in the new terminal text and
+# either the prompt ends the text or the text did not change for settleMs.
+_WAIT_RESPONSES_JS = """
+([element, baseLength, markers, prompt, settleMs]) => {
+    const text = element.innerText.slice(baseLength);
+    let position = 0;
+    for (const marker of markers) {
+        const index = text.indexOf(marker, position);
+        if (index < 0) {
+            return false;
+        }
+        position = index + marker.length;
+    }
+    if (prompt && text.trimEnd().endsWith(prompt) && text.trimEnd().length > position) {
+        return true;
+    }
+    const state = window.__serviceChannelState || {length: -1, since: 0};
+    if (state.length !== text.length) {
+        window.__serviceChannelState = {length: text.length, since: Date.now()};
+        return false;
+    }
+    return Date.now() - state.since >= settleMs;
+}
+"""
+
+
+def split_responses(text: str, commands: list[str], echo_format: str = "{command}",
+                    prompt: str = "") -> list[str]:
+    '''
+    Split the terminal text produced by a batch of commands into one response per command,
+    in the order of the commands (a command sent twice has two responses).
+    The response of a command is the text between its echo and the echo of the next command
+    (or the end of the text), without the prompt.
+    '''
+    echoes = [echo_format.format(command=command) for command in commands]
+    starts = []
+    position = 0
+    for echo in echoes:
+        index = text.find(echo, position)
+        if index < 0:
+            starts.append(None)
+            continue
+        starts.append(index)
+        position = index + len(echo)
+
+    responses = []
+    for i in range(len(commands)):
+        if starts[i] is None:
+            responses.append("")
+            continue
+        begin = starts[i] + len(echoes[i])
+        end = next((start for start in starts[i + 1:] if start is not None), len(text))
+        response = text[begin:end].strip()
+        if prompt and response.endswith(prompt):
+            response = response[:-len(prompt)].rstrip()
+        responses.append(response)
+    return responses
+
+
+class ServicePortChannel:
+    '''
+    Send service port commands through the terminal of the Aladdin product page.
+    '''
+
+    def __init__(self, page: "Page", terminal_text: "Locator", terminal_input: "Locator",
+                 echo_format: str = "{command}", prompt: str = "") -> None:
+        '''
+        terminal_text : locator of the terminal output.
+        terminal_input : locator of the terminal command input.
+        echo_format : how the terminal echoes a sent command, "{command}" is replaced by the command.
+        prompt : text printed by the terminal when it is ready for the next command (optional).
+        '''
+        self._page = page
+        self._terminal_text = terminal_text
+        self._terminal_input = terminal_input
+        self._echo_format = echo_format
+        self._prompt = prompt
+
+    def send_commands(self, commands: list[str], timeout: float = 10.0,
+                      settle_ms: int = 500) -> list[str]:
+        '''
+        Send every command back to back and return the response of each command, in order.
+
+        timeout : maximum time to wait for all the responses (unit = sec).
+        settle_ms : without prompt, responses are complete once the terminal text
+                    did not change for this period.
+        '''
+        if not commands:
+            return []
+        # Lengths and offsets in the terminal text are counted in the page (UTF-16 code units),
+        # the same units as the wait below
+        base_length = self._terminal_text.evaluate("element => element.innerText.length")
+        for command in commands:
+            self._terminal_input.fill(command)
+            self._terminal_input.press("Enter")
+        logging.info(f"Sent {len(commands)} service port commands")
+
+        markers = [self._echo_format.format(command=command) for command in commands]
+        element = self._terminal_text.element_handle()
+        try:
+            self._page.evaluate("() => { delete window.__serviceChannelState; }")
+            self._page.wait_for_function(
+                _WAIT_RESPONSES_JS, arg=[element, base_length, markers, self._prompt, settle_ms],
+                polling=100, timeout=timeout * 1000)
+        except Exception as e:
+            logging.warning(f"Service port responses incomplete after {timeout} sec: {e}")
+
+        text = self._terminal_text.evaluate("(element, start) => element.innerText.slice(start)", base_length)
+        return split_responses(text, commands, self._echo_format, self._prompt)
+
+    def send_command(self, command: str, timeout: float = 10.0) -> str:
+        return self.send_commands([command], timeout=timeout)[0]
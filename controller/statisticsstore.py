@@ -0,0 +1,236 @@
+"""
+Embedded time-series store (SQLite) for the scanner statistics captured by AladdinController.
+
+Each appended capture is stored as one sample per counter together with the
+delta from the previous sample. Hourly and daily rollups are maintained on
+insert, so trend queries only read a few rows per bucket.
+"""
+import logging
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Union
+
+_RESOLUTIONS = {
+    "hour": ("rollup_hourly", 3600),
+    "day": ("rollup_daily", 86400),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    scanner TEXT NOT NULL,
+    counter TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    delta INTEGER NOT NULL,
+    PRIMARY KEY (scanner, counter, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS latest (
+    scanner TEXT NOT NULL,
+    counter TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (scanner, counter)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_hourly (
+    scanner TEXT NOT NULL,
+    counter TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    delta_sum INTEGER NOT NULL,
+    sample_count INTEGER NOT NULL,
+    last_value INTEGER NOT NULL,
+    PRIMARY KEY (scanner, counter, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_daily (
+    scanner TEXT NOT NULL,
+    counter TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    delta_sum INTEGER NOT NULL,
+    sample_count INTEGER NOT NULL,
+    last_value INTEGER NOT NULL,
+    PRIMARY KEY (scanner, counter, bucket)
+) WITHOUT ROWID;
+"""
+
+_UPSERT_ROLLUP = """
+INSERT INTO {table} (scanner, counter, bucket, delta_sum, sample_count, last_value)
+VALUES (?, ?, ?, ?, 1, ?)
+ON CONFLICT (scanner, counter, bucket) DO UPDATE SET
+    delta_sum = delta_sum + excluded.delta_sum,
+    sample_count = sample_count + 1,
+    last_value = excluded.last_value
+"""
+
+
+def _to_epoch(moment: Union[datetime, int, float]) -> int:
+    if isinstance(moment, datetime):
+        return int(moment.timestamp())
+    return int(moment)
+
+
+class StatisticsStore:
+    '''
+    Time-series store of scanner counters.
+
+    Buckets of the rollups are aligned on UTC hours / days.
+    Samples older than (or as old as) the latest stored sample of a counter are ignored,
+    so appending the same capture twice is harmless.
+    '''
+
+    def __init__(self, path: str) -> None:
+        '''
+        path : path to the SQLite database file (created if it does not exist).
+        '''
+        self._path = path
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        try:
+            return self._connection
+        except AttributeError:
+            self._open()
+            return self._connection
+
+    def _open(self) -> None:
+        folder = os.path.dirname(self._path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        connection = sqlite3.connect(self._path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        self._connection = connection
+        logging.info(f"Opened statistics store: {self._path!r}")
+
+    def close(self) -> None:
+        try:
+            self._connection.close()
+            del self._connection
+        except AttributeError:
+            pass
+
+    def append(self, scanner: str, timestamp: Union[datetime, int, float], counters: dict[str, int]) -> int:
+        '''
+        Append the counters of one capture.
+        Delta is the increase from the previous sample; a decrease is treated
+        as a counter reset and the delta is the new value.
+
+        Return the number of samples written.
+        '''
+        ts = _to_epoch(timestamp)
+        hour_bucket = ts - ts % 3600
+        day_bucket = ts - ts % 86400
+        connection = self.connection
+        written = 0
+        with connection:
+            latest = dict(
+                (row[0], (row[1], row[2])) for row in connection.execute(
+                    "SELECT counter, ts, value FROM latest WHERE scanner = ?", (scanner,)))
+            for counter, value in counters.items():
+                previous = latest.get(counter)
+                if previous is None:
+                    delta = 0
+                elif ts <= previous[0]:
+                    continue
+                elif value >= previous[1]:
+                    delta = value - previous[1]
+                else:
+                    delta = value
+                connection.execute(
+                    "INSERT INTO samples (scanner, counter, ts, value, delta) VALUES (?, ?, ?, ?, ?)",
+                    (scanner, counter, ts, value, delta))
+                connection.execute(
+                    "INSERT OR REPLACE INTO latest (scanner, counter, ts, value) VALUES (?, ?, ?, ?)",
+                    (scanner, counter, ts, value))
+                connection.execute(_UPSERT_ROLLUP.format(table="rollup_hourly"),
+                                   (scanner, counter, hour_bucket, delta, value))
+                connection.execute(_UPSERT_ROLLUP.format(table="rollup_daily"),
+                                   (scanner, counter, day_bucket, delta, value))
+                written += 1
+        return written
+
+    def scanners(self) -> list[str]:
+        rows = self.connection.execute("SELECT DISTINCT scanner FROM latest ORDER BY scanner")
+        return [row[0] for row in rows]
+
+    def counters(self, scanner: str) -> list[str]:
+        rows = self.connection.execute(
+            "SELECT counter FROM latest WHERE scanner = ? ORDER BY counter", (scanner,))
+        return [row[0] for row in rows]
+
+    def latest(self, scanner: str) -> dict[str, int]:
+        rows = self.connection.execute(
+            "SELECT counter, value FROM latest WHERE scanner = ?", (scanner,))
+        return dict(rows)
+
+    def trend(self, scanner: str, counter: str,
+              start: Union[datetime, int, float, None] = None,
+              end: Union[datetime, int, float, None] = None,
+              resolution: str = "hour") -> list[tuple[datetime, int, int]]:
+        '''
+        Return [(bucket start, sum of deltas, last value), ...] ordered by time.
+
+        resolution : "hour", "day" (precomputed rollups) or "raw" (one row per sample).
+        start, end : optional bounds, start inclusive and end exclusive.
+        A bucket only partly within the bounds is summed from the samples within the bounds,
+        so no sample outside of them is counted.
+        '''
+        start_ts = None if start is None else _to_epoch(start)
+        end_ts = None if end is None else _to_epoch(end)
+        if resolution == "raw":
+            return [(datetime.fromtimestamp(row[0], tz=timezone.utc), row[1], row[2])
+                    for row in self._samples(scanner, counter, start_ts, end_ts)]
+        if resolution not in _RESOLUTIONS:
+            raise ValueError(f"Unexpected resolution: {resolution!r}")
+        table, size = _RESOLUTIONS[resolution]
+
+        # whole buckets are read from the rollup, the partial first and last buckets from the samples
+        first_full = None if start_ts is None else -(-start_ts // size) * size
+        last_full = None if end_ts is None else end_ts - end_ts % size
+        query = f"SELECT bucket, delta_sum, last_value FROM {table} WHERE scanner = ? AND counter = ?"
+        args = [scanner, counter]
+        if first_full is not None:
+            query += " AND bucket >= ?"
+            args.append(first_full)
+        if last_full is not None:
+            query += " AND bucket < ?"
+            args.append(last_full)
+        rows = list(self.connection.execute(query + " ORDER BY bucket", args))
+        if start_ts is not None and start_ts != first_full:
+            partial_end = first_full if end_ts is None else min(first_full, end_ts)
+            rows[:0] = self._partial_bucket(scanner, counter, start_ts - start_ts % size, start_ts, partial_end)
+        if end_ts is not None and end_ts != last_full and (first_full is None or last_full >= first_full):
+            rows.extend(self._partial_bucket(scanner, counter, last_full, last_full, end_ts))
+        return [(datetime.fromtimestamp(row[0], tz=timezone.utc), row[1], row[2]) for row in rows]
+
+    def _samples(self, scanner: str, counter: str, start_ts: Union[int, None], end_ts: Union[int, None]) -> list:
+        query = "SELECT ts, delta, value FROM samples WHERE scanner = ? AND counter = ?"
+        args = [scanner, counter]
+        if start_ts is not None:
+            query += " AND ts >= ?"
+            args.append(start_ts)
+        if end_ts is not None:
+            query += " AND ts < ?"
+            args.append(end_ts)
+        return list(self.connection.execute(query + " ORDER BY ts", args))
+
+    def _partial_bucket(self, scanner: str, counter: str, bucket: int, start_ts: int, end_ts: int) -> list:
+        '''
+        Return [(bucket, sum of deltas, last value)] of the samples in [start_ts, end_ts), [] if there is none.
+        '''
+        samples = self._samples(scanner, counter, start_ts, end_ts)
+        if not samples:
+            return []
+        return [(bucket, sum(sample[1] for sample in samples), samples[-1][2])]
+
+    def total_delta(self, scanner: str, counter: str,
+                    start: Union[datetime, int, float, None] = None,
+                    end: Union[datetime, int, float, None] = None) -> int:
+        '''
+        Return the increase of a counter over a period, read from the hourly rollups.
+        '''
+        return sum(delta for _, delta, _ in self.trend(scanner, counter, start, end, resolution="hour"))
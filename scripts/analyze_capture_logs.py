@@ -0,0 +1,40 @@
+"""
+Init logging
+"""
+import logging
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO,
+                    datefmt=r"%Y-%m-%d %H:%M:%S")
+
+
+"""
+Insert current work directory to system path
+"""
+import sys
+import os
+module_path = os.path.abspath(os.getcwd())
+if module_path not in sys.path:
+    sys.path.insert(0, module_path)
+    paths = '\n'.join(sys.path)
+    logging.info(f'System path: \n{paths}')
+
+import argparse
+import json
+from aladdin_auto.config import Config
+from controller.loganalyzer import LogAnalyzer
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Summarize every capture file under the test logs folder.")
+    parser.add_argument("root", nargs="?", default=None, help="folder to analyze (default: test_log_folder_path)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--output", default=None, help="write the summary to this JSON file instead of stdout")
+    args = parser.parse_args()
+
+    root = args.root or Config.testLogsFolderPath()
+    summary = LogAnalyzer(root, workers=args.workers).run()
+    if args.output:
+        with open(args.output, "w", encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        logging.info(f"Summary written to {args.output!r}")
+    else:
+        print(json.dumps(summary, indent=2))
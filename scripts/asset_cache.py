@@ -0,0 +1,43 @@
+"""
+Init logging
+"""
+import logging
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO,
+                    datefmt=r"%Y-%m-%d %H:%M:%S")
+
+
+"""
+Insert current work directory to system path
+"""
+import sys
+import os
+module_path = os.path.abspath(os.getcwd())
+if module_path not in sys.path:
+    sys.path.insert(0, module_path)
+    paths = '\n'.join(sys.path)
+    logging.info(f'System path: \n{paths}')
+
+import argparse
+from datetime import datetime
+from aladdin_auto.config import Config
+from aladdin_auto.networkcache import AssetCache
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="List or prune the asset cache of the web browsers.")
+    parser.add_argument("folder", nargs="?", default=None, help="cache folder (default: network_cache_folder_path)")
+    parser.add_argument("--prune_kb", type=int, default=None, help="delete the least recently used assets above this size (unit = KB)")
+    args = parser.parse_args()
+
+    folder = args.folder or Config.networkCacheFolderPath()
+    if not folder:
+        parser.error("no cache folder given and network_cache_folder_path is blank")
+    cache = AssetCache(folder)
+    if args.prune_kb is not None:
+        removed = cache.prune(args.prune_kb*1000)
+        logging.info(f"Removed {removed} cached URLs")
+    entries = sorted(cache.entries(), key=lambda entry: entry["lastUsed"], reverse=True)
+    for entry in entries:
+        lastUsed = datetime.fromtimestamp(entry["lastUsed"]).strftime(r"%Y-%m-%d %H:%M:%S")
+        print(f"{entry['size']:>10}  {lastUsed}  {entry['sha256'][:12]}  {entry['url']}")
+    print(f"{len(entries)} URLs, {cache.size()} bytes")
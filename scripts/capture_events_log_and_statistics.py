@@ -21,5 +21,5 @@ if module_path not in sys.path:
 from controller.aladdin import AladdinController
 
 if __name__ == '__main__':
-    aladdin_ctrl = AladdinController(timeout=30)
+    aladdin_ctrl = AladdinController(timeout=None)
     aladdin_ctrl.get_all_infor(save_infor=True)
\ No newline at end of file
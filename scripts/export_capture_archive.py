@@ -0,0 +1,41 @@
+"""
+Init logging
+"""
+import logging
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO,
+                    datefmt=r"%Y-%m-%d %H:%M:%S")
+
+
+"""
+Insert current work directory to system path
+"""
+import sys
+import os
+module_path = os.path.abspath(os.getcwd())
+if module_path not in sys.path:
+    sys.path.insert(0, module_path)
+    paths = '\n'.join(sys.path)
+    logging.info(f'System path: \n{paths}')
+
+from controller.capturearchive import CaptureArchive
+from controller.capturelog import parse_archive_file_name
+
+if __name__ == '__main__':
+    # Rebuild the text files of a capture archive:
+    # python scripts/export_capture_archive.py <archive path> <output folder>
+    archive_path, output_folder = sys.argv[1], sys.argv[2]
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+    archive = CaptureArchive(archive_path)
+    # Same names as the text files of AladdinController, without the date of the segment
+    scanner_name = parse_archive_file_name(archive_path)
+    if scanner_name is not None:
+        file_name = f'{scanner_name}_Events_log_and_statistics'
+    else:
+        file_name = os.path.basename(archive_path).rsplit('.', 1)[0]
+    for timestamp, text in archive.iter_captures():
+        date_time = timestamp.strftime(r"%Y%m%d_%H%M%S")
+        with open(f'{output_folder}/{file_name}_{date_time}.txt', "w", encoding='utf-8') as f:
+            f.write(text)
+    logging.info(f"Exported {len(archive)} captures to {output_folder!r}")
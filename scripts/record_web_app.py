@@ -0,0 +1,58 @@
+"""
+Init logging
+"""
+import logging
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO,
+                    datefmt=r"%Y-%m-%d %H:%M:%S")
+
+
+"""
+Insert current work directory to system path
+"""
+import sys
+import os
+module_path = os.path.abspath(os.getcwd())
+if module_path not in sys.path:
+    sys.path.insert(0, module_path)
+    paths = '\n'.join(sys.path)
+    logging.info(f'System path: \n{paths}')
+
+import argparse
+from playwright.sync_api import sync_playwright
+from aladdin_auto.aladdinactions import selectDeviceAndReleaseFromHomePage
+from aladdin_auto.config import Config
+from aladdin_auto.productmenu import productMenuIndex
+from aladdin_auto.productxml import ProductXML
+from aladdin_auto.webbrowser import recordWebApp
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record the web application hosted at web_url for the replay network mode.")
+    parser.add_argument("products", nargs="*", help="menu or product names (or unambiguous parts of them) of the products to open while recording (default: none, only the home page)")
+    parser.add_argument("--all_products", action="store_true", help="open every product and release of the data folder")
+    parser.add_argument("--har", default=None, help="path to the archive (default: network_har_path)")
+    args = parser.parse_args()
+
+    menuNames = []
+    if args.all_products:
+        menuNames = productMenuIndex().menuNames()
+    elif args.products:
+        try:
+            menuNames = [productMenuIndex().resolve(name) for name in args.products]
+        except LookupError as e:
+            parser.error(str(e))
+    # only the XMLs of the recorded products are parsed
+    xmls = [ProductXML(productName, releaseNumber, menuName)
+            for menuName in menuNames for productName, releaseNumber in productMenuIndex().releases(menuName)]
+    url = Config.webUrl()
+
+    def openProducts(page):
+        for xml in xmls:
+            logging.info(f"Opening {xml.menuProductName} {xml.releaseNumber}")
+            page.goto(url)
+            selectDeviceAndReleaseFromHomePage(page, xml)
+
+    harPath = args.har or Config.networkHarPath()
+    with sync_playwright() as playwright:
+        recordWebApp(playwright, url, harPath, [], openProducts)
+    logging.info(f"Recorded {url} for {len(xmls)} product releases to {harPath!r}")
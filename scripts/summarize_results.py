@@ -0,0 +1,104 @@
+"""
+Init logging
+"""
+import logging
+format = "%(asctime)s: %(message)s"
+logging.basicConfig(format=format, level=logging.INFO,
+                    datefmt=r"%Y-%m-%d %H:%M:%S")
+
+
+"""
+Insert current work directory to system path
+"""
+import sys
+import os
+module_path = os.path.abspath(os.getcwd())
+if module_path not in sys.path:
+    sys.path.insert(0, module_path)
+    paths = '\n'.join(sys.path)
+    logging.info(f'System path: \n{paths}')
+
+import argparse
+import heapq
+import html
+import json
+from aladdin_auto.config import Config
+
+_NOT_PASSED = ("failed", "error", "xpassed")
+
+
+def readRecords(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def totalDuration(record: dict) -> float:
+    return sum(record.get("durations", {}).values())
+
+
+def writeTestRows(output, records):
+    output.write("<table><tr><th>Test</th><th>Outcome</th><th>Duration (s)</th><th>Message</th><th>Artifacts</th></tr>\n")
+    for record in records:
+        artifacts = " ".join(f"<a href='{html.escape(path)}'>{html.escape(os.path.basename(path))}</a>"
+                             for path in record.get("artifacts", []))
+        output.write(f"<tr><td>{html.escape(record['test'])}</td><td>{record['outcome']}</td>"
+                     f"<td>{totalDuration(record):.2f}</td><td>{html.escape(record.get('message') or '')}</td>"
+                     f"<td>{artifacts}</td></tr>\n")
+    output.write("</table>\n")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Render an HTML summary of the results written to results_jsonl_path.")
+    parser.add_argument("path", nargs="?", default=None, help="results file (default: results_jsonl_path)")
+    parser.add_argument("--output", default=None, help="HTML file to write (default: results file with .html extension)")
+    parser.add_argument("--slowest", type=int, default=20, help="number of slowest tests to list")
+    args = parser.parse_args()
+
+    path = args.path or Config.resultsJsonlPath()
+    if not path:
+        parser.error("no results file given and results_jsonl_path is blank")
+    outputPath = args.output or f"{os.path.splitext(path)[0]}.html"
+
+    # first pass: counts and slowest tests, the results are not kept in memory
+    session, summary = {}, None
+    counts = {}
+    slowest = []
+    for seq, record in enumerate(readRecords(path)):
+        if record["type"] == "session":
+            session = record
+        elif record["type"] == "summary":
+            summary = record
+        elif record["type"] == "test":
+            counts[record["outcome"]] = counts.get(record["outcome"], 0) + 1
+            # seq breaks the ties of reruns and merged worker files, so the records are never compared
+            item = (totalDuration(record), record["test"], seq, record)
+            if len(slowest) < args.slowest:
+                heapq.heappush(slowest, item)
+            elif item[0] > slowest[0][0]:
+                heapq.heapreplace(slowest, item)
+
+    with open(outputPath, "w", encoding="utf-8") as output:
+        output.write(f"<html><head><meta charset='utf-8'><title>{html.escape(os.path.basename(path))}</title></head><body>\n")
+        output.write(f"<h1>Results of {html.escape(os.path.basename(path))}</h1>\n")
+        output.write(f"<p>Started: {session.get('started', '')}, config hash: {session.get('config_hash', '')}</p>\n")
+        if summary is not None:
+            output.write(f"<p>Exit status: {summary['exit_status']}, duration: {summary['duration']:.0f} s</p>\n")
+        else:
+            output.write("<p>The session did not finish.</p>\n")
+        output.write("<p>" + ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items())) + "</p>\n")
+        output.write("<details><summary>Config</summary>")
+        output.writelines(f"<p>{html.escape(f'{key}={value}')}</p>" for key, value in session.get("config", {}).items())
+        output.write("</details>\n")
+
+        output.write(f"<h2>Slowest tests</h2>\n")
+        writeTestRows(output, (record for _, _, _, record in sorted(slowest, reverse=True)))
+
+        # second pass: tests that did not pass, written as they are read
+        output.write("<h2>Failed tests</h2>\n")
+        writeTestRows(output, (record for record in readRecords(path)
+                               if record["type"] == "test" and record["outcome"] in _NOT_PASSED))
+        output.write("</body></html>\n")
+    logging.info(f"Summary written to {outputPath!r}")
@@ -0,0 +1,30 @@
+import pytest
+from aladdin_auto.config import Config
+
+
+@pytest.fixture
+def set_option():
+    """
+    Config.setOption, with the options of the config file restored after the test.
+    """
+    Config.snapshot()
+    overrides = dict(Config._overrides)
+    yield Config.setOption
+    with Config._reloadLock:
+        Config._overrides = overrides
+        Config._loadConfig()
+
+
+@pytest.fixture
+def synthetic_catalog(tmp_path, set_option):
+    """
+    Small synthetic catalog (3 products of 2 releases) used as data folder.
+    """
+    from benchmarks.catalog_generator import generateCatalog
+    catalog = generateCatalog(str(tmp_path / "data"), productCount=3, releasesPerProduct=2, topLevelPages=2, depth=2,
+                              fanout=2, paramsPerPage=2)
+    set_option("data_folder_path", catalog.dataFolderPath)
+    return catalog
+
+
+pytest_plugins = ["pytester"]
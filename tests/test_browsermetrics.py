@@ -0,0 +1,57 @@
+from aladdin_auto.browsermetrics import pageMetrics, recycleReason
+
+
+def test_recycle_after_test_count_limit():
+    assert recycleReason(4, None, 5, -1) is None
+    assert recycleReason(5, None, 5, -1) == "used by 5 tests"
+    assert recycleReason(500, None, -1, -1) is None
+
+
+def test_recycle_above_memory_limit():
+    assert recycleReason(1, 900.0, -1, 1000) is None
+    assert recycleReason(1, 1200.4, -1, 1000) == "uses 1200 MB"
+    # memory not sampled
+    assert recycleReason(1, None, -1, 1000) is None
+
+
+
+class _CDPSession:
+    def __init__(self, metrics: dict) -> None:
+        self._metrics = metrics
+
+    def send(self, method: str):
+        if method == "Performance.getMetrics":
+            return {"metrics": [{"name": name, "value": value} for name, value in self._metrics.items()]}
+        return {}
+
+    def detach(self):
+        pass
+
+
+class _Page:
+    # page reporting CDP metrics and the navigation timings of its last load
+    def __init__(self, metrics: dict) -> None:
+        self.metrics = metrics
+        self.context = self
+
+    def new_cdp_session(self, page):
+        return _CDPSession(self.metrics)
+
+    def evaluate(self, script: str):
+        return {"responseEnd": 120.0, "domContentLoaded": 300.0, "load": 450.0}
+
+
+def test_page_metrics_of_the_test_body():
+    page = _Page({"ScriptDuration": 0.5, "TaskDuration": 1.0, "LayoutCount": 10, "JSHeapUsedSize": 4 * 1024 * 1024,
+                  "Nodes": 800})
+    before = dict(page.metrics)
+    page.metrics = {"ScriptDuration": 0.75, "TaskDuration": 1.5, "LayoutCount": 16, "JSHeapUsedSize": 6 * 1024 * 1024,
+                    "Nodes": 900}
+    metrics = pageMetrics(page, before)
+    assert metrics["script_ms"] == 250.0
+    assert metrics["task_ms"] == 500.0
+    assert metrics["layout_count"] == 6
+    assert metrics["recalc_style_count"] == 0
+    assert metrics["js_heap_mb"] == 6.0
+    assert metrics["nodes"] == 900
+    assert (metrics["response_ms"], metrics["dom_content_loaded_ms"], metrics["load_ms"]) == (120.0, 300.0, 450.0)
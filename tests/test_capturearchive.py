@@ -0,0 +1,125 @@
+import os
+from datetime import datetime, timedelta
+import pytest
+from controller.aladdin import AladdinController
+from controller.capturearchive import CaptureArchive, CaptureArchiveError
+
+T0 = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def _capture(i: int) -> str:
+    events = "\n".join(f"event {j}: code {j % 7}" for j in range(i + 1))
+    return f"Statistics\nreads: {100 + i}\nEvents\n{events}"
+
+
+def _fill(path: str, count: int, keyframe_interval: int = 4) -> CaptureArchive:
+    archive = CaptureArchive(path, keyframe_interval=keyframe_interval)
+    for i in range(count):
+        archive.append(T0 + timedelta(minutes=30 * i), _capture(i))
+    return archive
+
+
+def test_captures_are_rebuilt_from_keyframes_and_deltas(tmp_path):
+    path = str(tmp_path / "scanner.caparch")
+    _fill(path, 10)
+    archive = CaptureArchive(path)
+    assert len(archive) == 10
+    assert [entry[3] for entry in archive.index] == [0, 1, 1, 1, 0, 1, 1, 1, 0, 1]
+    assert archive.get(6) == _capture(6)
+    assert archive.get(-1) == _capture(9)
+    assert archive.get_at(T0 + timedelta(minutes=75)) == _capture(2)
+    assert [text for _, text in archive.iter_captures()] == [_capture(i) for i in range(10)]
+    assert archive.timestamps()[1] == T0 + timedelta(minutes=30)
+    with pytest.raises(KeyError):
+        archive.get_at(T0 - timedelta(minutes=1))
+
+
+def test_append_continues_an_existing_archive(tmp_path):
+    path = str(tmp_path / "scanner.caparch")
+    _fill(path, 3)
+    archive = CaptureArchive(path, keyframe_interval=4)
+    archive.append(T0 + timedelta(hours=5), _capture(3))
+    assert CaptureArchive(path).get(3) == _capture(3)
+
+
+def test_append_cuts_off_torn_index_line(tmp_path):
+    path = str(tmp_path / "scanner.caparch")
+    _fill(path, 3)
+    # interrupted append: record written, index line incomplete
+    with open(f"{path}.idx", "a", encoding="utf-8") as f:
+        f.write("20240101_093000\t12")
+    archive = CaptureArchive(path, keyframe_interval=4)
+    assert len(archive) == 3
+    archive.append(T0 + timedelta(hours=2), _capture(3))
+    with open(f"{path}.idx", "r", encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    assert lines[-1] == ""
+    assert all(len(line.split("\t")) == 4 for line in lines[:-1])
+    reopened = CaptureArchive(path)
+    assert len(reopened) == 4
+    assert reopened.get(3) == _capture(3)
+
+
+def test_corrupted_record_raises(tmp_path):
+    path = str(tmp_path / "scanner.caparch")
+    archive = _fill(path, 2)
+    offset = archive.index[1][1]
+    with open(path, "r+b") as f:
+        f.seek(offset + 20)
+        f.write(b"\xff\xff")
+    with pytest.raises(CaptureArchiveError):
+        CaptureArchive(path).get(1)
+
+
+def test_keyframe_interval_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        CaptureArchive(str(tmp_path / "scanner.caparch"), keyframe_interval=0)
+
+
+def test_retention_deletes_old_archive_segments(tmp_path, set_option):
+    set_option("test_log_folder_path", str(tmp_path))
+    set_option("test_scanner_name", "SCANNER")
+    set_option("capture_archive", True)
+    set_option("test_log_count_limit", 2)
+    controller = AladdinController.__new__(AladdinController)
+    for day in range(4):
+        controller._all_infor = _capture(day)
+        controller._captured_at = T0 + timedelta(days=day)
+        controller._save_infor()
+    names = sorted(os.listdir(tmp_path / "SCANNER"))
+    segments = [name for name in names if not name.startswith(".")]
+    assert segments == ["SCANNER_Events_log_and_statistics_20240103.caparch",
+                        "SCANNER_Events_log_and_statistics_20240103.caparch.idx",
+                        "SCANNER_Events_log_and_statistics_20240104.caparch",
+                        "SCANNER_Events_log_and_statistics_20240104.caparch.idx"]
+
+
+def test_records_without_keyframe_raise(tmp_path):
+    path = str(tmp_path / "scanner.caparch")
+    _fill(path, 3)
+    with open(f"{path}.idx", "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(f"{path}.idx", "w", encoding="utf-8") as f:
+        f.writelines(lines[1:])
+    with pytest.raises(CaptureArchiveError):
+        CaptureArchive(path).get(0)
+
+
+def test_open_segment_deleted_by_retention_restarts_with_keyframe(tmp_path, set_option):
+    set_option("test_log_folder_path", str(tmp_path))
+    set_option("test_scanner_name", "SCANNER")
+    set_option("capture_archive", True)
+    set_option("test_log_size_limit", 1)
+    controller = AladdinController.__new__(AladdinController)
+    path = tmp_path / "SCANNER" / "SCANNER_Events_log_and_statistics_20240101.caparch"
+    # larger than the size limit once compressed: the open segment is deleted
+    controller._all_infor = "\n".join(os.urandom(16).hex() for _ in range(100))
+    controller._captured_at = T0
+    controller._save_infor()
+    assert not path.exists()
+    controller._all_infor = _capture(1)
+    controller._captured_at = T0 + timedelta(minutes=30)
+    controller._save_infor()
+    archive = CaptureArchive(str(path))
+    assert [entry[3] for entry in archive.index] == [0]
+    assert archive.get(0) == _capture(1)
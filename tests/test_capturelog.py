@@ -0,0 +1,40 @@
+from datetime import datetime
+from controller.capturelog import (event_key, parse_archive_file_name, parse_capture_file_name, parse_counters,
+                                   parse_events, parse_firmware)
+
+CAPTURE = """Software Version : 1.0.0-standin
+Product Name : STANDIN-SCANNER
+Power Up Count : 12
+Good Read Count = 1007
+Trigger 2 Count: 8
+[2024-01-01 00:00:01] Event GOOD_READ 1
+Power up at 10:01:05
+Decode timeout at 10:02
+"""
+
+
+def test_parse_counters():
+    assert parse_counters(CAPTURE) == {"Power Up Count": 12, "Good Read Count": 1007, "Trigger 2 Count": 8}
+
+
+def test_parse_firmware():
+    assert parse_firmware(CAPTURE) == "1.0.0-standin"
+    assert parse_firmware("Good Read Count : 3") is None
+
+
+def test_event_lines_with_times_are_events():
+    assert parse_events(CAPTURE) == ["[2024-01-01 00:00:01] Event GOOD_READ 1", "Power up at 10:01:05",
+                                     "Decode timeout at 10:02"]
+
+
+def test_event_key_groups_numbers():
+    assert event_key("Power up at 10:01:05") == event_key("Power up at 11:31:00") == "Power up at #:#:#"
+
+
+def test_parse_file_names():
+    assert parse_capture_file_name("logs/S1_Events_log_and_statistics_20240101_083000.txt") == (
+        "S1", datetime(2024, 1, 1, 8, 30))
+    assert parse_capture_file_name("S1_statistics.txt") is None
+    assert parse_archive_file_name("logs/S1_Events_log_and_statistics_20240101.caparch") == "S1"
+    assert parse_archive_file_name("S1_Events_log_and_statistics.caparch") == "S1"
+    assert parse_archive_file_name("S1_Events_log_and_statistics_20240101.caparch.idx") is None
@@ -0,0 +1,95 @@
+import os
+import pytest
+
+from aladdin_auto import catalog
+from aladdin_auto.productxml import ProductXML
+
+
+@pytest.fixture(autouse=True)
+def clear_indexes():
+    catalog._indexes.clear()
+    catalog.loadProductXML.cache_clear()
+    yield
+    catalog._indexes.clear()
+    catalog.loadProductXML.cache_clear()
+
+
+def cacheFiles(folder):
+    return sorted(name for name in os.listdir(folder) if name.endswith(".pickle"))
+
+
+def test_read_xml_matches_productxml(synthetic_catalog):
+    for productName, releaseNumber, menuProductName in ProductXML.menuProducts():
+        xml = ProductXML(productName, releaseNumber, menuProductName)
+        entry = catalog._readXML(ProductXML.xmlPath(productName, releaseNumber), productName)
+        assert entry["parameters"] == [
+            [param.get("code", ""), param.get("name", ""), param.get("type", ""), param.get("protection", "")]
+            for param in xml.parameters]
+        assert entry["topLevelPages"] == len(xml.getTopLevelPages())
+        assert entry["userTopLevelPages"] == len(xml.getAllUserTopLevelPages())
+
+
+def test_catalog_products_and_parameters(synthetic_catalog):
+    index = catalog.catalogIndex()
+    assert catalog.catalogIndex() is index
+    products = catalog.catalogProducts(index)
+    assert [(product.productName, product.releaseNumber, product.menuProductName) for product in products] == \
+        ProductXML.menuProducts()
+    parameters = catalog.catalogParameters(index)
+    assert len(parameters) == sum(len(product["parameterCodes"]) * len(product["releases"])
+                                  for product in synthetic_catalog.products)
+    parameter = parameters[0]
+    assert parameter.id == f"{products[0].id}-{parameter.code}"
+    assert parameter.parameter.code == parameter.code
+    # the ProductXML is shared by the parameters of a product release
+    assert parameters[1].productXML is parameter.productXML
+
+
+def test_index_is_read_from_the_cache(synthetic_catalog, tmp_path, monkeypatch):
+    cacheFolder = str(tmp_path / "cache")
+    os.mkdir(cacheFolder)
+    index = catalog.catalogIndex(cacheFolder)
+    assert len(cacheFiles(cacheFolder)) == 1
+
+    catalog._indexes.clear()
+
+    def buildCatalogIndex():
+        raise AssertionError("the XMLs were read again")
+
+    monkeypatch.setattr(catalog, "buildCatalogIndex", buildCatalogIndex)
+    assert catalog.catalogIndex(cacheFolder) == index
+
+
+def test_cache_is_rebuilt_when_an_xml_changes(synthetic_catalog, tmp_path):
+    cacheFolder = str(tmp_path / "cache")
+    os.mkdir(cacheFolder)
+    key = catalog.dataFolderKey()
+    catalog.catalogIndex(cacheFolder)
+    [oldFile] = cacheFiles(cacheFolder)
+    assert key in oldFile
+
+    productName, releaseNumber, _ = ProductXML.menuProducts()[0]
+    xmlPath = ProductXML.xmlPath(productName, releaseNumber)
+    stat = os.stat(xmlPath)
+    os.utime(xmlPath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert catalog.dataFolderKey() != key
+
+    catalog._indexes.clear()
+    catalog.catalogIndex(cacheFolder)
+    # the index of the earlier content is removed
+    [newFile] = cacheFiles(cacheFolder)
+    assert newFile != oldFile
+    assert newFile.startswith(catalog._cacheFilePrefix(synthetic_catalog.dataFolderPath))
+
+
+def test_invalid_cache_file_is_replaced(synthetic_catalog, tmp_path):
+    cacheFolder = str(tmp_path / "cache")
+    os.mkdir(cacheFolder)
+    index = catalog.catalogIndex(cacheFolder)
+    [name] = cacheFiles(cacheFolder)
+    with open(os.path.join(cacheFolder, name), "wb") as f:
+        f.write(b"not a pickle")
+
+    catalog._indexes.clear()
+    assert catalog.catalogIndex(cacheFolder) == index
+    assert catalog._readCacheFile(os.path.join(cacheFolder, name)) == index
@@ -0,0 +1,13 @@
+from aladdin_auto.productxml import ProductXML
+
+
+def test_generated_catalog_is_loaded_by_productxml(synthetic_catalog):
+    assert ProductXML.menuProducts() == [
+        (product["product"], release, product["menu"])
+        for product in synthetic_catalog.products for release in product["releases"]]
+    product = synthetic_catalog.products[1]
+    xml = ProductXML(product["product"], product["releases"][0], product["menu"])
+    # 2 top level pages of 2 child pages, 2 parameters per page
+    assert len(xml.getTopLevelPages()) == 2
+    assert [param.code for param in xml.createParameterList()] == product["parameterCodes"]
+    assert len(product["parameterCodes"]) == 12
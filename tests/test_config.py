@@ -0,0 +1,76 @@
+import logging
+import os
+import pytest
+from aladdin_auto.config import AladdinBrowserType, Config, ConfigSnapshot, _UninitializedSnapshot
+
+
+@pytest.fixture
+def fresh_config(tmp_path, monkeypatch):
+    """
+    Config read again from an aladdin_config.ini written in an empty working folder, restored after the test.
+    """
+    for name in ("_strOptions", "_booleanOptions", "_floatOptions", "_intOptions", "_defaultAladdinBrowserType",
+                 "_defaultAladdinWebBrowserType", "_configPath", "_configMtimeNs", "_fullConfigDictionary"):
+        monkeypatch.setattr(Config, name, getattr(Config, name))
+    monkeypatch.setattr(Config, "_initialized", False)
+    monkeypatch.setattr(Config, "_snapshot", _UninitializedSnapshot())
+    monkeypatch.setattr(Config, "_overrides", {})
+    monkeypatch.setattr(Config, "_subscribers", [])
+    monkeypatch.chdir(tmp_path)
+
+    def writeConfig(text: str, mtimeNs: int = None):
+        path = tmp_path / "aladdin_config.ini"
+        path.write_text(f"[ALADDIN_AUTO]\n{text}\n", encoding="utf-8")
+        if mtimeNs is not None:
+            os.utime(path, ns=(mtimeNs, mtimeNs))
+    return writeConfig
+
+
+def test_options_are_read_from_the_config_file(fresh_config):
+    fresh_config("headless=False\nslow_mo=250\ndefault_browser_type=WEBAPP_URL")
+    assert Config.headless() is False
+    assert Config.slowMo() == 250
+    assert Config.defaultAladdinBrowserType() == AladdinBrowserType.WEBAPP_URL
+    # not in the file
+    assert Config.captureIntervalMins() == 30
+
+
+def test_invalid_config_file_falls_back_to_defaults(fresh_config, caplog):
+    fresh_config("headless=False\ndefault_browser_type=FOO")
+    with caplog.at_level(logging.ERROR):
+        assert Config.headless() is True
+        assert Config.defaultAladdinBrowserType() == AladdinBrowserType.STANDALONE_APP
+        assert Config.snapshot().slow_mo == 0
+    assert len([record for record in caplog.records if "Invalid config file" in record.message]) == 1
+
+
+def test_fixed_config_file_is_reloaded(fresh_config):
+    fresh_config("default_browser_type=FOO", mtimeNs=10**18)
+    assert Config.headless() is True
+    fresh_config("headless=False", mtimeNs=2 * 10**18)
+    assert Config.reloadIfChanged()
+    assert Config.headless() is False
+    assert not Config.reloadIfChanged()
+
+
+def test_overrides_survive_reload_and_notify_subscribers(fresh_config):
+    fresh_config("slow_mo=100\nheadless=False", mtimeNs=10**18)
+    changes = []
+    Config.subscribe(lambda old, new: changes.append(old.changedOptions(new)))
+    Config.setOption("slow_mo", 5)
+    fresh_config("slow_mo=200\nheadless=True", mtimeNs=2 * 10**18)
+    Config.reloadIfChanged()
+    assert Config.slowMo() == 5
+    assert Config.headless() is True
+    assert changes == [{"slow_mo"}, {"headless"}]
+
+
+def test_snapshot_is_immutable(fresh_config):
+    fresh_config("")
+    snapshot = Config.snapshot()
+    assert isinstance(snapshot, ConfigSnapshot)
+    with pytest.raises(AttributeError):
+        snapshot.headless = False
+    Config.setOption("headless", False)
+    assert snapshot.headless is True
+    assert Config.snapshot().headless is False
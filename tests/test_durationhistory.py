@@ -0,0 +1,57 @@
+import sqlite3
+from datetime import datetime
+from aladdin_auto.durationhistory import DurationHistory, isRegression
+
+EARLIER = [1.0, 1.02, 0.98, 1.01, 0.99]
+
+
+def test_is_regression():
+    assert isRegression(2.0, EARLIER, 1.5)
+    # not slower by the ratio
+    assert not isRegression(1.4, EARLIER, 1.5)
+    # too small to matter
+    assert not isRegression(0.03, [0.01] * 5, 1.5)
+    # within the spread of noisy earlier durations
+    assert not isRegression(2.0, [0.5, 1.5, 0.6, 1.4, 1.0], 1.5)
+
+
+def _session(path: str, durations: dict, failed: set = frozenset(), window: int = 20) -> DurationHistory:
+    history = DurationHistory(path, window)
+    for test, call in durations.items():
+        history.add(test, "setup", 0.1, True)
+        history.add(test, "call", call, test not in failed)
+        history.add(test, "teardown", 0.1, True)
+    return history
+
+
+def test_session_durations_skip_failed_tests():
+    history = _session("unused.db", {"test_a": 1.0, "test_b": 2.0}, failed={"test_b"})
+    durations = history.sessionDurations()
+    assert list(durations) == ["test_a"]
+    assert round(durations["test_a"]["total"], 6) == 1.2
+
+
+def test_regressions_are_found_against_saved_sessions(tmp_path):
+    path = str(tmp_path / "history.db")
+    # no history yet
+    assert _session(path, {"test_a": 1.0}).findRegressions(1.5) == []
+    for duration in EARLIER:
+        _session(path, {"test_a": duration, "test_b": duration}).save(datetime(2024, 1, 1))
+    regressions = _session(path, {"test_a": 3.0, "test_b": 1.0}).findRegressions(1.5)
+    assert [(regression.test, regression.phase) for regression in regressions] == [("test_a", "call"),
+                                                                                   ("test_a", "total")]
+    assert regressions[0].baseline == 1.0
+    assert regressions[0].samples == 5
+    assert str(regressions[0]) == "test_a (call): 3.00 s, baseline 1.00 s (3.0x)"
+
+
+def test_save_keeps_the_window(tmp_path):
+    path = str(tmp_path / "history.db")
+    for i in range(8):
+        runId, saved = _session(path, {"test_a": 1.0 + i / 100}, window=5).save(datetime(2024, 1, 1))
+    assert (runId, saved) == (8, 1)
+    connection = sqlite3.connect(path)
+    runIds = [row[0] for row in connection.execute(
+        "SELECT run_id FROM durations WHERE test = 'test_a' AND phase = 'call' ORDER BY run_id")]
+    connection.close()
+    assert runIds == [4, 5, 6, 7, 8]
@@ -0,0 +1,10 @@
+import os
+import pytest
+from benchmarks.import_benchmark import DEFAULT_MODULES, FORBIDDEN_MODULES, importedModules
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("module", DEFAULT_MODULES)
+def test_controller_imports_no_heavy_dependency(module):
+    assert importedModules(module, FORBIDDEN_MODULES, ROOT) == []
@@ -0,0 +1,76 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from controller.capturearchive import CaptureArchive
+from controller.loganalyzer import LogAnalyzer, discover_capture_files
+
+T0 = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def _capture(i: int, firmware: str = "1.0") -> str:
+    events = "\n".join(f"Power up at 08:{j:02d}:00" for j in range(i + 1))
+    return f"Software Version : {firmware}\nGood Read Count : {100 + 10 * i}\n{events}\n"
+
+
+def _write_text_captures(folder, scanner: str, count: int):
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        stamp = (T0 + timedelta(minutes=30 * i)).strftime(r"%Y%m%d_%H%M%S")
+        with open(os.path.join(folder, f"{scanner}_Events_log_and_statistics_{stamp}.txt"), "w", encoding="utf-8") as f:
+            f.write(_capture(i))
+
+
+def test_text_captures_and_archives_are_merged(tmp_path):
+    _write_text_captures(tmp_path / "S1", "S1", 3)
+    archive = CaptureArchive(str(tmp_path / "S2" / "S2_Events_log_and_statistics_20240101.caparch"))
+    for i in range(4):
+        archive.append(T0 + timedelta(minutes=30 * i), _capture(i, firmware="1.0" if i < 2 else "1.1"))
+
+    assert len(list(discover_capture_files(str(tmp_path)))) == 4
+    summary = LogAnalyzer(str(tmp_path), workers=1).run()
+    assert summary["S1"]["captures"] == 3
+    assert summary["S1"]["counter_deltas"] == {"Good Read Count": 20}
+    assert summary["S2"]["captures"] == 4
+    assert summary["S2"]["counter_deltas"] == {"Good Read Count": 30}
+    assert summary["S2"]["firmware_changes"] == [{"timestamp": (T0 + timedelta(hours=1)).isoformat(),
+                                                  "from": "1.0", "to": "1.1"}]
+    # events repeated by later captures are counted once
+    assert summary["S2"]["event_histogram"] == {"Power up at #:#:#": 4}
+
+
+def test_cache_is_used_and_refreshed(tmp_path):
+    _write_text_captures(tmp_path, "S1", 2)
+    analyzer = LogAnalyzer(str(tmp_path), workers=1)
+    first = analyzer.run()
+    assert os.path.exists(tmp_path / ".capture_analyzer_cache.sqlite")
+    assert analyzer.run() == first
+    _write_text_captures(tmp_path, "S1", 3)
+    assert analyzer.run()["S1"]["captures"] == 3
+
+
+def test_files_of_one_scanner_are_merged_in_time_order(tmp_path):
+    # text captures 0-1, then an archive segment with captures 2-4 and a firmware update
+    _write_text_captures(tmp_path, "S1", 2)
+    archive = CaptureArchive(str(tmp_path / "S1_Events_log_and_statistics_20240101.caparch"))
+    for i in range(2, 5):
+        archive.append(T0 + timedelta(minutes=30 * i), _capture(i, firmware="1.0" if i < 3 else "1.1"))
+    summary = LogAnalyzer(str(tmp_path), workers=1).run()["S1"]
+    assert summary["captures"] == 5
+    assert summary["first_capture"] == T0.isoformat()
+    assert summary["last_capture"] == (T0 + timedelta(hours=2)).isoformat()
+    assert summary["counter_deltas"] == {"Good Read Count": 40}
+    assert summary["last_counters"] == {"Good Read Count": 140}
+    assert summary["firmware_changes"] == [{"timestamp": (T0 + timedelta(minutes=90)).isoformat(),
+                                            "from": "1.0", "to": "1.1"}]
+    assert summary["event_histogram"] == {"Power up at #:#:#": 5}
+
+
+def test_cache_entries_follow_the_capture_files(tmp_path):
+    _write_text_captures(tmp_path, "S1", 3)
+    analyzer = LogAnalyzer(str(tmp_path), workers=1)
+    analyzer.run()
+    paths = sorted(path for path, _, _ in discover_capture_files(str(tmp_path)))
+    os.remove(paths[0])
+    assert analyzer.run()["S1"]["captures"] == 2
+    with sqlite3.connect(tmp_path / ".capture_analyzer_cache.sqlite") as conn:
+        assert sorted(path for path, in conn.execute("SELECT path FROM files")) == paths[1:]
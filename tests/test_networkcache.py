@@ -0,0 +1,43 @@
+import os
+from aladdin_auto.networkcache import AssetCache
+
+URL = "https://aladdin.example.com/main.js"
+
+
+def test_put_and_get(tmp_path):
+    cache = AssetCache(str(tmp_path))
+    assert cache.get(URL) is None
+    assert cache.put(URL, 200, {"Content-Type": "text/javascript", "Content-Encoding": "gzip"}, b"main()")
+    assert cache.get(URL) == (200, {"Content-Type": "text/javascript"}, b"main()")
+
+
+def test_same_content_is_stored_once(tmp_path):
+    cache = AssetCache(str(tmp_path))
+    cache.put(URL, 200, {}, b"main()")
+    cache.put(f"{URL}?v=2", 200, {}, b"main()")
+    assert len(list(cache.entries())) == 2
+    assert cache.size() == len(b"main()")
+
+
+def test_responses_not_to_be_stored_are_skipped(tmp_path):
+    cache = AssetCache(str(tmp_path))
+    assert not cache.put(URL, 200, {"cache-control": "no-store"}, b"secret")
+    assert not cache.put(URL, 200, {"Cache-Control": "max-age=0, Private"}, b"secret")
+    assert not cache.put(URL, 200, {"Cache-Control": 'private="Set-Cookie"'}, b"secret")
+    assert cache.get(URL) is None
+    assert not os.path.exists(tmp_path / "objects")
+    assert cache.put(URL, 200, {"Cache-Control": "public, max-age=3600"}, b"main()")
+
+
+def test_prune_removes_least_recently_used(tmp_path):
+    cache = AssetCache(str(tmp_path))
+    for i in range(3):
+        cache.put(f"{URL}?v={i}", 200, {}, bytes([i]) * 100)
+        entryPath = cache._entryPath(f"{URL}?v={i}")
+        os.utime(entryPath, (1000 + i, 1000 + i))
+    # v=0 used last
+    cache.get(f"{URL}?v=0")
+    assert cache.prune(200) == 1
+    assert cache.get(f"{URL}?v=1") is None
+    assert cache.get(f"{URL}?v=0") is not None
+    assert cache.size() == 200
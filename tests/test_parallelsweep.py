@@ -0,0 +1,142 @@
+import asyncio
+import pytest
+
+from aladdin_auto import productmenu
+from aladdin_auto.aladdinactions import DEVICE_SEARCH_BOX
+from aladdin_auto.parallelsweep import ParallelSweep, runChecks, selectDeviceAndReleaseAsync
+
+
+class FakeParameter:
+    def __init__(self, code, delay):
+        self.code = code
+        self.delay = delay
+
+
+def test_results_are_in_the_order_of_parameters():
+    # the first parameter is slow: the other page checks the rest of them meanwhile
+    parameters = [FakeParameter("0001", 0.2)] + [FakeParameter(f"{i:04d}", 0.01) for i in range(2, 7)]
+    pages = ["page 0", "page 1"]
+    running = []
+    maxRunning = 0
+
+    async def check(page, parameter):
+        nonlocal maxRunning
+        running.append(page)
+        maxRunning = max(maxRunning, len(running))
+        await asyncio.sleep(parameter.delay)
+        running.remove(page)
+        if parameter.code == "0004":
+            raise ValueError("wrong value")
+        return f"{parameter.code} on {page}"
+
+    results = asyncio.run(runChecks(pages, parameters, check))
+    assert [result.parameter for result in results] == parameters
+    assert maxRunning == 2
+    assert results[0].pageIndex == 0
+    assert all(result.pageIndex == 1 for result in results[1:])
+    assert results[1].value == "0002 on page 1"
+    assert results[3].value is None
+    assert isinstance(results[3].error, ValueError)
+    assert not results[3].passed
+    assert [result.passed for result in results].count(True) == 5
+    assert results[0].duration >= 0.2
+    assert repr(results[3]) == "SweepResult(0004: error ValueError('wrong value'))"
+
+
+def test_more_pages_than_parameters():
+    parameters = [FakeParameter("0001", 0)]
+
+    async def check(page, parameter):
+        return page
+
+    results = asyncio.run(runChecks(["page 0", "page 1", "page 2"], parameters, check))
+    assert [(result.value, result.pageIndex) for result in results] == [("page 0", 0)]
+
+
+def test_run_without_parameters():
+    async def check(page, parameter):
+        raise AssertionError("no check expected")
+
+    assert ParallelSweep("http://localhost", [], pageCount=2).run(None, [], check) == []
+
+
+class FakeLocator:
+    def __init__(self, page, name):
+        self.page = page
+        self.name = name
+        self.first = self
+
+    def locator(self, selector):
+        return self
+
+    def get_by_text(self, text):
+        return FakeLocator(self.page, text)
+
+    async def is_visible(self):
+        return self.name in self.page.visibleLinks
+
+    async def click(self):
+        self.page.actions.append(("click", self.name))
+
+    async def fill(self, text):
+        self.page.actions.append(("fill", text))
+
+    async def select_option(self, option):
+        self.page.actions.append(("select", option))
+
+
+class FakePage:
+    def __init__(self, visibleLinks=()):
+        self.visibleLinks = visibleLinks
+        self.actions = []
+
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+
+    def get_by_role(self, role, name, exact=False):
+        return FakeLocator(self, name)
+
+
+class FakeExpect:
+    def __init__(self, locator):
+        pass
+
+    async def to_be_visible(self):
+        pass
+
+    async def to_have_count(self, count):
+        pass
+
+
+class FakeXML:
+    def __init__(self, menuProductName):
+        self.menuProductName = menuProductName
+        self.releaseNumber = "DR0010000"
+        self.mcf = None
+
+    def getAllUserTopLevelPages(self):
+        return []
+
+
+@pytest.fixture
+def fake_expect(monkeypatch):
+    import playwright.async_api
+    monkeypatch.setattr(playwright.async_api, "expect", FakeExpect)
+    monkeypatch.setattr(productmenu, "_indexes", {})
+
+
+def test_async_selection_resolves_the_device_like_the_sync_api(synthetic_catalog, fake_expect):
+    page = FakePage(visibleLinks=["Synthetic Product 001"])
+    asyncio.run(selectDeviceAndReleaseAsync(page, FakeXML("synthetic-p001")))
+    assert page.actions == [("click", "Synthetic Product 001"), ("select", "DR0010000")]
+
+    page = FakePage()
+    asyncio.run(selectDeviceAndReleaseAsync(page, FakeXML("Synthetic Product 002")))
+    assert page.actions[:3] == [("click", DEVICE_SEARCH_BOX), ("fill", "Synthetic Product 002"),
+                                ("click", "Synthetic Product 002")]
+
+
+def test_async_selection_searches_for_a_device_missing_from_the_index(synthetic_catalog, fake_expect):
+    page = FakePage()
+    asyncio.run(selectDeviceAndReleaseAsync(page, FakeXML("Other Product")))
+    assert page.actions[:3] == [("click", DEVICE_SEARCH_BOX), ("fill", "Other Product"), ("click", "Other Product")]
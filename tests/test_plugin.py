@@ -0,0 +1,63 @@
+import json
+import os
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def run(pytester, monkeypatch):
+    """
+    Run a pytest session with the aladdin_auto plugin in a new process, in the pytester folder.
+    """
+    monkeypatch.setenv("PYTHONPATH", ROOT)
+    pytester.makefile(".ini", aladdin_config="[ALADDIN_AUTO]\ndefault_browser_type=WEBAPP_LOCAL\n")
+
+    def runPytest(*args):
+        return pytester.runpytest_subprocess("-p", "aladdin_auto.plugin", "-p", "no:cacheprovider", *args)
+    return runPytest
+
+
+def test_metrics_sidecar_of_earlier_session_is_removed(pytester, run):
+    pytester.makepyfile(test_a="def test_a():\n    pass\n")
+    sidecar = pytester.path / "reports" / "report_metrics.jsonl"
+    sidecar.parent.mkdir()
+    sidecar.write_text('{"test": "test_old.py::test_old"}\n', encoding="utf-8")
+    result = run("--html", "reports/report.html", "--browser_metrics")
+    result.assert_outcomes(passed=1)
+    assert not sidecar.exists()
+
+
+_SLEEPING_TEST = """
+import os
+import time
+
+
+def test_a():
+    time.sleep(float(os.environ.get("TEST_SLEEP_SECS", "0")))
+"""
+
+
+def _runHistorySessions(pytester, run, monkeypatch, *args):
+    pytester.makepyfile(test_a=_SLEEPING_TEST)
+    monkeypatch.setenv("TEST_SLEEP_SECS", "0.01")
+    for _ in range(5):
+        run("--duration_history_path", "history.db", *args).assert_outcomes(passed=1)
+    monkeypatch.setenv("TEST_SLEEP_SECS", "0.5")
+    return run("--duration_history_path", "history.db", "--duration_regression_fail", *args)
+
+
+def test_duration_regression_fails_the_session(pytester, run, monkeypatch):
+    result = _runHistorySessions(pytester, run, monkeypatch)
+    result.assert_outcomes(passed=1)
+    assert result.ret == pytest.ExitCode.TESTS_FAILED
+    result.stdout.fnmatch_lines(["*test_a.py::test_a (call): 0.50 s*"])
+
+
+def test_results_summary_has_the_exit_status_of_a_regression(pytester, run, monkeypatch):
+    result = _runHistorySessions(pytester, run, monkeypatch, "--results_jsonl_path", "results.jsonl")
+    assert result.ret == pytest.ExitCode.TESTS_FAILED
+    with open(pytester.path / "results.jsonl", encoding="utf-8") as f:
+        summary = json.loads(f.readlines()[-1])
+    assert summary["type"] == "summary"
+    assert summary["exit_status"] == pytest.ExitCode.TESTS_FAILED
@@ -0,0 +1,77 @@
+import pytest
+
+from aladdin_auto import productmenu
+from aladdin_auto.productmenu import ProductMenuIndex, normalizeName, productMenuIndex, resolveDeviceName
+
+MENU_PRODUCTS = [
+    ("Magellan-9900i", "DR1", "Magellan 9600i and 9900i"),
+    ("Magellan-9600i", "DR2", "Magellan 9600i and 9900i"),
+    ("Falcon-X4", "DR3", "Falcon X4"),
+    ("Falcon-X5", "DR4", "Falcon X5"),
+]
+
+
+@pytest.fixture
+def index():
+    return ProductMenuIndex(MENU_PRODUCTS)
+
+
+def test_normalize_name():
+    assert normalizeName("Magellan-9900i") == "magellan 9900i"
+    assert normalizeName("  Falcon  X4 (new) ") == "falcon x4 new"
+
+
+def test_menu_names_and_releases(index):
+    assert index.menuNames() == ["Magellan 9600i and 9900i", "Falcon X4", "Falcon X5"]
+    assert index.releases("Magellan 9600i and 9900i") == [("Magellan-9900i", "DR1"), ("Magellan-9600i", "DR2")]
+
+
+def test_resolve_exact_and_product_names(index):
+    assert index.resolve("Falcon X4") == "Falcon X4"
+    assert index.resolve("falcon-x4") == "Falcon X4"
+    assert index.resolve("Magellan-9900i") == "Magellan 9600i and 9900i"
+
+
+def test_resolve_unique_prefix(index):
+    # both product names starting with magellan are in the same menu
+    assert index.resolve("Magellan") == "Magellan 9600i and 9900i"
+    assert index.resolve("falcon x5") == "Falcon X5"
+
+
+def test_resolve_ambiguous_prefix(index):
+    with pytest.raises(LookupError, match="ambiguous.*Falcon X4, Falcon X5"):
+        index.resolve("Falcon")
+
+
+def test_resolve_does_not_select_a_close_name(index):
+    with pytest.raises(LookupError, match="did you mean: Falcon X4"):
+        index.resolve("Falcn X4")
+    with pytest.raises(LookupError, match="in the product menu$"):
+        index.resolve("Unknown device")
+
+
+def test_fuzzy_and_prefix(index):
+    assert index.fuzzy("Magelan 9900i", count=1) == ["Magellan 9600i and 9900i"]
+    assert index.prefix("falcon x") == ["Falcon X4", "Falcon X5"]
+
+
+def test_index_of_the_data_folder(synthetic_catalog, monkeypatch):
+    monkeypatch.setattr(productmenu, "_indexes", {})
+    index = productMenuIndex()
+    assert productMenuIndex() is index
+    assert index.menuNames() == [product["menu"] for product in synthetic_catalog.products]
+    assert index.resolve("Synthetic-P002") == "Synthetic Product 002"
+    # a close name of another product is not selected
+    with pytest.raises(LookupError, match="did you mean"):
+        index.resolve("Synthetic Product 009")
+    with pytest.raises(LookupError):
+        index.resolve("Synthetic Product 7")
+
+
+def test_device_missing_from_the_index_is_searched_for(synthetic_catalog, monkeypatch, caplog):
+    monkeypatch.setattr(productmenu, "_indexes", {})
+    assert resolveDeviceName("Synthetic-P001") == "Synthetic Product 001"
+    assert resolveDeviceName("Synthetic Product 009") is None
+    assert "did you mean" in caplog.text
+    with pytest.raises(LookupError, match="ambiguous"):
+        resolveDeviceName("Synthetic Product")
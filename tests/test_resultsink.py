@@ -0,0 +1,99 @@
+import json
+
+from aladdin_auto.resultsink import ResultSink, configHash
+
+
+class FakeCrash:
+    def __init__(self, message):
+        self.message = message
+
+
+class FakeLongRepr:
+    def __init__(self, message):
+        self.reprcrash = FakeCrash(message)
+
+
+class FakeReport:
+    def __init__(self, nodeid, when, outcome="passed", duration=0.1, longrepr=None, **attributes):
+        self.nodeid = nodeid
+        self.when = when
+        self.failed = outcome == "failed"
+        self.skipped = outcome == "skipped"
+        self.passed = outcome == "passed"
+        self.duration = duration
+        self.longrepr = longrepr
+        self.__dict__.update(attributes)
+
+
+def readRecords(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_config_hash_ignores_key_order():
+    assert configHash({"a": 1, "b": 2}) == configHash({"b": 2, "a": 1})
+    assert configHash({"a": 1}) != configHash({"a": 2})
+
+
+def test_records_of_a_session(tmp_path):
+    path = tmp_path / "results" / "results.jsonl"
+    sink = ResultSink(str(path))
+    sink.start({"headless": True})
+    for when in ("setup", "call", "teardown"):
+        sink.addReport(FakeReport("test_a", when, artifacts=["trace.zip"] if when == "call" else []))
+    sink.addReport(FakeReport("test_b", "setup"))
+    sink.addReport(FakeReport("test_b", "call", "failed", longrepr=FakeLongRepr("assert 1 == 2")))
+    sink.addReport(FakeReport("test_b", "teardown"))
+    sink.addReport(FakeReport("test_c", "setup", "skipped", longrepr=("test_c.py", 1, "Skipped: no device")))
+    sink.addReport(FakeReport("test_c", "teardown"))
+    sink.addReport(FakeReport("test_d", "setup", "failed", longrepr=FakeLongRepr("fixture failed")))
+    sink.addReport(FakeReport("test_d", "teardown"))
+    sink.finish(1)
+
+    session, *tests, summary = readRecords(path)
+    assert session["type"] == "session"
+    assert session["config"] == {"headless": True}
+    assert session["config_hash"] == configHash({"headless": True})
+    assert [(record["test"], record["outcome"], record.get("message")) for record in tests] == [
+        ("test_a", "passed", None), ("test_b", "failed", "assert 1 == 2"), ("test_c", "skipped", "Skipped: no device"),
+        ("test_d", "error", "fixture failed")]
+    assert tests[0]["durations"] == {"setup": 0.1, "call": 0.1, "teardown": 0.1}
+    assert tests[0]["artifacts"] == ["trace.zip"]
+    assert summary["type"] == "summary"
+    assert summary["exit_status"] == 1
+    assert summary["counts"] == {"passed": 1, "failed": 1, "skipped": 1, "error": 1}
+
+
+def test_xfail_outcomes(tmp_path):
+    path = tmp_path / "results.jsonl"
+    sink = ResultSink(str(path))
+    sink.start({})
+    sink.addReport(FakeReport("test_x", "call", "skipped", wasxfail="known bug"))
+    sink.addReport(FakeReport("test_x", "teardown"))
+    sink.addReport(FakeReport("test_y", "call", wasxfail="known bug"))
+    sink.addReport(FakeReport("test_y", "teardown"))
+    sink.finish(0)
+    outcomes = [record["outcome"] for record in readRecords(path) if record["type"] == "test"]
+    assert outcomes == ["xfailed", "xpassed"]
+
+
+def test_finish_writes_interrupted_tests(tmp_path):
+    path = tmp_path / "results.jsonl"
+    sink = ResultSink(str(path))
+    sink.start({})
+    sink.addReport(FakeReport("test_a", "setup"))
+    sink.finish(2)
+    records = readRecords(path)
+    assert [record["type"] for record in records] == ["session", "test", "summary"]
+    assert records[1]["durations"] == {"setup": 0.1}
+    assert records[2]["counts"] == {}
+    # finishing again does nothing
+    sink.finish(2)
+    assert len(readRecords(path)) == 3
+
+
+def test_reports_before_start_are_ignored(tmp_path):
+    sink = ResultSink(str(tmp_path / "results.jsonl"))
+    sink.addReport(FakeReport("test_a", "teardown"))
+    sink.finish(0)
+    assert not (tmp_path / "results.jsonl").exists()
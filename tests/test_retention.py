@@ -0,0 +1,72 @@
+import os
+import pytest
+from aladdin_auto.retention import RetentionEngine, RetentionPolicy, _Ledger
+
+
+@pytest.fixture(autouse=True)
+def ledgers():
+    yield
+    RetentionEngine._ledgers.clear()
+
+
+def _write(path, size: int, mtime: int):
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    os.utime(path, ns=(mtime * 10**9, mtime * 10**9))
+
+
+def test_ledger_orders_files_and_replays_journal(tmp_path):
+    for i in range(3):
+        _write(tmp_path / f"trace{i}.zip", 10 * (i + 1), 1000 - i)
+    _write(tmp_path / "notes.txt", 5, 1)
+    ledger = _Ledger(str(tmp_path), "*.zip")
+    ledger.scan()
+    ledger.folderMtimeNs = os.stat(tmp_path).st_mtime_ns
+    ledger.compact()
+    assert [name for _, name in ledger.order] == ["trace2.zip", "trace1.zip", "trace0.zip"]
+    assert ledger.totalSize == 60
+    ledger.remove("trace1.zip")
+    ledger.append(["-trace1.zip"])
+
+    replayed = _Ledger(str(tmp_path), "*.zip")
+    assert replayed.load()
+    assert replayed.files == ledger.files
+    assert replayed.totalSize == 40
+    assert replayed.folderMtimeNs == ledger.folderMtimeNs
+
+
+def test_prune_applies_count_size_and_age_limits(tmp_path):
+    for i in range(5):
+        _write(tmp_path / f"trace{i}.zip", 100, 1000 + i)
+    deleted = RetentionEngine.prune(str(tmp_path), "*.zip", RetentionPolicy(maxCount=3))
+    assert [os.path.basename(path) for path in deleted] == ["trace0.zip", "trace1.zip"]
+    deleted = RetentionEngine.prune(str(tmp_path), "*.zip", RetentionPolicy(maxBytes=200))
+    assert [os.path.basename(path) for path in deleted] == ["trace2.zip"]
+    deleted = RetentionEngine.prune(str(tmp_path), "*.zip", RetentionPolicy(maxAgeSecs=10), now=1014)
+    assert [os.path.basename(path) for path in deleted] == ["trace3.zip"]
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith(".zip")) == ["trace4.zip"]
+
+
+def test_recorded_file_does_not_trigger_a_rescan(tmp_path, monkeypatch):
+    _write(tmp_path / "trace0.zip", 100, 1000)
+    policy = RetentionPolicy(maxCount=10)
+    RetentionEngine.prune(str(tmp_path), "*.zip", policy)
+    _write(tmp_path / "trace1.zip", 100, 1001)
+    RetentionEngine.recordFile(str(tmp_path / "trace1.zip"), "*.zip")
+
+    def scan(self):
+        raise AssertionError("folder scanned again")
+    monkeypatch.setattr(_Ledger, "scan", scan)
+    RetentionEngine.prune(str(tmp_path), "*.zip", policy)
+    assert len(RetentionEngine._getLedger(str(tmp_path), "*.zip").files) == 2
+
+
+def test_file_added_by_something_else_is_found(tmp_path):
+    _write(tmp_path / "trace0.zip", 100, 1000)
+    policy = RetentionPolicy(maxCount=1)
+    RetentionEngine.prune(str(tmp_path), "*.zip", policy)
+    _write(tmp_path / "trace1.zip", 100, 1001)
+    # make sure the folder mtime differs from the recorded one
+    os.utime(tmp_path, ns=(0, 0))
+    deleted = RetentionEngine.prune(str(tmp_path), "*.zip", policy)
+    assert [os.path.basename(path) for path in deleted] == ["trace0.zip"]
@@ -0,0 +1,63 @@
+from controller.servicechannel import ServicePortChannel, split_responses
+
+
+def test_split_responses_in_command_order():
+    text = "$GV\n1.0.0\n>\n$GI\nSTANDIN\n>\n"
+    assert split_responses(text, ["$GV", "$GI"], prompt=">") == ["1.0.0", "STANDIN"]
+
+
+def test_repeated_commands_have_one_response_each():
+    text = "$CNT\n5\n$CNT\n6\n"
+    assert split_responses(text, ["$CNT", "$CNT"]) == ["5", "6"]
+
+
+def test_missing_echo_gives_empty_response():
+    text = "> $GV\n1.0.0\n"
+    assert split_responses(text, ["$GV", "$GI"], echo_format="> {command}") == ["1.0.0", ""]
+
+
+def _utf16_length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _utf16_slice(text: str, start: int) -> str:
+    return text.encode("utf-16-le")[2 * start:].decode("utf-16-le")
+
+
+class _FakeTerminal:
+    # Terminal of the page, evaluating the scripts like the browser (offsets in UTF-16 code units)
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def fill(self, value: str):
+        self.value = value
+
+    def press(self, key: str):
+        self.text += f"{self.value}\nOK {self.value} \U0001F600\n"
+
+    def inner_text(self) -> str:
+        return self.text
+
+    def element_handle(self):
+        return self
+
+    def evaluate(self, script: str, arg=None):
+        if "slice" in script:
+            return _utf16_slice(self.text, arg)
+        return _utf16_length(self.text)
+
+
+class _FakePage:
+    def evaluate(self, script: str):
+        pass
+
+    def wait_for_function(self, script: str, arg, polling, timeout):
+        pass
+
+
+def test_send_commands_after_non_bmp_text():
+    terminal = _FakeTerminal("\U0001F600 previous output \U0001F600\n")
+    channel = ServicePortChannel(_FakePage(), terminal, terminal)
+    assert channel.send_commands(["$A", "$B", "$A"]) == ["OK $A \U0001F600", "OK $B \U0001F600", "OK $A \U0001F600"]
+    assert channel.send_command("$C") == "OK $C \U0001F600"
@@ -0,0 +1,70 @@
+import os
+from aladdin_auto.config import Config
+from aladdin_auto.sharding import (configureWorker, fragmentPaths, mergeJsonlFragments, mergePrometheusFragments,
+                                   workerIndex, workerPath)
+
+
+def test_worker_paths():
+    assert workerIndex("gw12") == 12
+    assert workerIndex("") == 0
+    assert workerPath(os.path.join("reports", "timing.jsonl"), "gw0") == os.path.join("reports", "timing.gw0.jsonl")
+
+
+def test_fragments_are_ordered_by_worker_number(tmp_path):
+    for worker in ("gw10", "gw2", "gwx"):
+        (tmp_path / f"timing.{worker}.jsonl").write_text("", encoding="utf-8")
+    assert fragmentPaths(str(tmp_path / "timing.jsonl")) == [str(tmp_path / "timing.gw2.jsonl"),
+                                                             str(tmp_path / "timing.gw10.jsonl")]
+
+
+def test_merge_jsonl_fragments(tmp_path):
+    path = tmp_path / "timing.jsonl"
+    path.write_text('{"cycle": "earlier"}\n', encoding="utf-8")
+    (tmp_path / "timing.gw0.jsonl").write_text('{"cycle": "a"}\n{"cycle": "b"}', encoding="utf-8")
+    (tmp_path / "timing.gw1.jsonl").write_text('{"cycle": "c"}\n', encoding="utf-8")
+    assert mergeJsonlFragments(str(path)) == 2
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        '{"cycle": "earlier"}', '{"cycle": "a"}', '{"cycle": "b"}', '{"cycle": "c"}']
+    assert fragmentPaths(str(path)) == []
+    assert mergeJsonlFragments(str(path)) == 0
+
+
+def _prometheus(worker: str, value: int) -> str:
+    return (f"# HELP aladdin_span_seconds Time spent in each span since start.\n"
+            f"# TYPE aladdin_span_seconds summary\n"
+            f'aladdin_span_seconds_sum{{worker="{worker}",span="s"}} {value}\n'
+            f'aladdin_span_seconds_count{{worker="{worker}",span="s"}} 1\n'
+            f'aladdin_last_cycle_timestamp_seconds{{worker="{worker}"}} 100\n')
+
+
+def test_merge_prometheus_fragments_groups_families(tmp_path):
+    path = tmp_path / "timing.prom"
+    (tmp_path / "timing.gw0.prom").write_text(_prometheus("gw0", 1), encoding="utf-8")
+    (tmp_path / "timing.gw1.prom").write_text(_prometheus("gw1", 2), encoding="utf-8")
+    assert mergePrometheusFragments(str(path)) == 2
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "# HELP aladdin_span_seconds Time spent in each span since start.",
+        "# TYPE aladdin_span_seconds summary",
+        'aladdin_span_seconds_sum{worker="gw0",span="s"} 1',
+        'aladdin_span_seconds_count{worker="gw0",span="s"} 1',
+        'aladdin_span_seconds_sum{worker="gw1",span="s"} 2',
+        'aladdin_span_seconds_count{worker="gw1",span="s"} 1',
+        'aladdin_last_cycle_timestamp_seconds{worker="gw0"} 100',
+        'aladdin_last_cycle_timestamp_seconds{worker="gw1"} 100']
+    assert fragmentPaths(str(path)) == []
+
+
+def test_configure_worker_shifts_ports_and_paths(set_option):
+    set_option("primary_browser_port", 9222)
+    set_option("secondary_browser_port", 9223)
+    set_option("standalone_path", "C:/Aladdin_{worker}/Aladdin.exe")
+    set_option("trace_folder_path", "traces")
+    set_option("timing_jsonl_path", "reports/timing.jsonl")
+    set_option("timing_prom_path", "")
+    configureWorker("gw2", 10)
+    assert Config.primaryBrowserPort() == 9242
+    assert Config.secondaryBrowserPort() == 9243
+    assert Config.aladdinStandalonePath() == "C:/Aladdin_gw2/Aladdin.exe"
+    assert Config.traceFolderPath() == os.path.join("traces", "gw2")
+    assert Config.timingJsonlPath() == os.path.join("reports", "timing.gw2.jsonl")
+    assert Config.timingPromPath() == ""
@@ -0,0 +1,75 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from aladdin_auto.standaloneappbrowser import AladdinConnectionError, probeTargetPage, waitForTargetPage
+from benchmarks.import_benchmark import importedModules
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _DevToolsHandler(BaseHTTPRequestHandler):
+    # DevTools HTTP endpoints of a browser whose page appears after a few requests
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        if self.path == "/json/version":
+            body = {"Browser": "Chrome/120"}
+        elif self.path == "/json/list":
+            body = [{"type": "service_worker", "url": "http://localhost/sw.js"}]
+            if server.requests > server.readyAfter:
+                body.append({"type": "page", "url": "http://localhost/aladdin/index.html", "id": "PAGE1"})
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def devtools():
+    server = ThreadingHTTPServer(("localhost", 0), _DevToolsHandler)
+    server.requests = 0
+    server.readyAfter = 0
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_probe_finds_page(devtools):
+    assert probeTargetPage(devtools.server_port, "index.html")["id"] == "PAGE1"
+    assert probeTargetPage(devtools.server_port, "other.html") is None
+
+
+def test_probe_of_closed_port_returns_none(devtools):
+    port = devtools.server_port
+    devtools.shutdown()
+    devtools.server_close()
+    assert probeTargetPage(port, "") is None
+
+
+def test_wait_retries_until_page_exists(devtools):
+    devtools.readyAfter = 6
+    assert waitForTargetPage(devtools.server_port, "index.html", timeoutSecs=5)["id"] == "PAGE1"
+    assert devtools.requests > 6
+
+
+def test_wait_raises_after_timeout(devtools):
+    devtools.readyAfter = 10**6
+    with pytest.raises(AladdinConnectionError):
+        waitForTargetPage(devtools.server_port, "index.html", timeoutSecs=0.2)
+
+
+def test_controller_does_not_import_urllib_request():
+    assert importedModules("controller.aladdin", ["urllib.request"], ROOT) == []
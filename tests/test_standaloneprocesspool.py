@@ -0,0 +1,68 @@
+import os
+import sys
+import pytest
+from aladdin_auto.standaloneprocesspool import StandaloneProcessPool
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="the fake application is a shell script")
+
+
+@pytest.fixture
+def fakeStandalonePath(tmp_path):
+    # stands in for Aladdin.exe: runs until terminated
+    path = tmp_path / "Aladdin.sh"
+    path.write_text("#!/bin/sh\nexec sleep 60\n", encoding="utf-8")
+    os.chmod(path, 0o755)
+    return str(path)
+
+
+@pytest.fixture
+def pool(fakeStandalonePath):
+    pool = StandaloneProcessPool(fakeStandalonePath, 9222, usageLimit=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_instance_is_kept_until_usage_limit(pool):
+    instance = pool.acquire()
+    pool.release(instance, failed=False)
+    assert pool.acquire() is instance
+    assert instance.uses == 2
+    pool.release(instance, failed=False)
+    assert not instance.isAlive()
+    replacement = pool.acquire()
+    assert replacement is not instance and replacement.isAlive()
+
+
+def test_failed_test_restarts_instance_with_prewarm(pool):
+    instance = pool.acquire()
+    pool.release(instance, failed=True, prewarm=True)
+    assert not instance.isAlive()
+    replacement = pool.acquire()
+    assert replacement is not instance and replacement.uses == 1
+
+
+def test_memory_limit_and_developer_mode(fakeStandalonePath):
+    pool = StandaloneProcessPool(fakeStandalonePath, 9222, usageLimit=-1, memoryLimitMb=500)
+    try:
+        instance = pool.acquire()
+        instance.memoryMb = 400
+        pool.release(instance, failed=False)
+        assert pool.acquire() is instance
+        instance.memoryMb = 600
+        pool.release(instance, failed=False)
+        assert not instance.isAlive()
+        developer = pool.acquire(developerMode=True)
+        assert developer.developerMode
+        assert developer.process.args[-1] == "+d"
+        assert pool.acquire(developerMode=False) is not developer
+        assert not developer.isAlive()
+    finally:
+        pool.shutdown()
+
+
+def test_exited_process_is_replaced(pool):
+    instance = pool.acquire()
+    instance.process.terminate()
+    instance.process.wait()
+    pool.release(instance, failed=False)
+    assert pool.acquire() is not instance
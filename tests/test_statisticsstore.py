@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from controller.statisticsstore import StatisticsStore
+
+HOUR = 3600
+# 2024-01-01 00:00:00 UTC
+T0 = 1704067200
+
+
+def _store(tmp_path) -> StatisticsStore:
+    store = StatisticsStore(str(tmp_path / "statistics.db"))
+    # one sample every 15 minutes over 3 hours, counter increasing by 10
+    for i in range(13):
+        store.append("scanner1", T0 + i * 900, {"reads": 100 + i * 10})
+    return store
+
+
+def test_append_computes_deltas_and_ignores_old_samples(tmp_path):
+    store = StatisticsStore(str(tmp_path / "statistics.db"))
+    assert store.append("scanner1", T0, {"reads": 5, "errors": 1}) == 2
+    assert store.append("scanner1", T0 + 60, {"reads": 8, "errors": 0}) == 2
+    # same capture again
+    assert store.append("scanner1", T0 + 60, {"reads": 8, "errors": 0}) == 0
+    raw = store.trend("scanner1", "reads", resolution="raw")
+    assert [delta for _, delta, _ in raw] == [0, 3]
+    # a decrease is a counter reset
+    assert [delta for _, delta, _ in store.trend("scanner1", "errors", resolution="raw")] == [0, 0]
+    assert store.latest("scanner1") == {"reads": 8, "errors": 0}
+    assert store.scanners() == ["scanner1"]
+    assert store.counters("scanner1") == ["errors", "reads"]
+    store.close()
+
+
+def test_trend_hourly_rollup(tmp_path):
+    store = _store(tmp_path)
+    rows = store.trend("scanner1", "reads")
+    assert [row[0] for row in rows] == [datetime.fromtimestamp(T0 + i * HOUR, tz=timezone.utc) for i in range(4)]
+    assert [row[1] for row in rows] == [30, 40, 40, 10]
+    assert rows[-1][2] == 220
+    store.close()
+
+
+def test_trend_excludes_samples_before_start_of_partial_bucket(tmp_path):
+    store = _store(tmp_path)
+    # start at 00:30: the samples of 00:00 and 00:15 are not counted
+    start = T0 + 1800
+    rows = store.trend("scanner1", "reads", start=start)
+    assert rows[0] == (datetime.fromtimestamp(T0, tz=timezone.utc), 20, 130)
+    assert store.total_delta("scanner1", "reads", start=start) == 20 + 40 + 40 + 10
+    raw = store.trend("scanner1", "reads", start=start, resolution="raw")
+    assert store.total_delta("scanner1", "reads", start=start) == sum(delta for _, delta, _ in raw)
+    store.close()
+
+
+def test_trend_excludes_samples_after_end_of_partial_bucket(tmp_path):
+    store = _store(tmp_path)
+    # 00:30 to 01:20: samples of 00:30, 00:45, 01:00 and 01:15
+    start, end = T0 + 1800, T0 + HOUR + 1200
+    assert store.total_delta("scanner1", "reads", start=start, end=end) == 40
+    # both bounds in one bucket
+    assert store.trend("scanner1", "reads", start=T0 + 600, end=T0 + 1200) == [
+        (datetime.fromtimestamp(T0, tz=timezone.utc), 10, 110)]
+    # aligned bounds read the rollups only
+    assert store.total_delta("scanner1", "reads", start=T0 + HOUR, end=T0 + 2 * HOUR) == 40
+    store.close()
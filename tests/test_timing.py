@@ -0,0 +1,74 @@
+import json
+import pytest
+from aladdin_auto.timing import Timing
+from controller.aladdin import AladdinController
+
+
+@pytest.fixture
+def timing():
+    Timing.enable()
+    Timing.flush(cycle="before")
+    Timing._totals.clear()
+    yield Timing
+    Timing.enable(False)
+    Timing.flush(cycle="after")
+    Timing._totals.clear()
+    Timing.setLabels()
+
+
+@Timing.timed("test.timed")
+def _timedFunction():
+    with Timing.span("test.inner"):
+        pass
+
+
+def test_spans_are_recorded_with_parents(timing):
+    _timedFunction()
+    with pytest.raises(ValueError):
+        with Timing.span("test.failing"):
+            raise ValueError()
+    spans = Timing.flush(cycle="cycle1")
+    assert [(span["name"], span["parent"], span["error"]) for span in spans] == [
+        ("test.inner", "test.timed", False), ("test.timed", None, False), ("test.failing", None, True)]
+    assert Timing.flush(cycle="cycle2") == []
+
+
+def test_disabled_timing_records_nothing():
+    Timing.enable(False)
+    _timedFunction()
+    Timing.record("test.recorded", 1.0)
+    assert Timing.flush(cycle="cycle") == []
+
+
+def test_flush_exports_jsonl_and_prometheus(timing, tmp_path):
+    Timing.setLabels(worker="gw0")
+    Timing.record("test.recorded", 0.5)
+    Timing.flush(cycle="cycle1", jsonlPath=str(tmp_path / "timing.jsonl"), promPath=str(tmp_path / "timing.prom"))
+    Timing.record("test.recorded", 1.5)
+    Timing.flush(cycle="cycle2", jsonlPath=str(tmp_path / "timing.jsonl"), promPath=str(tmp_path / "timing.prom"))
+    with open(tmp_path / "timing.jsonl", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["cycle"] for line in lines] == ["cycle1", "cycle2"]
+    assert lines[1]["spans"][0]["duration"] == 1.5
+    prom = (tmp_path / "timing.prom").read_text(encoding="utf-8")
+    assert 'aladdin_span_last_cycle_seconds{worker="gw0",span="test.recorded"} 1.500000' in prom
+    assert 'aladdin_span_seconds_sum{worker="gw0",span="test.recorded"} 2.000000' in prom
+    assert 'aladdin_span_seconds_count{worker="gw0",span="test.recorded"} 2' in prom
+
+
+def test_failed_controller_cycle_flushes_its_spans(timing, tmp_path, set_option):
+    set_option("timing_jsonl_path", str(tmp_path / "timing.jsonl"))
+    controller = AladdinController.__new__(AladdinController)
+
+    def failingCapture():
+        with Timing.span("controller.capture_terminal"):
+            raise TimeoutError()
+    controller._get_all_infor = failingCapture
+    with pytest.raises(TimeoutError):
+        controller.get_all_infor()
+    with open(tmp_path / "timing.jsonl", encoding="utf-8") as f:
+        spans = json.loads(f.readline())["spans"]
+    assert [(span["name"], span["error"]) for span in spans] == [
+        ("controller.capture_terminal", True), ("controller.cycle", True)]
+    # the next cycle starts without the spans of the failed one
+    assert Timing.flush(cycle="next") == []
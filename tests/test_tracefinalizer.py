@@ -0,0 +1,71 @@
+import json
+import os
+import zipfile
+import pytest
+from aladdin_auto.fileutils import FileUtils
+from aladdin_auto.retention import RetentionEngine, _Ledger
+from aladdin_auto.tracefinalizer import INDEX_FILE_NAME, TraceFinalizer
+
+
+@pytest.fixture(autouse=True)
+def ledgers():
+    yield
+    RetentionEngine._ledgers.clear()
+
+
+def _writeTrace(finalizer: TraceFinalizer, name: str) -> str:
+    path = finalizer.stagingPath(name)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as f:
+        f.writestr("trace.trace", "event\n" * 1000)
+    return path
+
+
+def _readIndex(folder: str) -> list:
+    with open(os.path.join(folder, INDEX_FILE_NAME), encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_traces_are_recompressed_and_indexed(tmp_path):
+    folder = str(tmp_path / "traces")
+    finalizer = TraceFinalizer(folder, compressLevel=6)
+    assert not finalizer.stagingFolder.startswith(folder + os.sep)
+    stagingPath = _writeTrace(finalizer, "test_a.zip")
+    tracePath = finalizer.finalize(stagingPath, {"test": "test_x.py::test_a", "failed": True})
+    assert tracePath == os.path.join(folder, "test_a.zip")
+    assert not os.path.exists(stagingPath)
+    with zipfile.ZipFile(tracePath) as f:
+        assert f.getinfo("trace.trace").compress_type == zipfile.ZIP_DEFLATED
+        assert f.read("trace.trace") == b"event\n" * 1000
+    entry, = _readIndex(folder)
+    assert entry["trace"] == "test_a.zip"
+    assert entry["test"] == "test_x.py::test_a" and entry["failed"] is True
+    assert sorted(os.listdir(folder)) == ["test_a.zip", INDEX_FILE_NAME]
+
+
+def test_background_thread_finalizes_submitted_traces(tmp_path):
+    folder = str(tmp_path / "traces")
+    finalizer = TraceFinalizer(folder, maxQueued=2, compressLevel=0)
+    for i in range(5):
+        finalizer.submit(_writeTrace(finalizer, f"test_{i}.zip"), {"test": f"test_{i}"})
+    finalizer.close()
+    assert [entry["trace"] for entry in _readIndex(folder)] == [f"test_{i}.zip" for i in range(5)]
+
+
+def test_prune_after_finalize_does_not_rescan_the_folder(tmp_path, monkeypatch):
+    folder = str(tmp_path / "traces")
+
+    def prune(tracePath: str) -> list:
+        return FileUtils.pruneFolder(folder, "*.zip", maxCount=2, newFile=tracePath)
+    finalizer = TraceFinalizer(folder, compressLevel=6, prune=prune)
+    # the first prune scans the folder once
+    finalizer.finalize(_writeTrace(finalizer, "test_0.zip"), {})
+
+    def scan(self):
+        raise AssertionError("trace folder scanned again")
+    monkeypatch.setattr(_Ledger, "scan", scan)
+    for i in range(1, 5):
+        finalizer.finalize(_writeTrace(finalizer, f"test_{i}.zip"), {})
+        # prune without a new trace, e.g. at the end of the session
+        FileUtils.pruneFolder(folder, "*.zip", maxCount=2)
+    assert sorted(name for name in os.listdir(folder) if name.endswith(".zip")) == ["test_3.zip", "test_4.zip"]
+    assert [entry["trace"] for entry in _readIndex(folder)] == ["test_3.zip", "test_4.zip"]
@@ -0,0 +1,125 @@
+import asyncio
+import pytest
+from aladdin_auto.webbrowser import _AssetRouter, _replayHarPath
+
+URL = "https://aladdin.example.com/main.js"
+
+
+class _Request:
+    def __init__(self, url: str = URL, resourceType: str = "script", method: str = "GET") -> None:
+        self.url = url
+        self.resource_type = resourceType
+        self.method = method
+
+
+class _Response:
+    def __init__(self, status: int, headers: dict, body: bytes) -> None:
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    def body(self) -> bytes:
+        return self._body
+
+
+class _Route:
+    # records the outcome of a sync route
+    def __init__(self, response=None, error: Exception = None) -> None:
+        self._response = response
+        self._error = error
+        self.outcome = None
+
+    def fetch(self):
+        if self._error is not None:
+            raise self._error
+        return self._response
+
+    def fulfill(self, **kwargs):
+        self.outcome = ("fulfill", kwargs)
+
+    def fallback(self):
+        self.outcome = ("fallback", None)
+
+    def abort(self, errorCode: str):
+        self.outcome = ("abort", errorCode)
+
+
+class _AsyncResponse(_Response):
+    async def body(self) -> bytes:
+        return self._body
+
+
+class _AsyncRoute(_Route):
+    async def fetch(self):
+        return super().fetch()
+
+    async def fulfill(self, **kwargs):
+        super().fulfill(**kwargs)
+
+    async def fallback(self):
+        super().fallback()
+
+    async def abort(self, errorCode: str):
+        super().abort(errorCode)
+
+
+@pytest.fixture
+def router(tmp_path, set_option):
+    set_option("network_cache_resource_types", "script;stylesheet")
+    return _AssetRouter({"image"}, ["*/analytics/*"], str(tmp_path / "cache"))
+
+
+def test_blocked_requests_are_aborted(router):
+    route = _Route()
+    router.handleRoute(route, _Request(resourceType="image"))
+    assert route.outcome == ("abort", "blockedbyclient")
+    route = _Route()
+    router.handleRoute(route, _Request(url="https://aladdin.example.com/analytics/hit.js"))
+    assert route.outcome == ("abort", "blockedbyclient")
+
+
+def test_assets_are_served_from_the_cache(router):
+    route = _Route(_Response(200, {"content-type": "text/javascript"}, b"main()"))
+    router.handleRoute(route, _Request())
+    assert route.outcome[0] == "fulfill"
+    route = _Route(error=AssertionError("not cached"))
+    router.handleRoute(route, _Request())
+    assert route.outcome == ("fulfill", {"status": 200, "headers": {"content-type": "text/javascript"}, "body": b"main()"})
+
+
+def test_other_requests_fall_back(router):
+    route = _Route()
+    router.handleRoute(route, _Request(url="https://aladdin.example.com/api/products", resourceType="fetch"))
+    assert route.outcome == ("fallback", None)
+
+
+def test_failed_fetch_falls_back(router):
+    route = _Route(error=ConnectionError("net::ERR_CONNECTION_REFUSED"))
+    router.handleRoute(route, _Request())
+    assert route.outcome == ("fallback", None)
+    route = _AsyncRoute(error=ConnectionError("net::ERR_CONNECTION_REFUSED"))
+    asyncio.run(router.handleRouteAsync(route, _Request()))
+    assert route.outcome == ("fallback", None)
+
+
+def test_no_store_response_is_not_cached(router):
+    route = _AsyncRoute(_AsyncResponse(200, {"cache-control": "no-store"}, b"user data"))
+    asyncio.run(router.handleRouteAsync(route, _Request()))
+    assert route.outcome[0] == "fulfill"
+    route = _AsyncRoute(error=ConnectionError("offline"))
+    asyncio.run(router.handleRouteAsync(route, _Request()))
+    assert route.outcome == ("fallback", None)
+
+
+def test_replay_network_mode_needs_the_archive(tmp_path, set_option):
+    set_option("network_mode", "live")
+    assert _replayHarPath() is None
+    set_option("network_mode", "replay")
+    set_option("network_har_path", str(tmp_path / "aladdin.har.zip"))
+    with pytest.raises(FileNotFoundError):
+        _replayHarPath()
+    (tmp_path / "aladdin.har.zip").write_bytes(b"")
+    assert _replayHarPath() == str(tmp_path / "aladdin.har.zip")
+    set_option("network_mode", "offline")
+    with pytest.raises(ValueError):
+        _replayHarPath()